@@ -0,0 +1,39 @@
+"""Add name trigram indexes
+
+Revision ID: c7a4e9d2f583
+Revises: 8e2f5a7c3b19
+Create Date: 2026-10-18 22:41:09.318452
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c7a4e9d2f583"
+down_revision = "8e2f5a7c3b19"
+branch_labels = None
+depends_on = None
+
+
+TABLES = ["film", "distributor", "country"]
+
+
+def upgrade():
+    # Trigram indexes serve name searches on Postgres,
+    # other databases use the in memory index of services.search.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table in TABLES:
+        op.execute(
+            f"CREATE INDEX ix_{table}_name_trgm ON {table} "
+            "USING gin (lower(name) gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_name_trgm")
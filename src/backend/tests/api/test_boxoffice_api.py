@@ -1,7 +1,8 @@
+import gzip
 import json
 
 import pytest
-from ukbo import etl
+from ukbo import api, etl
 
 
 def test_all_boxoffice(app, client, add_test_film):
@@ -52,6 +53,55 @@ def test_filtered__all_boxoffice(app, client, add_test_film):
         assert data["results"][0]["number_of_cinemas"] == 100
 
 
+def test_all_boxoffice_cursor(app, client, add_test_film):
+    """
+    Test the boxoffice/all endpoint with cursor arguments.
+
+    Args:
+        app: Flask app
+        client: Flask test client
+        add_test_film: Fixture to add a test film
+    """
+    with app.app_context():
+        response = client.get("/api/boxoffice/all?count=none")
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data["count"] is None
+        assert data["next"] == ""
+        assert len(data["results"]) == 1
+
+        response = client.get("/api/boxoffice/all?cursor=nope")
+        assert response.status_code == 400
+
+        response = client.get("/api/boxoffice/all?count=nope")
+        assert response.status_code == 400
+
+
+def test_all_boxoffice_stream(app, client, add_test_film):
+    """
+    Test the boxoffice/all endpoint streaming ndjson and csv.
+
+    Args:
+        app: Flask app
+        client: Flask test client
+        add_test_film: Fixture to add a test film
+    """
+    with app.app_context():
+        response = client.get("/api/boxoffice/all?format=ndjson")
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        rows = [json.loads(i) for i in response.data.splitlines()]
+        assert [i["film"] for i in rows] == ["Nope"]
+
+        response = client.get("/api/boxoffice/all?format=csv&distributor=1")
+        assert response.status_code == 200
+        assert response.mimetype == "text/csv"
+        assert len(response.data.splitlines()) == 2
+
+        response = client.get("/api/boxoffice/all?format=xml")
+        assert response.status_code == 400
+
+
 def test_filtered_boxoffice_empty(app, client, add_test_film):
     """
     Test the boxoffice/all endpoint with a date filter that returns no results.
@@ -103,6 +153,46 @@ def test_top_films(app, client, add_test_film):
         )
 
 
+def test_top_films_arguments(app, client, add_test_film):
+    """
+    Test the boxoffice/topfilms endpoint with a year and limit.
+
+    Args:
+        app: Flask app
+        client: Flask test client
+        add_test_film: Fixture to add a test film
+    """
+    with app.app_context():
+        response = client.get("/api/boxoffice/topfilms?year=2022&limit=1")
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert [i["film"]["name"] for i in data["results"]] == ["Nope"]
+
+        response = client.get("/api/boxoffice/topfilms?year=2021")
+        assert json.loads(response.data)["results"] == []
+
+        response = client.get("/api/boxoffice/topfilms?limit=abc")
+        assert response.status_code == 400
+
+
+def test_topline_stream(app, client, add_test_week):
+    """
+    Test the boxoffice/topline endpoint streaming ndjson.
+
+    Args:
+        app: Flask app
+        client: Flask test client
+        add_test_week: Fixture to add a test week
+    """
+    with app.app_context():
+        response = client.get(
+            "/api/boxoffice/topline?start=2022-01-01&end=2022-02-01&format=ndjson"
+        )
+        assert response.status_code == 200
+        rows = [json.loads(i) for i in response.data.splitlines()]
+        assert [i["date"] for i in rows] == ["2022-01-20"]
+
+
 def test_summary(app, client, add_test_week):
     """
     Test the boxoffice/summary endpoint.
@@ -267,3 +357,118 @@ def test_archive(app, runner, client, add_test_film):
         assert response.data
         # assert its a csv file
         assert response.data.decode("utf-8").startswith("date")
+
+
+def test_archive_parquet(app, client, add_test_film, tmp_path, monkeypatch):
+    """
+    Test the boxoffice/archive endpoint serves the Parquet export.
+
+    Args:
+        app: Flask app
+        client: Flask test client
+        add_test_film: Fixture to add a test film
+        tmp_path: Temporary path
+        monkeypatch: Pytest monkeypatch
+    """
+    path = tmp_path / "archive_export"
+    monkeypatch.setattr(api.boxoffice, "ARCHIVE_PATH", str(path))
+
+    with app.app_context():
+        etl.archive.export(f"{path}.csv")
+
+        response = client.get("/api/boxoffice/archive?format=parquet")
+        assert response.status_code == 200
+        assert response.mimetype == "application/vnd.apache.parquet"
+        assert response.data.startswith(b"PAR1")
+        response.close()
+
+        response = client.get(
+            "/api/boxoffice/archive?year=2022",
+            headers={"Accept": "application/vnd.apache.parquet"},
+        )
+        assert response.status_code == 200
+        assert response.headers["Content-Disposition"] == (
+            "attachment; filename=archive_export_2022.parquet"
+        )
+        assert "Accept" in response.headers["Vary"]
+        response.close()
+
+        response = client.get(
+            "/api/boxoffice/archive?format=parquet&year=1999"
+        )
+        assert response.status_code == 404
+
+        response = client.get("/api/boxoffice/archive?format=xlsx")
+        assert response.status_code == 400
+
+
+def test_archive_precompressed(
+    app, client, add_test_film, tmp_path, monkeypatch
+):
+    """
+    Test the boxoffice/archive endpoint serves the compressed copies,
+    with strong ETags, conditional and range requests.
+
+    Args:
+        app: Flask app
+        client: Flask test client
+        add_test_film: Fixture to add a test film
+        tmp_path: Temporary path
+        monkeypatch: Pytest monkeypatch
+    """
+    path = tmp_path / "archive_export"
+    monkeypatch.setattr(api.boxoffice, "ARCHIVE_PATH", str(path))
+
+    with app.app_context():
+        manifest = etl.archive.export(f"{path}.csv")
+        digest = manifest["sha256"]["csv"]
+
+        response = client.get(
+            "/api/boxoffice/archive", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["ETag"].startswith(f'"{digest}-gzip-')
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert gzip.decompress(response.data).startswith(b"date")
+        response.close()
+
+        response = client.get(
+            "/api/boxoffice/archive", headers={"Accept-Encoding": "br, gzip"}
+        )
+        assert response.headers["Content-Encoding"] == "br"
+        response.close()
+
+        response = client.get(
+            "/api/boxoffice/archive", headers={"Accept-Encoding": "identity"}
+        )
+        etag = response.headers["ETag"]
+        assert etag.startswith(f'"{digest}-')
+        response.close()
+
+        response = client.get(
+            "/api/boxoffice/archive",
+            headers={"Accept-Encoding": "identity", "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+
+        response = client.get(
+            "/api/boxoffice/archive",
+            headers={"Accept-Encoding": "identity", "Range": "bytes=0-3"},
+        )
+        assert response.status_code == 206
+        assert response.data == b"date"
+        assert "Content-Encoding" not in response.headers
+        response.close()
+
+        # The csv replaced without its manifest, as by a failed export.
+        with open(f"{path}.csv", "ab") as f:
+            f.write(b"20220127,1,Nope,USA,1,Fox,2,1,2,1\n")
+
+        response = client.get(
+            "/api/boxoffice/archive",
+            headers={"Accept-Encoding": "identity", "If-None-Match": etag},
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        response.close()
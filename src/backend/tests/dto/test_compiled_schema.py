@@ -0,0 +1,108 @@
+import datetime
+import json
+
+import pytest
+from ukbo import db, models, services
+from ukbo.dto import (
+    CompiledSchema,
+    CountrySchema,
+    DistributorSchema,
+    FilmWeekSchema,
+    WeekSchema,
+)
+
+
+def test_film_week_rows(
+    app,
+    add_test_film,
+    make_film,
+    make_film_week,
+    make_distributor,
+    make_country,
+):
+    """
+    Test compiled film week rows match the FilmWeekSchema output.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add a test film
+        make_film: Fixture to make a film
+        make_film_week: Fixture to make a film week
+        make_distributor: Fixture to make a distributor
+        make_country: Fixture to make a country
+    """
+    with app.app_context():
+        distributors = [make_distributor("Disney"), make_distributor("Sony")]
+        film = make_film("Nope 2", distributors, [make_country("France")])
+        db.session.add(film)
+        db.session.add(
+            make_film_week(
+                date=datetime.date(2022, 1, 27),
+                film=film,
+                rank=2,
+                site_average=7.5,
+            )
+        )
+        db.session.commit()
+
+        expected = [
+            FilmWeekSchema().dump(i)
+            for i in models.Film_Week.query.order_by(
+                models.Film_Week.date.desc()
+            )
+        ]
+        data = json.loads(services.boxoffice.all().data)
+
+    assert data["results"] == expected
+    assert data["results"][0]["distributor"] == "Disney, Sony"
+
+
+def test_week_rows(app, client, add_test_week):
+    """
+    Test compiled week rows match the WeekSchema output.
+
+    Args:
+        app: Flask app
+        client: Flask test client
+        add_test_week: Fixture to add a test week
+    """
+    with app.app_context():
+        expected = [WeekSchema().dump(i) for i in models.Week.query]
+        response = client.get(
+            "/api/boxoffice/topline?start=2022-01-01&end=2022-02-01"
+        )
+
+    assert json.loads(response.data)["results"] == expected
+
+
+def test_list_rows(app, add_test_film):
+    """
+    Test compiled distributor and country rows match their schemas.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add a test film
+    """
+    with app.app_context():
+        distributors = [
+            DistributorSchema().dump(i) for i in models.Distributor.query
+        ]
+        countries = [CountrySchema().dump(i) for i in models.Country.query]
+
+        assert (
+            json.loads(services.distributor.list().data)["results"]
+            == distributors
+        )
+        assert json.loads(services.country.list().data)["results"] == countries
+
+
+def test_computed_required(app):
+    """
+    Test fields computed in Python must be given as SQL expressions.
+
+    Args:
+        app: Flask app
+    """
+    with app.app_context():
+        with pytest.raises(ValueError):
+            CompiledSchema(WeekSchema)
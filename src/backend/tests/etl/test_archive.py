@@ -0,0 +1,213 @@
+import datetime
+import gzip
+import hashlib
+import os
+
+import brotli
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from ukbo import db, etl, models
+
+
+def test_export_csv_appends(app, add_test_film, make_film_week, tmp_path):
+    """
+    Test export_csv function appends only the new weeks.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add test film
+        make_film_week: Fixture to make a film week
+        tmp_path: Temporary path
+    """
+    path = str(tmp_path / "archive_export.csv")
+
+    with app.app_context():
+        manifest = etl.archive.export(path)
+        assert manifest["last_date"] == datetime.date(2022, 1, 20)
+        assert manifest["rows"] == 1
+
+        film = models.Film.query.first()
+        db.session.add(
+            make_film_week(date=datetime.date(2022, 1, 27), film=film)
+        )
+        db.session.commit()
+
+        manifest = etl.archive.export(path)
+        assert manifest["last_date"] == datetime.date(2022, 1, 27)
+        assert manifest["rows"] == 2
+        assert etl.archive.read_manifest(path) == manifest
+
+        appended = pd.read_csv(path)
+        full = etl.archive.export(str(tmp_path / "full.csv"), full=True)
+
+    assert full == manifest
+    assert appended.equals(pd.read_csv(tmp_path / "full.csv"))
+    assert list(appended["date"]) == [20220120, 20220127]
+    assert list(appended["weekend_gross"]) == [500.0, 500.0]
+
+
+def test_export_csv_rebuilds(app, add_test_film, make_film_week, tmp_path):
+    """
+    Test export_csv function rebuilds the file if weeks were rolled back.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add test film
+        make_film_week: Fixture to make a film week
+        tmp_path: Temporary path
+    """
+    path = str(tmp_path / "archive_export.csv")
+
+    with app.app_context():
+        film = models.Film.query.first()
+        db.session.add(
+            make_film_week(date=datetime.date(2022, 1, 27), film=film)
+        )
+        db.session.commit()
+        etl.archive.export(path)
+
+        models.Film_Week.query.filter_by(
+            date=datetime.datetime(2022, 1, 27)
+        ).delete()
+        db.session.commit()
+
+        manifest = etl.archive.export(path)
+
+    assert manifest["last_date"] == datetime.date(2022, 1, 20)
+    assert manifest["rows"] == 1
+    assert pd.read_csv(path).shape[0] == 1
+
+
+def test_export_parquet(app, add_test_film, make_film_week, tmp_path):
+    """
+    Test export function writes a typed Parquet dataset partitioned by year.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add test film
+        make_film_week: Fixture to make a film week
+        tmp_path: Temporary path
+    """
+    path = str(tmp_path / "archive_export.csv")
+
+    with app.app_context():
+        etl.archive.export(path)
+
+        film = models.Film.query.first()
+        db.session.add(
+            make_film_week(date=datetime.date(2023, 1, 5), film=film)
+        )
+        db.session.commit()
+        etl.archive.export(path)
+
+    assert os.path.exists(tmp_path / "archive_export" / "year=2022")
+    assert os.path.exists(tmp_path / "archive_export" / "year=2023")
+
+    table = pq.read_table(tmp_path / "archive_export.parquet")
+    assert table.schema.equals(etl.archive.ARCHIVE_SCHEMA)
+    assert table.num_rows == 2
+
+    df = table.to_pandas()
+    assert list(df["date"]) == [
+        datetime.date(2022, 1, 20),
+        datetime.date(2023, 1, 5),
+    ]
+    assert list(df["film"]) == ["Nope", "Nope"]
+    assert list(df["weekend_gross"]) == [500, 500]
+
+
+def test_export_failed_append(
+    app, add_test_film, make_film_week, tmp_path, monkeypatch
+):
+    """
+    Test a failed export leaves the csv file as it was,
+    so the next export doesn't append the same weeks again.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add test film
+        make_film_week: Fixture to make a film week
+        tmp_path: Temporary path
+        monkeypatch: Pytest monkeypatch fixture
+    """
+    path = str(tmp_path / "archive_export.csv")
+
+    def fail(path, manifest):
+        raise OSError("Disk full.")
+
+    with app.app_context():
+        etl.archive.export(path)
+        film = models.Film.query.first()
+        db.session.add(
+            make_film_week(date=datetime.date(2022, 1, 27), film=film)
+        )
+        db.session.commit()
+
+        with monkeypatch.context() as m:
+            m.setattr(etl.archive, "write_manifest", fail)
+            with pytest.raises(OSError):
+                etl.archive.export(path)
+
+        assert list(pd.read_csv(path)["date"]) == [20220120]
+
+        manifest = etl.archive.export(path)
+
+    assert manifest["rows"] == 2
+    assert list(pd.read_csv(path)["date"]) == [20220120, 20220127]
+
+
+def test_export_reloaded_week(app, add_test_film, make_film_week, tmp_path):
+    """
+    Test a week loaded again before the last date exported,
+    with the same number of rows, rebuilds the files.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add test film
+        make_film_week: Fixture to make a film week
+        tmp_path: Temporary path
+    """
+    path = str(tmp_path / "archive_export.csv")
+
+    with app.app_context():
+        etl.archive.export(path)
+
+        film = models.Film.query.first()
+        models.Film_Week.query.delete()
+        week = make_film_week(date=datetime.date(2022, 1, 20), film=film)
+        week.weekend_gross = 700
+        db.session.add(week)
+        db.session.commit()
+
+        manifest = etl.archive.export(path)
+
+    assert manifest["rows"] == 1
+    assert list(pd.read_csv(path)["weekend_gross"]) == [700.0]
+
+
+def test_export_compressed(app, add_test_film, tmp_path):
+    """
+    Test export function writes compressed copies and hashes of the csv.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add test film
+        tmp_path: Temporary path
+    """
+    path = str(tmp_path / "archive_export.csv")
+
+    with app.app_context():
+        manifest = etl.archive.export(path)
+
+    with open(path, "rb") as f:
+        data = f.read()
+    with gzip.open(f"{path}.gz") as f:
+        assert f.read() == data
+    with open(f"{path}.br", "rb") as f:
+        assert brotli.decompress(f.read()) == data
+
+    assert manifest["sha256"]["csv"] == hashlib.sha256(data).hexdigest()
+    assert manifest["sha256"]["parquet"] == etl.archive.file_sha256(
+        str(tmp_path / "archive_export.parquet")
+    )
@@ -1,7 +1,10 @@
 import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
+import pandas as pd
 import pytest
-from ukbo import db, etl, models
+from ukbo import create_app, db, etl, models, settings
 
 
 @pytest.fixture
@@ -59,6 +62,130 @@ def test_fill_db_command(app, runner):
     assert "Filled the database." in result.output
 
 
+def test_fill_db_command_bulk(app, runner):
+    """
+    Test fill_db_command function with the bulk loader.
+
+    Args:
+        app: Flask app
+        runner: CliRunner
+    """
+    result = runner.invoke(
+        etl.commands.fill_db_command,
+        ["--path", "tests/test_data/test.csv", "--bulk"],
+    )
+
+    with app.app_context():
+        assert len(models.Film.query.all()) == 7
+        assert len(models.Distributor.query.all()) == 6
+        assert len(models.Country.query.all()) == 2
+        assert len(models.Week.query.all()) == 2
+        assert len(models.Film_Week.query.all()) == 9
+
+    assert result.exit_code == 0
+    assert "Filled the database." in result.output
+
+
+def test_fill_db_command_chunksize(app, runner):
+    """
+    Test fill_db_command function streaming the csv file in chunks.
+
+    Args:
+        app: Flask app
+        runner: CliRunner
+    """
+    result = runner.invoke(
+        etl.commands.fill_db_command,
+        ["--path", "tests/test_data/test.csv", "--chunksize", "3"],
+    )
+
+    with app.app_context():
+        assert len(models.Film.query.all()) == 7
+        assert len(models.Distributor.query.all()) == 6
+        assert len(models.Country.query.all()) == 2
+        assert len(models.Week.query.all()) == 2
+        assert len(models.Film_Week.query.all()) == 9
+        assert len(models.SeedCheckpoint.query.all()) == 1
+
+    assert result.exit_code == 0
+    assert "Filled the database." in result.output
+
+
+def test_fill_db_command_workers(app, runner):
+    """
+    Test fill_db_command function seeding the years in parallel.
+    An in memory database is seeded in process.
+
+    Args:
+        app: Flask app
+        runner: CliRunner
+    """
+    result = runner.invoke(
+        etl.commands.fill_db_command,
+        ["--path", "tests/test_data/test.csv", "--workers", "2"],
+    )
+
+    with app.app_context():
+        assert len(models.Film.query.all()) == 7
+        assert len(models.Distributor.query.all()) == 6
+        assert len(models.Country.query.all()) == 2
+        assert len(models.Week.query.all()) == 2
+        assert len(models.Film_Week.query.all()) == 9
+
+    assert result.exit_code == 0
+    assert "Filled the database." in result.output
+
+
+def test_fill_db_command_worker_processes(tmp_path, monkeypatch):
+    """
+    Test fill_db_command function seeding each year in a worker process,
+    which needs a database on disk.
+
+    Args:
+        tmp_path: Temporary path
+        monkeypatch: Pytest monkeypatch fixture
+    """
+    monkeypatch.setattr(
+        settings.TestConfig,
+        "SQLALCHEMY_DATABASE_URI",
+        f"sqlite:///{tmp_path / 'seed.db'}",
+    )
+    app = create_app()
+
+    pools = []
+
+    class Pool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(kwargs)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(etl.tasks, "ProcessPoolExecutor", Pool)
+
+    archive = pd.read_csv("tests/test_data/test.csv")
+    last_year = archive.assign(date=archive["date"] - 10000)
+    path = tmp_path / "archive.csv"
+    pd.concat([last_year, archive]).to_csv(path, index=False)
+
+    with app.app_context():
+        db.create_all()
+
+    result = app.test_cli_runner().invoke(
+        etl.commands.fill_db_command,
+        ["--path", str(path), "--workers", "2"],
+    )
+
+    with app.app_context():
+        years = Counter(i.date.year for i in models.Film_Week.query)
+        assert years == {2021: 9, 2022: 9}
+        assert len(models.Film.query.all()) == 7
+        assert len(models.Week.query.all()) == 4
+        db.engine.dispose()
+
+    assert [i["max_workers"] for i in pools] == [2]
+    assert result.exit_code == 0
+    assert "Filled the database." in result.output
+
+
 def test_test_db_command(app, runner):
     """
     Test test_db_command function with a test csv file.
@@ -1,9 +1,10 @@
 import datetime
 
+import pandas as pd
 import pytest
 import requests  # type: ignore
 from bs4 import BeautifulSoup
-from ukbo import db, etl
+from ukbo import db, etl, models
 
 
 @pytest.fixture
@@ -141,6 +142,33 @@ def test_extract_box_office(app):
     assert "20221113" in df["date"].tolist()
 
 
+def test_extract_box_office_missing_country(app, monkeypatch):
+    """
+    Test a film with an empty country cell is loaded without a country.
+
+    Args:
+        app: Flask app
+        monkeypatch: Pytest monkeypatch fixture
+    """
+    test_excel_path = "tests/test_data/13 November 2022.xls"
+    sheet = pd.read_excel(test_excel_path)
+    sheet.iloc[1, 2] = None
+    monkeypatch.setattr(
+        etl.extract.pd, "read_excel", lambda path: sheet.copy()
+    )
+
+    with app.app_context():
+        df = etl.extract.extract_box_office(test_excel_path)
+        assert df["country"].isna().sum() == 1
+
+        etl.load.bulk_load_weeks(df)
+        film = models.Film.query.filter_by(name=df["film"].iloc[0]).one()
+
+        assert film.countries == []
+        assert models.Country.query.filter_by(name="NAN").count() == 0
+        assert models.Country.query.filter_by(slug="nan").count() == 0
+
+
 def test_find_excel_file(app):
     """
     Test find_excel_file function with a test html file.
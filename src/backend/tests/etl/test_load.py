@@ -1,6 +1,7 @@
 import datetime
 
 import pandas as pd
+from sqlalchemy import create_engine
 from sqlalchemy.orm import joinedload
 from ukbo import db, etl, models
 
@@ -49,6 +50,50 @@ def test_load_countries(app):
     assert len(all_countries) == 2
 
 
+def test_resolve_named(app):
+    """
+    Test resolve_named function creates missing distributors once.
+
+    Args:
+        app: Flask app
+    """
+    with app.app_context():
+        ids = etl.load.resolve_named(
+            models.Distributor, {"Disney", "Disney/Sony Pictures"}
+        )
+        db.session.commit()
+
+        assert sorted(ids) == ["disney", "sony-pictures"]
+        assert models.Distributor.query.count() == 2
+        assert etl.load.resolve_named(models.Distributor, {"DISNEY"}) == {
+            "disney": ids["disney"]
+        }
+
+
+def test_resolve_films(app):
+    """
+    Test resolve_films function returns the IDs in the order of the films.
+
+    Args:
+        app: Flask app
+    """
+    films = [
+        {"film": "Nope", "distributor": "Universal", "country": "USA"},
+        {"film": "Jaws", "distributor": "Universal", "country": "USA"},
+        {"film": "Nope", "distributor": "Universal", "country": "USA"},
+    ]
+
+    with app.app_context():
+        ids = etl.load.resolve_films(films)
+
+        assert ids[0] == ids[2] != ids[1]
+        assert [db.session.get(models.Film, i).name for i in ids[:2]] == [
+            "Nope",
+            "Jaws",
+        ]
+        assert etl.load.resolve_films(films[:2]) == ids[:2]
+
+
 def test_load_films(app):
     """
     Test load_films function with a film.
@@ -129,6 +174,46 @@ def test_load_weeks(app):
     assert week.number_of_cinemas == 200
 
 
+def test_load_weeks_twice(app):
+    """
+    Test the Week and film weeks are not duplicated when a sheet is re-applied.
+
+    Args:
+        app: Flask app
+    """
+
+    df = pd.DataFrame(
+        {
+            "film": ["The Lion King", "Nope"],
+            "distributor": ["Disney", "Disney"],
+            "country": ["United Kingdom", "United Kingdom"],
+            "date": ["20200120", "20200120"],
+            "rank": [1, 2],
+            "weekend_gross": [50, 100],
+            "week_gross": [100, 200],
+            "total_gross": [100, 200],
+            "number_of_cinemas": [100, 200],
+            "weeks_on_release": [1, 2],
+        }
+    )
+    date = datetime.datetime(2020, 1, 20, 0, 0)
+
+    with app.app_context():
+        etl.load.bulk_load_weeks(df.copy())
+        etl.load.bulk_load_weeks(df.copy())
+        weeks = models.Week.query.filter_by(date=date).all()
+        film_weeks = models.Film_Week.query.all()
+
+        assert len(weeks) == 1
+        assert weeks[0].week_gross == 300
+        assert weeks[0].weekend_gross == 150
+        assert weeks[0].number_of_releases == 1
+        assert sorted(i.week_gross for i in film_weeks) == [100, 200]
+
+        etl.load.load_weeks(df.copy())
+        assert models.Film_Week.query.count() == 2
+
+
 def test_load_admissions(app, make_week):
     """
     Test load_admissions function with a week.
@@ -154,3 +239,125 @@ def test_load_admissions(app, make_week):
         week_response = models.Week.query.filter_by(date=date_month).first()
 
     assert week_response.admissions == 100
+
+
+def test_bulk_load_weeks(app):
+    """
+    Test bulk_load_weeks function produces the same rows as load_weeks.
+
+    Args:
+        app: Flask app
+    """
+
+    df = pd.DataFrame(
+        {
+            "film": ["The Lion King", "Nope", "Nope", "Nope", "Avatar"],
+            "distributor": ["Disney", "Universal", "Sony", "Universal", None],
+            "country": ["UK/USA", "USA", "USA", "USA", None],
+            "date": [
+                "20200120",
+                "20200120",
+                "20200120",
+                "20200127",
+                "20200127",
+            ],
+            "rank": [1, 2, 3, 1, 2],
+            "weekend_gross": [50, 100, 10, 80, 20],
+            "week_gross": [100, 200, 20, 150, 40],
+            "total_gross": [100, 200, 20, 350, 40],
+            "number_of_cinemas": [100, 200, None, 150, 10],
+            "weeks_on_release": [1, 2, 1, 3, 1],
+        }
+    )
+
+    def dump():
+        film_weeks = sorted(
+            (
+                i.film.slug.split("-")[0],
+                sorted(d.name for d in i.film.distributors),
+                sorted(c.name for c in i.film.countries),
+                i.date,
+                i.rank,
+                i.weeks_on_release,
+                i.number_of_cinemas,
+                i.weekend_gross,
+                i.week_gross,
+                i.total_gross,
+                i.site_average,
+            )
+            for i in models.Film_Week.query.all()
+        )
+        weeks = [
+            (
+                i.date,
+                i.week_gross,
+                i.weekend_gross,
+                i.number_of_cinemas,
+                i.number_of_releases,
+            )
+            for i in models.Week.query.order_by(models.Week.date).all()
+        ]
+        stats = sorted(
+            (i.film.slug.split("-")[0], i.gross, i.first_week, i.last_week)
+            for i in models.FilmStats.query.all()
+        )
+        return (
+            film_weeks,
+            weeks,
+            stats,
+            models.Film.query.count(),
+            models.Distributor.query.count(),
+            models.Country.query.count(),
+        )
+
+    with app.app_context():
+        etl.load.load_weeks(df.copy())
+        expected = dump()
+
+        db.drop_all()
+        db.create_all()
+
+        etl.load.bulk_load_weeks(df.copy(), chunksize=2)
+        response = dump()
+
+    assert response == expected
+    assert len(response[0]) == 5
+    assert len(response[2]) == 4
+    assert response[3] == 4
+
+
+def test_load_film_week_partition(tmp_path):
+    """
+    Test load_film_week_partition function writes over its own connection.
+
+    Args:
+        tmp_path: Temporary path
+    """
+    database_uri = f"sqlite:///{tmp_path / 'partition.db'}"
+    engine = create_engine(database_uri)
+    models.Film_Week.__table__.create(engine)
+
+    df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2022-01-06", "2022-01-06"]),
+            "film_id": [1, 2],
+            "rank": [1, 2],
+            "weeks_on_release": [1, 1],
+            "number_of_cinemas": [100, 0],
+            "weekend_gross": [500.0, 400.0],
+            "week_gross": [1000.0, 800.0],
+            "total_gross": [1000.0, 800.0],
+            "site_average": [5.0, 0.0],
+        }
+    )
+
+    assert etl.load.load_film_week_partition(database_uri, df) == 2
+
+    with engine.connect() as connection:
+        rows = connection.execute(
+            models.Film_Week.__table__.select().order_by("rank")
+        ).fetchall()
+    engine.dispose()
+
+    assert [row.film_id for row in rows] == [1, 2]
+    assert rows[0].site_average == 5.0
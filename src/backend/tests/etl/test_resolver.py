@@ -0,0 +1,92 @@
+from sqlalchemy import event
+from ukbo import db, etl, models
+
+
+def test_resolver_existing(app, add_test_film):
+    """
+    Test the resolver matches existing records without querying them again.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add a test film
+    """
+    statements = []
+
+    def count(*args):
+        statements.append(args)
+
+    with app.app_context():
+        resolver = etl.resolver.EntityResolver()
+
+        event.listen(db.engine, "before_cursor_execute", count)
+        films = [
+            resolver.film("Nope", "20th Century Fox", "United Kingdom")
+            for _ in range(20)
+        ]
+        resolver.flush()
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    assert statements == []
+    assert {film["id"] for film in films} == {1}
+
+
+def test_resolver_new(app, add_test_film):
+    """
+    Test the resolver adds new records in one flush.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add a test film
+    """
+    with app.app_context():
+        resolver = etl.resolver.EntityResolver()
+        film = resolver.film("Nope", "Universal/Focus", "USA")
+        same = resolver.film("Nope", "Focus", "USA")
+        other = resolver.film("Avatar", None, None)
+
+        assert film["id"] is None
+        resolver.flush()
+        db.session.commit()
+
+        assert same is film
+        assert film["id"] is not None
+        assert film["slug"].startswith("nope-universal-")
+        assert other["slug"] == "avatar"
+
+        response = db.session.get(models.Film, film["id"])
+        assert response.name == "Nope"
+        assert sorted(d.name for d in response.distributors) == [
+            "FOCUS",
+            "UNIVERSAL",
+        ]
+        assert [c.name for c in response.countries] == ["USA"]
+        assert models.Film.query.count() == 3
+
+
+def test_resolver_similar(app, add_test_film):
+    """
+    Test the resolver merges differently formatted names,
+    and reports similar names as possible duplicates.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add a test film
+    """
+    with app.app_context():
+        resolver = etl.resolver.EntityResolver()
+        film = resolver.film("NOPE, THE", "20th Century Fox", None)
+        other = resolver.film("Nopes", "20th Century Fox", None)
+        resolver.flush()
+        db.session.commit()
+
+        assert film["id"] == 1
+        assert other["id"] != 1
+
+        assert models.Event.query.count() == 0
+        assert resolver.warnings == ["Possible duplicate - Nopes ~ Nope."]
+
+        resolver.report()
+        resolver.report()
+
+        events = [i.message for i in models.Event.query]
+        assert events == ["Warnings (1).\nPossible duplicate - Nopes ~ Nope."]
@@ -1,10 +1,32 @@
 import os
+from datetime import datetime
 
 import click
 import pandas as pd
+import pytest
 from ukbo import db, etl, models, services
 
 
+def test_load_market_share(app, add_test_film):
+    """
+    Test load_market_share runs outside an app context,
+    as it does on the scheduler's thread.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add a test film
+    """
+    with app.app_context():
+        services.market_share.mark_years([2022])
+        db.session.commit()
+
+    etl.tasks.load_market_share()
+
+    with app.app_context():
+        assert models.DirtyYear.query.count() == 0
+        assert [i.year for i in models.DistributorMarketShare.query] == [2022]
+
+
 def test_forecast_task(app, add_test_weeks):
     """
     Test forecast_task function.
@@ -107,6 +129,95 @@ def test_seed_box_office(app, tmp_path):
             assert models.Film_Week.query.first().week_gross == 1000
 
 
+def test_seed_chunked(app, tmp_path):
+    """
+    Test seed_chunked function streams the archive and resumes.
+    Dates split across chunks are loaded in one piece.
+
+    Args:
+        app: Flask app
+        tmp_path: Temporary path
+    """
+    path = tmp_path / "archive.csv"
+    df = pd.DataFrame(
+        {
+            "date": [20220106, 20220106, 20220106, 20220113, 20220120],
+            "rank": [1, 2, 3, 1, 1],
+            "film": ["Film A", "Film B", "Film C", "Film A", "Film A"],
+            "country": ["UK", "USA", None, "UK", "UK"],
+            "weekend_gross": [500, 400, 300, 200, 100],
+            "distributor": ["Disney", "Sony", "Sony", "Disney", "Disney"],
+            "weeks_on_release": [1, 1, 1, 2, 3],
+            "number_of_cinemas": [100, 200, 300, 100, 100],
+            "total_gross": [1000, 800, 600, 1400, 1600],
+            "week_gross": [1000, 800, 600, 400, 200],
+        }
+    )
+    df.to_csv(path, index=False)
+
+    with app.app_context():
+        ctx = click.Context(click.Command("cmd"), obj={"prop": "A Context"})
+        with ctx:
+            # Seed a partial archive, as if the seed was interrupted.
+            df.iloc[:4].to_csv(path, index=False)
+            etl.tasks.seed_chunked(str(path), 2)
+
+            checkpoint = models.SeedCheckpoint.query.first()
+            assert checkpoint.source == "archive.csv"
+            assert checkpoint.last_date == datetime(2022, 1, 13)
+
+            df.to_csv(path, index=False)
+            etl.tasks.seed_chunked(str(path), 2)
+            etl.tasks.seed_chunked(str(path), 2)
+
+            assert len(models.Film_Week.query.all()) == 5
+            assert len(models.Film.query.all()) == 3
+            assert len(models.Week.query.all()) == 3
+
+            week = models.Week.query.filter_by(date=datetime(2022, 1, 6))
+            assert week.first().week_gross == 2400
+            assert week.first().number_of_releases == 3
+            assert models.SeedCheckpoint.query.first().last_date == datetime(
+                2022, 1, 20
+            )
+
+
+def test_seed_chunked_unordered(app, tmp_path):
+    """
+    Test seed_chunked function rejects a row dated before a committed date,
+    rather than dropping it.
+
+    Args:
+        app: Flask app
+        tmp_path: Temporary path
+    """
+    path = tmp_path / "archive.csv"
+    pd.DataFrame(
+        {
+            "date": [20220106, 20220113, 20220120, 20220106],
+            "rank": [1, 1, 1, 2],
+            "film": ["Film A", "Film A", "Film A", "Film B"],
+            "country": ["UK", "UK", "UK", "USA"],
+            "weekend_gross": [500, 200, 100, 400],
+            "distributor": ["Disney", "Disney", "Disney", "Sony"],
+            "weeks_on_release": [1, 2, 3, 1],
+            "number_of_cinemas": [100, 100, 100, 200],
+            "total_gross": [1000, 1400, 1600, 800],
+            "week_gross": [1000, 400, 200, 800],
+        }
+    ).to_csv(path, index=False)
+
+    with app.app_context():
+        ctx = click.Context(click.Command("cmd"), obj={"prop": "A Context"})
+        with ctx:
+            with pytest.raises(ValueError, match="not ordered by date"):
+                etl.tasks.seed_chunked(str(path), 2)
+
+            checkpoint = models.SeedCheckpoint.query.first()
+            assert checkpoint.last_date == datetime(2022, 1, 6)
+            assert models.Film.query.filter_by(name="Film B").count() == 0
+
+
 def test_seed_admissions(app, tmp_path, add_test_week):
     """
     Test seed_admissions function.
@@ -203,6 +314,9 @@ def test_rollback_year(app, add_test_film, add_test_week):
         with ctx:
             etl.tasks.rollback_year(2022)
 
+            # Check that the year is marked for the market share
+            assert [i.year for i in models.DirtyYear.query] == [2022]
+
             # Check that the week has been reset
             assert models.Week.query.first().weekend_gross == 0
 
@@ -130,3 +130,32 @@ def test_get_week_box_office_errors(app, add_test_film):
 
     assert response is not None
     assert response == 50
+
+
+def test_get_week_box_office_batch(app, add_test_film):
+    """
+    Test get_week_box_office_batch function matches the row by row function.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add a test film
+    """
+
+    df = pd.DataFrame(
+        {
+            "date": ["20220127", "20220127", "20220127", "20220127"],
+            "film": ["Nope", "Nope", "7 Years in Tibet", "Nope"],
+            "weekend_gross": [500, 500, 500, 50],
+            "total_gross": [3000, 3000, 3000, 100],
+            "weeks_on_release": [3, 1, 3, 3],
+        },
+        index=[5, 6, 7, 8],
+    )
+
+    with app.app_context():
+        response = etl.transform.get_week_box_office_batch(df)
+        expected = df.apply(etl.transform.get_week_box_office, axis=1)
+
+    assert response.tolist() == [2000, 3000, 500, 50]
+    assert response.tolist() == expected.tolist()
+    assert response.index.tolist() == [5, 6, 7, 8]
@@ -1,5 +1,7 @@
 import datetime
 
+from ukbo import db, models, services
+
 
 def test_film_week(make_film, make_distributor, make_country, make_film_week):
     """
@@ -81,3 +83,35 @@ def test_film_weeks(
     assert film.weeks[9].week_gross == 1000
     assert film.weeks[9].total_gross == 10000
     assert film.weeks[9].site_average == 5.0
+
+
+def test_film_gross_expression(app, add_test_film, make_film):
+    """
+    Test filtering and ordering by gross in SQL agrees with Python,
+    for films with and without their totals refreshed.
+
+    Args:
+        app: Flask app
+        add_test_film: Fixture to add a test film
+        make_film: Fixture to create a film
+    """
+    with app.app_context():
+        db.session.add(make_film("Jaws", [], []))
+        db.session.commit()
+
+        for stats in (False, True):
+            if stats:
+                services.film.refresh_stats()
+                db.session.commit()
+
+            films = models.Film.query.order_by(models.Film.gross.desc()).all()
+            assert [i.name for i in films] == ["Nope", "Jaws"]
+            assert [i.gross for i in films] == [1000, 0]
+            for film in films:
+                assert (
+                    models.Film.query.filter(
+                        models.Film.id == film.id,
+                        models.Film.gross == film.gross,
+                    ).count()
+                    == 1
+                )
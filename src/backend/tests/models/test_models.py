@@ -0,0 +1,35 @@
+import pytest
+from ukbo import db, models
+
+
+def test_batches():
+    """
+    Test values are split into lists no longer than the IN clause size.
+    """
+    values = range(models.IN_CLAUSE_SIZE * 2 + 1)
+
+    batches = list(models.batches(values))
+
+    assert [len(batch) for batch in batches] == [
+        models.IN_CLAUSE_SIZE,
+        models.IN_CLAUSE_SIZE,
+        1,
+    ]
+    assert sum(batches, []) == list(values)
+    assert list(models.batches([])) == []
+
+
+def test_insert_statement_unsupported(app, monkeypatch):
+    """
+    Test bulk inserts name the dialect they don't support.
+
+    Args:
+        app: Flask app
+        monkeypatch: Pytest monkeypatch fixture
+    """
+    with app.app_context():
+        dialect = db.session.get_bind().dialect
+        monkeypatch.setattr(dialect, "name", "mysql")
+
+        with pytest.raises(NotImplementedError, match="mysql"):
+            models.insert_statement(models.Film.__table__)
@@ -1,5 +1,7 @@
 import datetime
 
+from ukbo import db, models
+
 
 def test_week(make_week):
     """
@@ -19,3 +21,27 @@ def test_week(make_week):
     assert week.forecast_high == 1500
     assert week.forecast_medium == 1000
     assert week.forecast_low == 500
+
+
+def test_week_year_iso_week(app, make_week):
+    """
+    Test the year and ISO week are stored by the database.
+
+    Args:
+        app: Flask app
+        make_week: Fixture to create a week
+    """
+    with app.app_context():
+        for date in ["2020-12-31", "2021-01-03", "2021-01-04", "2022-01-20"]:
+            db.session.add(make_week(datetime.datetime.fromisoformat(date)))
+        db.session.commit()
+
+        weeks = models.Week.query.order_by(models.Week.date).all()
+
+        assert [(i.year, i.iso_week) for i in weeks] == [
+            (2020, 53),
+            (2021, 53),
+            (2021, 1),
+            (2022, 3),
+        ]
+        assert models.Week.query.filter_by(year=2021).count() == 2
@@ -2,7 +2,7 @@ import datetime
 import json
 
 import pytest
-from ukbo import services
+from ukbo import db, models, services
 
 
 def test_all(app, add_test_film):
@@ -112,6 +112,190 @@ def test_topfilms(app, add_test_film):
     )
 
 
+def test_all_cursor(
+    app,
+    monkeypatch,
+    make_film,
+    make_film_week,
+    make_distributor,
+    make_country,
+):
+    """
+    Test that the all() method walks the weeks with cursors.
+
+    Args:
+        app: The Flask application
+        monkeypatch: Pytest monkeypatch fixture
+        make_film: Fixture to make a film
+        make_film_week: Fixture to make a film week
+        make_distributor: Fixture to make a distributor
+        make_country: Fixture to make a country
+    """
+    monkeypatch.setattr(services.boxoffice, "PAGE_SIZE", 2)
+
+    with app.app_context():
+        distributors = [make_distributor("Disney"), make_distributor("Sony")]
+        film = make_film("Nope", distributors, [make_country()])
+        db.session.add(film)
+        # Two weeks on each date, so the ID breaks the ties.
+        for day in [6, 13, 20]:
+            for rank in [1, 2]:
+                db.session.add(
+                    make_film_week(
+                        date=datetime.date(2022, 1, day), film=film, rank=rank
+                    )
+                )
+        db.session.commit()
+        ids = [
+            i.id
+            for i in models.Film_Week.query.order_by(
+                models.Film_Week.date.desc(), models.Film_Week.id.desc()
+            )
+        ]
+
+        query_filter = services.filters.QueryFilter(
+            distributor_ids=[i.id for i in distributors]
+        )
+        pages = []
+        data = json.loads(
+            services.boxoffice.all(query_filter=query_filter).data
+        )
+        assert data["count"] == 6
+        assert data["previous"] == ""
+        pages.append(data)
+        while data["next"]:
+            data = json.loads(
+                services.boxoffice.all(
+                    query_filter=query_filter,
+                    cursor=data["next"],
+                    count="none",
+                ).data
+            )
+            assert data["count"] is None
+            pages.append(data)
+
+        assert len(pages) == 3
+        assert [i["id"] for page in pages for i in page["results"]] == ids
+
+        data = json.loads(
+            services.boxoffice.all(cursor=pages[2]["previous"]).data
+        )
+        assert data["results"] == pages[1]["results"]
+        assert data["next"] and data["previous"]
+
+        data = json.loads(services.boxoffice.all(cursor=data["previous"]).data)
+        assert data["results"] == pages[0]["results"]
+        assert data["previous"] == ""
+
+        with pytest.raises(ValueError):
+            services.boxoffice.all(cursor="nope")
+        with pytest.raises(ValueError):
+            services.boxoffice.all(count="nope")
+
+
+def test_stream_all(app, monkeypatch, add_test_film, make_film_week):
+    """
+    Test that the stream_all() method streams every week in batches.
+
+    Args:
+        app: The Flask application
+        monkeypatch: Pytest monkeypatch fixture
+        add_test_film: Fixture to add a test film to the database
+        make_film_week: Fixture to make a film week
+    """
+    monkeypatch.setattr(services.boxoffice, "STREAM_BATCH", 2)
+
+    with app.app_context():
+        film = models.Film.query.first()
+        for day in [6, 13]:
+            db.session.add(
+                make_film_week(date=datetime.date(2022, 1, day), film=film)
+            )
+        db.session.commit()
+
+    # Streams read from the database inside the request.
+    with app.test_request_context():
+        response = services.boxoffice.stream_all()
+        assert response.mimetype == "application/x-ndjson"
+        chunks = list(response.response)
+        rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+        response = services.boxoffice.stream_all(file_format="csv")
+        lines = "".join(response.response).splitlines()
+
+        with pytest.raises(ValueError):
+            services.boxoffice.stream_all(file_format="xml")
+
+    assert len(chunks) == 2
+    assert [i["date"] for i in rows] == [
+        "2022-01-20",
+        "2022-01-13",
+        "2022-01-06",
+    ]
+    assert rows[0]["film"] == "Nope"
+    assert rows[0]["distributor"] == "20th Century Fox"
+    assert len(lines) == 4
+    assert "film" in lines[0].split(",")
+
+
+def test_topfilms_leaderboard(
+    app, add_test_film, make_film, make_film_week, make_distributor
+):
+    """
+    Test that the topfilms() method serves the refreshed leaderboard.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database
+        make_film: Fixture to make a film
+        make_film_week: Fixture to make a film week
+        make_distributor: Fixture to make a distributor
+    """
+    with app.app_context():
+        film = make_film("Nope 2", [make_distributor("Disney")], [])
+        db.session.add(film)
+        db.session.add_all(
+            [
+                make_film_week(
+                    date=datetime.date(2022, 12, 29), film=film, week_gross=800
+                ),
+                make_film_week(
+                    date=datetime.date(2023, 1, 5), film=film, week_gross=400
+                ),
+            ]
+        )
+        db.session.commit()
+        services.boxoffice.refresh_leaderboard()
+        db.session.commit()
+
+        response = services.boxoffice.topfilms()
+        data = json.loads(response.data)
+        assert [(i["film"]["name"], i["gross"]) for i in data["results"]] == [
+            ("Nope 2", 1200),
+            ("Nope", 1000),
+        ]
+
+        response = services.boxoffice.topfilms(year=2022)
+        data = json.loads(response.data)
+        assert [(i["film"]["name"], i["gross"]) for i in data["results"]] == [
+            ("Nope", 1000),
+            ("Nope 2", 800),
+        ]
+
+        distributor = models.Distributor.query.filter_by(name="Disney").one()
+        response = services.boxoffice.topfilms(
+            distributor_id=distributor.id, limit=1
+        )
+        data = json.loads(response.data)
+        assert [i["film"]["name"] for i in data["results"]] == ["Nope 2"]
+
+        # Only the refreshed films change.
+        models.Film_Week.query.filter_by(film_id=film.id).delete()
+        services.boxoffice.refresh_leaderboard([film.id])
+        db.session.commit()
+        assert models.Leaderboard.query.count() == 2
+
+
 def test_summary(app, add_test_week):
     """
     Test that the summary() method returns the correct data.
@@ -247,6 +431,61 @@ def test_previous_year(app, add_test_week):
     assert data["results"][0]["number_of_releases"] == 10
 
 
+def test_summary_across_years(app, make_week):
+    """
+    Test that the summary() method compares ranges that cross a year end.
+
+    Args:
+        app: The Flask application
+        make_week: Fixture to make a week
+    """
+    with app.app_context():
+        for date in [
+            datetime.date(2021, 12, 30),
+            datetime.date(2022, 1, 6),
+            datetime.date(2022, 12, 29),
+            datetime.date(2023, 1, 5),
+            datetime.date(2023, 1, 12),
+        ]:
+            db.session.add(make_week(date=date))
+        db.session.commit()
+
+        response = services.boxoffice.summary("2022-12-20", "2023-01-10", 3)
+        previous = services.boxoffice.previous_year("2022-12-20", "2023-01-10")
+
+    data = json.loads(response.data)
+    assert [(i["year"], i["week_gross"]) for i in data["results"]] == [
+        (2023, 2000),
+        (2022, 2000),
+    ]
+    assert json.loads(previous.data)["results"][0]["week_gross"] == 2000
+
+
+def test_comparison_windows():
+    """
+    Test that windows move ranges back by years, and single days by ISO week.
+    """
+    windows = services.comparison.windows(
+        datetime.datetime(2024, 2, 29), datetime.datetime(2024, 3, 2), [0, 1]
+    )
+    assert windows[1].start == datetime.datetime(2023, 2, 28)
+    assert windows[1].end == datetime.datetime(2023, 3, 3)
+
+    windows = services.comparison.windows(
+        datetime.datetime(2020, 12, 31),
+        datetime.datetime(2020, 12, 31),
+        [0, 1],
+    )
+    # 2019 has no week 53.
+    assert [i.year for i in windows] == [2020]
+    assert windows[0].start == datetime.datetime(2020, 12, 28)
+
+    with pytest.raises(ValueError):
+        services.comparison.windows(
+            datetime.datetime(2020, 2, 1), datetime.datetime(2020, 1, 1), [0]
+        )
+
+
 def test_topline(app, add_test_week):
     """
     Test that the topline() method returns the correct data.
@@ -0,0 +1,106 @@
+import os
+
+import pandas as pd
+from ukbo import services
+
+
+def test_correct(tmp_path):
+    """
+    Test that the correct() method cleans and corrects a name.
+
+    Args:
+        tmp_path: Temporary path fixture
+    """
+    path = tmp_path / "film_check.csv"
+    path.write_text("LION KING,THE LION KING \nAVATR,AVATAR\n")
+
+    table = services.corrections.CorrectionTable(
+        str(path), services.corrections.normalise_film, strip=True
+    )
+
+    assert table.correct(" lion king") == "THE LION KING"
+    assert table.correct("Avatr") == "AVATAR"
+    assert table.correct("Batman, The") == "THE BATMAN"
+    assert table.correct("Nope") == "NOPE"
+
+
+def test_correct_series(tmp_path):
+    """
+    Test that the correct_series() method corrects a series of names.
+
+    Args:
+        tmp_path: Temporary path fixture
+    """
+    path = tmp_path / "country_check.csv"
+    path.write_text("UK,UNITED KINGDOM,1\nUSA,UNITED STATES,1\n")
+
+    table = services.corrections.CorrectionTable(str(path))
+    names = pd.Series(["uk", "USA ", "France"], index=[3, 4, 5])
+
+    response = table.correct_series(names)
+
+    assert response.tolist() == ["UNITED KINGDOM", "UNITED STATES", "FRANCE"]
+    assert response.index.tolist() == [3, 4, 5]
+
+
+def test_correct_series_missing_names(tmp_path):
+    """
+    Test that missing names are not turned into strings.
+
+    Args:
+        tmp_path: Temporary path fixture
+    """
+    table = services.corrections.CorrectionTable(str(tmp_path / "none.csv"))
+    names = pd.Series(["Disney", float("nan"), None, 1917])
+
+    response = table.correct_series(names)
+
+    assert response.iloc[0] == "DISNEY"
+    assert response.iloc[1:3].isna().all()
+    assert response.iloc[3] == "1917"
+
+
+def test_correct_reloads_modified_file(tmp_path):
+    """
+    Test that the table is only reloaded when the file is modified.
+
+    Args:
+        tmp_path: Temporary path fixture
+    """
+    path = tmp_path / "distributor_check.csv"
+    path.write_text("FOX,20TH CENTURY FOX\n")
+
+    table = services.corrections.CorrectionTable(str(path))
+    assert table.correct("Fox") == "20TH CENTURY FOX"
+    assert table.table() is table.table()
+
+    path.write_text("FOX,20TH CENTURY STUDIOS\n")
+    modified = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(modified, modified))
+
+    assert table.correct("Fox") == "20TH CENTURY STUDIOS"
+
+
+def test_correct_missing_file(tmp_path):
+    """
+    Test that names are still cleaned when there is no correction file.
+
+    Args:
+        tmp_path: Temporary path fixture
+    """
+    table = services.corrections.CorrectionTable(str(tmp_path / "none.csv"))
+
+    assert table.correct(" disney ") == "DISNEY"
+
+
+def test_normalise_film_scalar():
+    """
+    Test that one film title is cleaned the same way as a series of them.
+    """
+    titles = [" lion king", "Batman, The", "The Batman", "Nope"]
+
+    response = [services.corrections.normalise_film(title) for title in titles]
+
+    assert response == list(
+        services.corrections.normalise_film(pd.Series(titles))
+    )
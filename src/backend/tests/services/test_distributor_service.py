@@ -1,6 +1,7 @@
+import datetime
 import json
 
-from ukbo import services
+from ukbo import db, models, services
 
 
 def test_list(app, add_test_distributor):
@@ -163,3 +164,75 @@ def test_market_share_by_date(app, add_test_film):
 
         assert data["results"][0]["distributor"]["slug"] == "20th-century-fox"
         assert data["results"][0]["gross"] == 1000
+
+
+def test_get_box_office(app, add_test_film):
+    """
+    Test that the get_box_office() method sums the film weeks by year
+    before the rollups are built.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database
+    """
+    with app.app_context():
+
+        response = services.distributor.get_box_office("20th-century-fox", 10)
+        data = json.loads(response.data)
+
+        assert data["results"] == [
+            {
+                "year": 2022,
+                "total": 1000,
+                "count": 1,
+                "films": 1,
+                "new_releases": 1,
+            }
+        ]
+
+
+def test_box_office_rollup(app, add_test_film, make_film_week):
+    """
+    Test that refreshing the rollups only touches the given years.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database
+        make_film_week: Fixture to make a film week
+    """
+    with app.app_context():
+
+        film = models.Film.query.first()
+        db.session.add(
+            make_film_week(
+                date=datetime.date(2023, 1, 5),
+                film=film,
+                weeks_on_release=2,
+                total_gross=3000,
+            )
+        )
+        db.session.commit()
+
+        services.rollup.refresh_films([film.id], [2023])
+        db.session.commit()
+
+        response = services.rollup.box_office("distributor", 1, 2000)
+        assert response == [
+            {
+                "year": 2023,
+                "total": 3000,
+                "count": 1,
+                "films": 1,
+                "new_releases": 0,
+            }
+        ]
+        assert [
+            i["year"] for i in services.rollup.box_office("country", 1, 2000)
+        ] == [2023]
+
+        services.rollup.refresh_films()
+        db.session.commit()
+
+        response = services.rollup.box_office("distributor", 1, 2000)
+        assert [i["year"] for i in response] == [2023, 2022]
+        assert response[1]["total"] == 1000
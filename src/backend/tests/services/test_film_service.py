@@ -1,3 +1,4 @@
+import datetime
 import json
 
 import pytest
@@ -183,6 +184,84 @@ def test_search(app, add_test_film):
         )
 
 
+def test_search_sorted_by_gross(app, add_test_film, make_film, make_film_week):
+    """
+    Test that the search() method sorts and filters on the film totals.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database.
+        make_film: Fixture to make a film.
+        make_film_week: Fixture to make a film week.
+    """
+    with app.app_context():
+        film = make_film("Nope 2", [], [])
+        db.session.add(film)
+        db.session.add(
+            make_film_week(
+                date=datetime.date(2023, 1, 20), film=film, total_gross=2000
+            )
+        )
+        db.session.commit()
+        services.film.refresh_stats()
+        db.session.commit()
+
+        response = services.film.search(
+            "Nope", sort_filter=services.filters.SortFilter("desc_gross")
+        )
+        assert [i["name"] for i in response["results"]] == ["Nope 2", "Nope"]
+        assert [i["gross"] for i in response["results"]] == [2000, 1000]
+
+        response = services.film.search(
+            "Nope",
+            query_filter=services.filters.QueryFilter(
+                min_year=2022, max_year=2022, max_gross=1500
+            ),
+        )
+        assert [i["name"] for i in response["results"]] == ["Nope"]
+
+
+def test_refresh_stats(app, add_test_film, make_film_week):
+    """
+    Test that the refresh_stats() method aggregates the film weeks.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database.
+        make_film_week: Fixture to make a film week.
+    """
+    with app.app_context():
+        film = models.Film.query.first()
+        db.session.add(
+            make_film_week(
+                date=datetime.date(2022, 1, 27),
+                film=film,
+                weeks_on_release=2,
+                number_of_cinemas=300,
+                weekend_gross=200,
+                total_gross=1600,
+            )
+        )
+        db.session.commit()
+
+        services.film.refresh_stats([film.id])
+        db.session.commit()
+
+        stats = models.FilmStats.query.get(film.id)
+        assert stats.gross == 1600
+        assert stats.first_week == datetime.datetime(2022, 1, 20)
+        assert stats.last_week == datetime.datetime(2022, 1, 27)
+        assert stats.opening_weekend == 500
+        assert stats.weeks_on_release == 2
+        assert stats.peak_cinemas == 300
+        assert models.Film.query.first().gross == 1600
+
+        models.Film_Week.query.delete()
+        services.film.refresh_stats([film.id])
+        db.session.commit()
+        assert models.FilmStats.query.count() == 0
+
+
 def test_search_with_no_results(app, add_test_film):
     """
     Test that the search() method returns an empty list when no results are found.
@@ -193,7 +272,7 @@ def test_search_with_no_results(app, add_test_film):
     """
     with app.app_context():
 
-        response = services.film.search("Nope2")
+        response = services.film.search("Jaws")
 
     assert response == {
         "count": 0,
@@ -204,3 +283,65 @@ def test_search_with_no_results(app, add_test_film):
         "previous": "",
         "results": [],
     }
+
+
+def test_search_facets(app, add_test_film, make_film, make_distributor):
+    """
+    Test that the search() method counts the films of each facet.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database.
+        make_film: Fixture to make a film.
+        make_distributor: Fixture to make a distributor.
+    """
+    with app.app_context():
+        distributor = models.Distributor.query.first()
+        db.session.add(
+            make_film("Nope 2", [distributor, make_distributor("Sony")], [])
+        )
+        db.session.add(make_film("Jaws", [distributor], []))
+        db.session.commit()
+
+        response = services.film.search("nope")
+
+    assert response["count"] == 2
+    assert response["max_gross"] == 1000
+    assert response["distributors"] == [
+        {
+            "id": 1,
+            "name": "20th Century Fox",
+            "slug": "20th-century-fox",
+            "count": 2,
+        },
+        {"id": 2, "name": "Sony", "slug": "sony", "count": 1},
+    ]
+    assert response["countries"] == [
+        {
+            "id": 1,
+            "name": "United Kingdom",
+            "slug": "united-kingdom",
+            "count": 1,
+        }
+    ]
+
+
+def test_search_typo(app, add_test_film, make_film):
+    """
+    Test that the search() method finds similar names when none match.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database.
+        make_film: Fixture to make a film.
+    """
+    with app.app_context():
+        db.session.add(make_film("Knives Out", [], []))
+        db.session.commit()
+
+        response = services.film.search("Knives Ot")
+        assert [i["name"] for i in response["results"]] == ["Knives Out"]
+        assert response["count"] == 1
+
+        response = services.film.search("Nope2")
+        assert [i["name"] for i in response["results"]] == ["Nope"]
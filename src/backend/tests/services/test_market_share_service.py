@@ -0,0 +1,97 @@
+import datetime
+
+import pytest
+from ukbo import db, models, services
+
+
+def test_load_market_share_data(app, add_test_film, make_week):
+    """
+    Test that load_market_share_data() calculates the market share
+    of distributors and countries.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database
+        make_week: Fixture to make a week
+    """
+    with app.app_context():
+        db.session.add(
+            make_week(date=datetime.date(2022, 1, 20), week_gross=4000)
+        )
+        db.session.commit()
+
+        services.market_share.load_market_share_data("distributor")
+        services.market_share.load_market_share_data("country")
+
+        distributor = models.DistributorMarketShare.query.one()
+        assert distributor.distributor.slug == "20th-century-fox"
+        assert distributor.year == 2022
+        assert distributor.gross == 1000
+        assert distributor.market_share == 25.0
+
+        country = models.CountryMarketShare.query.one()
+        assert country.country.slug == "united-kingdom"
+        assert country.year == 2022
+        assert country.gross == 1000
+        assert country.market_share == 25.0
+
+
+def test_load_market_share_data_replaces_years(
+    app, add_test_film, make_film_week
+):
+    """
+    Test that load_market_share_data() replaces the rows of the given years.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database
+        make_film_week: Fixture to make a film week
+    """
+    with app.app_context():
+        services.market_share.load_market_share_data()
+
+        film = models.Film.query.first()
+        db.session.add(
+            make_film_week(date=datetime.date(2022, 1, 27), film=film)
+        )
+        db.session.add(
+            make_film_week(date=datetime.date(2023, 1, 5), film=film)
+        )
+        db.session.commit()
+
+        services.market_share.load_market_share_data(years=[2022])
+
+        rows = models.DistributorMarketShare.query.all()
+        assert [(i.year, i.gross) for i in rows] == [(2022, 2000)]
+        assert rows[0].market_share == 0.0
+
+        with pytest.raises(ValueError):
+            services.market_share.load_market_share_data("film")
+
+
+def test_refresh_dirty_years(app, add_test_film, make_film_week):
+    """
+    Test that refresh_dirty_years() only recalculates the marked years,
+    and clears them.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database
+        make_film_week: Fixture to make a film week
+    """
+    with app.app_context():
+        film = models.Film.query.first()
+        db.session.add(
+            make_film_week(date=datetime.date(2023, 1, 5), film=film)
+        )
+        db.session.commit()
+
+        services.market_share.mark_years([2023])
+        db.session.commit()
+
+        assert services.market_share.refresh_dirty_years() == [2023]
+        assert [i.year for i in models.DistributorMarketShare.query] == [2023]
+        assert [i.year for i in models.CountryMarketShare.query] == [2023]
+        assert models.DirtyYear.query.count() == 0
+
+        assert services.market_share.refresh_dirty_years() == []
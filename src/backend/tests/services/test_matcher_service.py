@@ -0,0 +1,53 @@
+import random
+import string
+
+from ukbo import services
+
+
+def test_key():
+    """
+    Test names that only differ by their formatting have the same key.
+    """
+    key = services.matcher.key
+
+    assert key("Godfather, The") == key("The Godfather") == "godfather"
+    assert key("AMÉLIE") == key("Amelie") == "amelie"
+    assert key("Spider-Man: No Way Home") == "spider man no way home"
+    assert key("The") == "the"
+
+
+def test_fuzzy_index():
+    """
+    Test the fuzzy index finds exact keys and similar names.
+    """
+    index = services.matcher.FuzzyIndex(
+        [(1, "The Godfather"), (2, "Godfather Part II"), (3, "Jaws")]
+    )
+
+    assert index.exact("GODFATHER, THE") == [1]
+    assert index.exact("Godfather 2") == []
+    assert [id for id, _ in index.search("Godfathr")] == [1]
+    assert index.search("Godfather Part 2")[0][0] == 2
+    assert index.search("Alien") == []
+
+
+def test_fuzzy_index_blocking():
+    """
+    Test only names sharing a trigram with the query are scored,
+    so a weekly sheet isn't compared with the whole catalogue.
+    """
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+        for _ in range(3000)
+    ]
+    films = [
+        " ".join(rng.choices(words, k=rng.randint(1, 4))) for _ in range(20000)
+    ]
+    index = services.matcher.FuzzyIndex(enumerate(films))
+
+    for id in rng.sample(range(len(films)), 200):
+        film = films[id]
+        assert id in index.exact(film)
+        assert id in [i for i, _ in index.search(film[:-1], threshold=0.5)]
+        assert len(index.candidates(film[:-1])) < len(films) / 5
@@ -0,0 +1,224 @@
+import datetime
+import json
+import sqlite3
+
+import pytest
+from ukbo import db, models, services
+
+
+def test_ngram_index():
+    """
+    Test the n-gram index finds names containing a query, ignoring case.
+    """
+    index = services.search.NgramIndex(
+        [(1, "Nope"), (2, "Hope"), (3, "No Time to Die")]
+    )
+
+    assert index.search("nope") == {1}
+    assert index.search("OPE") == {1, 2}
+    assert index.search("o t") == {3}
+    assert index.search("No") == {1, 3}
+    assert index.search("Jaws") == set()
+
+
+def test_film_search_ranking(app, add_test_film, make_film, make_film_week):
+    """
+    Test film search ranks exact, prefix and word matches, then by gross.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film to the database
+        make_film: Fixture to make a film
+        make_film_week: Fixture to make a film week
+    """
+    with app.app_context():
+        for name, gross in [
+            ("Nope 2", 3000),
+            ("Canope", 9000),
+            ("Say Nope", 2000),
+            ("Nope Again", 5000),
+        ]:
+            film = make_film(name, [], [])
+            db.session.add(film)
+            db.session.add(
+                make_film_week(
+                    date=datetime.date(2022, 1, 27),
+                    film=film,
+                    total_gross=gross,
+                )
+            )
+        db.session.commit()
+        services.film.refresh_stats()
+        db.session.commit()
+
+        response = services.film.search("nope")
+
+    assert [i["name"] for i in response["results"]] == [
+        "Nope",
+        "Nope Again",
+        "Nope 2",
+        "Say Nope",
+        "Canope",
+    ]
+
+
+def test_search_new_rows(app, add_test_distributor, make_distributor):
+    """
+    Test the index finds rows added or deleted after it was built.
+
+    Args:
+        app: The Flask application
+        add_test_distributor: Fixture to add a test distributor
+        make_distributor: Fixture to make a distributor
+    """
+    with app.app_context():
+        assert services.distributor.search("century") != []
+        assert services.distributor.search("warner") == []
+
+        db.session.add(make_distributor("Warner Bros"))
+        db.session.commit()
+
+        assert [i["name"] for i in services.distributor.search("warner")] == [
+            "Warner Bros"
+        ]
+
+        models.Distributor.query.filter_by(name="Warner Bros").delete()
+        db.session.commit()
+
+        assert services.distributor.search("warner") == []
+
+
+def test_search_many_matches(app):
+    """
+    Test a query matching more rows than SQLite allows bound parameters.
+
+    Args:
+        app: The Flask application
+    """
+    with app.app_context():
+        connection = db.session.connection().connection.driver_connection
+        if not hasattr(connection, "setlimit"):
+            pytest.skip("Needs Python 3.11 to set SQLite limits.")
+        # The default of SQLite before 3.32.
+        connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+        models.Distributor.insert_many(
+            [
+                {"name": f"Pictures {i}", "slug": f"pictures-{i}"}
+                for i in range(2000)
+            ]
+        )
+        db.session.commit()
+
+        assert len(services.distributor.search("pictures", 5)) == 5
+
+
+def test_search_all(app, add_test_film):
+    """
+    Test searching everything, and running a search on the search pool.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film
+    """
+    with app.app_context():
+        results = services.search.search_all(
+            "nope",
+            services.filters.QueryFilter(),
+            services.filters.SortFilter(),
+        )
+        assert results["films"]["count"] == 1
+        assert results["distributors"] == []
+        assert results["countries"] == []
+
+        executor = services.search._executor(app)
+        assert services.search._executor(app) is executor
+        future = executor.submit(
+            services.search._in_context,
+            app,
+            services.distributor.search,
+            "20th",
+            1,
+        )
+        assert future.result() == services.distributor.search("20th", 1)
+
+
+def test_warm_autocomplete(app, add_test_film):
+    """
+    Test the prefix index is built up front,
+    and skipped if the database has no tables yet.
+
+    Args:
+        app: The Flask application
+        add_test_film: Fixture to add a test film
+    """
+    with app.app_context():
+        services.search.warm_autocomplete()
+        index = app.extensions["autocomplete"]
+        assert [i["label"] for i in index.search("no", 10)] == ["Nope"]
+
+        db.drop_all()
+        services.search.warm_autocomplete()
+        assert app.extensions["autocomplete"] is index
+
+
+def test_prefix_index():
+    """
+    Test the prefix index suggests normalised prefixes, highest gross first.
+    """
+    index = services.search.PrefixIndex(
+        [
+            ("Nope", 1000, {"label": "Nope"}),
+            ("Nosferatu", 5000, {"label": "Nosferatu"}),
+            ("Amélie", 2000, {"label": "Amélie"}),
+            ("No Time to Die", 9000, {"label": "No Time to Die"}),
+            ("Spider-Man", 3000, {"label": "Spider-Man"}),
+        ]
+    )
+
+    assert [i["label"] for i in index.search("n", 10)] == [
+        "No Time to Die",
+        "Nosferatu",
+        "Nope",
+    ]
+    assert [i["label"] for i in index.search("NO", 2)] == [
+        "No Time to Die",
+        "Nosferatu",
+    ]
+    assert [i["label"] for i in index.search("nop", 10)] == ["Nope"]
+    assert [i["label"] for i in index.search("ame", 10)] == ["Amélie"]
+    assert [i["label"] for i in index.search("spider man", 10)] == [
+        "Spider-Man"
+    ]
+    assert index.search("jaws", 10) == []
+    assert index.search("  ", 10) == []
+
+
+def test_film_autocomplete(app, client, add_test_film, make_film):
+    """
+    Test the film search endpoint is served from the prefix index,
+    which is reloaded when a film is added, as by another process.
+
+    Args:
+        app: The Flask application
+        client: Flask test client
+        add_test_film: Fixture to add a test film to the database
+        make_film: Fixture to make a film
+    """
+    with app.app_context():
+        response = client.get("/api/search/film?q=no")
+        assert json.loads(response.data) == [{"label": "Nope", "value": "1"}]
+
+        db.session.add(make_film("Nosferatu", [], []))
+        db.session.commit()
+
+        response = client.get("/api/search/film?q=nos")
+        assert json.loads(response.data) == []
+
+        # The new film changed the version, so the index is reloading.
+        app.extensions["autocomplete_reload"].join()
+
+        response = client.get("/api/search/film?q=nos")
+        assert json.loads(response.data) == [
+            {"label": "Nosferatu", "value": "2"}
+        ]
@@ -1,6 +1,7 @@
 import datetime
 
-from ukbo import models, services
+import pandas as pd
+from ukbo import db, models, services
 
 
 def test_add_week(app):
@@ -105,3 +106,43 @@ def test_update_admissions(app, add_test_week):
         response = models.Week.query.filter_by(date=date).first()
 
         assert response.admissions == 100
+
+
+def test_merge_weeks(app, add_test_week):
+    """
+    Test that the merge_weeks() method replaces the totals of an existing week,
+    and leaves the admissions and forecast in place.
+
+    Args:
+        app: The Flask application
+        add_test_week: Fixture to add a test week to the database.
+    """
+    df = pd.DataFrame(
+        {
+            "date": [
+                datetime.datetime(2022, 1, 20),
+                datetime.datetime(2022, 1, 20),
+                datetime.datetime(2022, 1, 27),
+            ],
+            "week_gross": [100, 200, 300],
+            "weekend_gross": [50, 100, 150],
+            "number_of_cinemas": [10, 20, None],
+            "weeks_on_release": [1, 2, 1],
+        }
+    )
+    with app.app_context():
+        services.week.merge_weeks(df)
+        services.week.merge_weeks(df)
+        db.session.commit()
+
+        response = models.Week.query.order_by(models.Week.date).all()
+
+        assert len(response) == 2
+        assert response[0].week_gross == 300
+        assert response[0].weekend_gross == 150
+        assert response[0].number_of_cinemas == 20
+        assert response[0].number_of_releases == 1
+        assert response[0].admissions == 100
+        assert response[0].forecast_high == 1500
+        assert response[1].week_gross == 300
+        assert response[1].number_of_cinemas == 0
@@ -66,8 +66,12 @@ def run_app(app: Flask) -> Flask:
 
     cors.init_app(app)
 
+    from ukbo import services
     from ukbo.etl import tasks
 
+    if app.config["AUTOCOMPLETE_WARM"]:
+        services.search.warm_autocomplete()
+
     scheduler.start()
 
     return app
@@ -131,6 +135,7 @@ def register_cli(app: Flask) -> None:
     app.cli.add_command(etl.commands.rollback_year_command)
     app.cli.add_command(etl.commands.forecast_command)
     app.cli.add_command(etl.commands.delete_film_command)
+    app.cli.add_command(etl.commands.refresh_film_stats_command)
     app.cli.add_command(etl.commands.build_archive_command)
     app.cli.add_command(etl.commands.market_share_command)
 
@@ -1,8 +1,17 @@
-from flask import Blueprint, Response, request, send_file
-from ukbo import services
+import os
+from typing import Optional, Union
+
+from flask import Blueprint, Response, current_app, request, send_file
+from ukbo import etl, services
 
 boxoffice = Blueprint("boxoffice", __name__)
 
+# Relative to the app, without the file extension.
+ARCHIVE_PATH = "../data/archive_export"
+PARQUET_MIMETYPE = "application/vnd.apache.parquet"
+# Content encodings of the archive copies, in order of preference.
+ARCHIVE_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
 
 @boxoffice.route("/all", methods=["GET"])
 def all() -> Response:
@@ -15,7 +24,10 @@ def all() -> Response:
     Request Arguments (optional):
         start (str): Start date to filter by (YYYY-MM-DD).
         end (str): End date to filter by (YYYY-MM-DD).
-        page (int): Page number to return.
+        cursor (str): Cursor of the page to return, from next or previous.
+        page (int): Page number to return, instead of a cursor.
+        count (str): How to count the results - exact, estimate or none.
+        format (str): Stream every result as ndjson or csv, without pages.
         distributor (int): ID of the distributor to filter by.
         country (int): ID of the country to filter by.
 
@@ -25,7 +37,10 @@ def all() -> Response:
     """
     start = request.args.get("start", None)
     end = request.args.get("end", None)
-    page = request.args.get("page", 1)
+    page = request.args.get("page", None)
+    cursor = request.args.get("cursor", None)
+    count = request.args.get("count", "exact")
+    file_format = request.args.get("format", None)
     distributor_ids = request.args.get("distributor", None)
     country_ids = request.args.get("country", None)
 
@@ -41,25 +56,59 @@ def all() -> Response:
         distributor_ids=distributor_ids, country_ids=country_ids
     )
 
-    return services.boxoffice.all(time_filter, query_filter, int(page))
+    try:
+        page = int(page) if page is not None else None
+    except ValueError:
+        return Response('{"error": "Page must be an integer."}', status=400)
+
+    try:
+        if file_format is not None:
+            return services.boxoffice.stream_all(
+                time_filter, query_filter, file_format
+            )
+        return services.boxoffice.all(
+            time_filter, query_filter, page, cursor or None, count
+        )
+    except ValueError as e:
+        return Response(f'{{"error": "{e}"}}', status=400)
 
 
 @boxoffice.route("/topfilms", methods=["GET"])
 def top() -> Response:
     """
-    Top films for all time.
+    Top films for all time, or for one year.
+
+    Optional Request Arguments:
+        year (int): Year to get the top films of.
+        distributor (int): ID of the distributor to filter by.
+        country (int): ID of the country to filter by.
+        limit (int): Number of films to return, up to 100.
 
     Returns:
         JSON response of top films data.
     """
-    return services.boxoffice.topfilms()
+    args = {}
+    for arg in ["year", "distributor", "country", "limit"]:
+        value = request.args.get(arg, None)
+        try:
+            args[arg] = int(value) if value is not None else None
+        except ValueError:
+            return Response(
+                f'{{"error": "{arg.capitalize()} must be an integer."}}',
+                status=400,
+            )
+
+    limit = args["limit"] if args["limit"] is not None else 50
+    return services.boxoffice.topfilms(
+        args["year"], args["distributor"], args["country"], min(limit, 100)
+    )
 
 
 @boxoffice.route("/summary", methods=["GET"])
 def summary() -> Response:
     """
     Summarised box office statistics for a time period grouped by year.
-    The time range must be within one year due to SQL limitations.
+    The time range can cross the end of a year.
 
     Request arguments are passed to the service layer.
 
@@ -76,7 +125,10 @@ def summary() -> Response:
     limit = request.args.get("limit", 1)
     if None in [start, end, limit]:
         return Response('{"error": "Missing arguments"}', status=400)
-    return services.boxoffice.summary(start, end, int(limit))
+    try:
+        return services.boxoffice.summary(start, end, int(limit))
+    except ValueError:
+        return Response('{"error": "Invalid time range"}', status=400)
 
 
 @boxoffice.route("/previous", methods=["GET"])
@@ -97,7 +149,10 @@ def previous() -> Response:
     end = request.args.get("end", None)
     if None in [start, end]:
         return Response('{"error": "Missing arguments"}', status=400)
-    return services.boxoffice.previous(start, end)
+    try:
+        return services.boxoffice.previous(start, end)
+    except ValueError:
+        return Response('{"error": "Invalid time range"}', status=400)
 
 
 @boxoffice.route("previousyear", methods=["GET"])
@@ -118,7 +173,10 @@ def previous_year() -> Response:
     end = request.args.get("end", None)
     if None in [start, end]:
         return Response('{"error": "Missing arguments"}', status=400)
-    return services.boxoffice.previous_year(start, end)
+    try:
+        return services.boxoffice.previous_year(start, end)
+    except ValueError:
+        return Response('{"error": "Invalid time range"}', status=400)
 
 
 @boxoffice.route("/topline", methods=["GET"])
@@ -134,6 +192,7 @@ def topline() -> Response:
         end (str): End date to filter by (YYYY-MM-DD).
     Optional Request Arguments:
         page (int): Page number to return.
+        format (str): Stream every result as ndjson or csv, without pages.
 
     Returns:
         JSON response of box office data.
@@ -141,17 +200,154 @@ def topline() -> Response:
     start = request.args.get("start", None)
     end = request.args.get("end", None)
     page = request.args.get("page", 1)
+    file_format = request.args.get("format", None)
     if None in [start, end]:
         return Response('{"error": "Missing arguments"}', status=400)
+    if file_format is not None:
+        try:
+            return services.boxoffice.stream_topline(start, end, file_format)
+        except ValueError as e:
+            return Response(f'{{"error": "{e}"}}', status=400)
     return services.boxoffice.topline(start, end, int(page))
 
 
 @boxoffice.route("/archive", methods=["GET"])
 def archive() -> Response:
     """
-    Archive export csv file of box office data.
+    Archive export of box office data.
+
+    Served as csv by default, or as Parquet when asked for
+    with the format argument or an Accept header.
+    The Parquet export is also available for one year at a time.
+
+    Optional Request Arguments:
+        format (str): File format, csv or parquet.
+        year (int): Year of the Parquet export to return.
+
+    Returns:
+        Send file response of the archive export.
+    """
+    file_format = request.args.get("format", None)
+    if file_format is None:
+        best = request.accept_mimetypes.best_match(
+            ["text/csv", PARQUET_MIMETYPE]
+        )
+        file_format = "parquet" if best == PARQUET_MIMETYPE else "csv"
+
+    year = request.args.get("year", None)
+    if year is not None:
+        try:
+            year = int(year)
+        except ValueError:
+            return Response(
+                '{"error": "Year must be an integer."}', status=400
+            )
+
+    manifest = etl.archive.read_manifest(_app_path(f"{ARCHIVE_PATH}.csv"))
+    sha256 = manifest.get("sha256", {}) if manifest is not None else {}
+
+    if file_format == "csv" and year is None:
+        response = _send_archive(
+            f"{ARCHIVE_PATH}.csv",
+            "text/csv",
+            "archive_export.csv",
+            sha256.get("csv"),
+            precompressed=True,
+        )
+    elif file_format == "parquet":
+        path = f"{ARCHIVE_PATH}.parquet"
+        download_name = "archive_export.parquet"
+        digest = sha256.get("parquet")
+        if year is not None:
+            path = f"{ARCHIVE_PATH}/year={year}/part-0.parquet"
+            download_name = f"archive_export_{year}.parquet"
+            digest = None
+        if not os.path.exists(_app_path(path)):
+            return Response('{"error": "Archive not found."}', status=404)
+        response = _send_archive(path, PARQUET_MIMETYPE, download_name, digest)
+    else:
+        return Response(
+            '{"error": "Format must be csv, or parquet with a year."}',
+            status=400,
+        )
+
+    response.vary.add("Accept")
+    return response
+
+
+def _send_archive(
+    path: str,
+    mimetype: str,
+    download_name: str,
+    digest: Optional[str],
+    precompressed: bool = False,
+) -> Response:
+    """
+    Sends an archive file, or its compressed copy if the client accepts it.
+
+    The ETag is the file's SHA-256 from the archive manifest,
+    with the encoding added for compressed copies,
+    and the modified time and size of the file that is sent.
+    So while an export is replacing the files, or after one failed,
+    a file whose bytes don't match the manifest never gets its ETag.
+    ``If-None-Match`` and ``Range`` requests are answered by ``send_file``.
+    The ``Content-Encoding`` header stops flask-compress compressing it again.
+
+    Args:
+        path: Path to the file, relative to the app.
+        mimetype: Mimetype of the file.
+        download_name: File name of the attachment.
+        digest: SHA-256 of the file, if it's known.
+        precompressed: Whether compressed copies are written next to the file.
+
+    Returns:
+        Send file response.
+    """
+    encoding = None
+    if precompressed and digest is not None:
+        encoding = next(
+            (
+                name
+                for name, suffix in ARCHIVE_ENCODINGS
+                if request.accept_encodings[name]
+                and os.path.exists(_app_path(f"{path}{suffix}"))
+            ),
+            None,
+        )
+
+    suffix = dict(ARCHIVE_ENCODINGS).get(encoding, "")
+    etag: Union[bool, str] = True
+    if digest is not None:
+        stat = os.stat(_app_path(f"{path}{suffix}"))
+        etag = "-".join(
+            [digest]
+            + ([encoding] if encoding else [])
+            + [f"{stat.st_mtime_ns:x}", f"{stat.st_size:x}"]
+        )
+
+    response = send_file(
+        f"{path}{suffix}",
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=download_name,
+        conditional=True,
+        etag=etag,
+    )
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    if precompressed:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def _app_path(path: str) -> str:
+    """
+    Gets the path of a file relative to the app.
+
+    Args:
+        path: Relative path.
 
     Returns:
-        Send file response of archive export csv.
+        Absolute path.
     """
-    return send_file("../data/archive_export.csv", as_attachment=True)
+    return os.path.join(current_app.root_path, path)
@@ -57,16 +57,10 @@ def all() -> Response:
     )
     sort_filter = services.filters.SortFilter(sort=sort)
 
-    films = services.film.search(
-        query, query_filter, sort_filter, page=int(page)
-    )
-    distributors = services.distributor.search(query)
-    countries = services.country.search(query)
-
     return jsonify(
-        films=films,
-        distributors=distributors,
-        countries=countries,
+        services.search.search_all(
+            query, query_filter, sort_filter, page=int(page)
+        )
     )
 
 
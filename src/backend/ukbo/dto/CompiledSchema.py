@@ -0,0 +1,133 @@
+import datetime
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import orjson
+from marshmallow import fields
+
+# Fast conversions for the field types of the auto schemas.
+# Other fields fall back to the field's own serialisation.
+CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    fields.Integer: int,
+    fields.Float: float,
+    fields.String: str,
+    fields.Boolean: bool,
+    fields.DateTime: datetime.datetime.isoformat,
+    fields.Date: datetime.date.isoformat,
+}
+
+
+class Computed(NamedTuple):
+    """
+    A SQL expression for a schema field that is computed in Python,
+    such as a ``ma.Function`` field.
+
+    Attributes:
+        expression: SQL expression of the value.
+        convert: Function to convert the value of the expression.
+    """
+
+    expression: Any
+    convert: Callable[[Any], Any] = lambda value: value
+
+
+@lru_cache(maxsize=None)
+def schema_fields(schema: type) -> Tuple[Tuple[str, fields.Field], ...]:
+    """
+    Gets the dump fields of a schema, in its dump order.
+    Schemas are slow to build, so they are only built once.
+
+    Args:
+        schema: Marshmallow schema class.
+
+    Returns:
+        Tuple of field names and fields.
+    """
+    return tuple(schema().dump_fields.items())
+
+
+class CompiledSchema:
+    """
+    Serialises Core result rows the same way as a marshmallow schema.
+
+    The schema stays the contract for the output,
+    its fields are read once and each is compiled to a labelled column
+    and a plain function to convert its value.
+    Columns of the schema's model are found by name.
+    Fields computed in Python must be given as SQL expressions.
+
+    Attributes:
+        fields: Names of the fields, in the schema's dump order.
+        columns: Labelled columns to select, one per field.
+    """
+
+    def __init__(
+        self, schema: type, computed: Optional[Dict[str, Computed]] = None
+    ) -> None:
+        computed = computed or {}
+        model = schema.Meta.model  # type: ignore
+        self.fields: List[str] = []
+        self.columns: List[Any] = []
+        self._converters: List[Callable[[Any], Any]] = []
+
+        for name, field in schema_fields(schema):
+            if name in computed:
+                expression, convert = computed[name]
+            elif isinstance(field, (fields.Function, fields.Method)):
+                raise ValueError(f"{name} must be given as a SQL expression.")
+            else:
+                expression = getattr(model, field.attribute or name)
+                convert = CONVERTERS.get(type(field), _serializer(field, name))
+            self.fields.append(name)
+            self.columns.append(expression.label(name))
+            self._converters.append(convert)
+
+    def dump(self, row: Iterable[Any]) -> Dict[str, Any]:
+        """
+        Serialises a row of the columns.
+
+        Args:
+            row: Result row, with a value for each column in order.
+
+        Returns:
+            Dictionary of the row, as the schema would dump it.
+        """
+        return {
+            name: None if value is None else convert(value)
+            for name, convert, value in zip(self.fields, self._converters, row)
+        }
+
+    def dumps(self, data: Any) -> bytes:
+        """
+        Serialises data to JSON with sorted keys, like ``jsonify``.
+
+        Args:
+            data: Data of dumped rows.
+
+        Returns:
+            JSON bytes.
+        """
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+
+
+def _serializer(field: fields.Field, name: str) -> Callable[[Any], Any]:
+    """
+    Builds a function that converts a value with a field.
+
+    Args:
+        field: Marshmallow field.
+        name: Name of the field.
+
+    Returns:
+        Function to convert a value.
+    """
+    return lambda value: field._serialize(value, name, None)
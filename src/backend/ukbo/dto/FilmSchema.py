@@ -13,6 +13,7 @@ class FilmWeekSchemaStrict(ma.SQLAlchemyAutoSchema):
 
     class Meta:
         model = models.Film_Week
+        exclude = ["year", "iso_week"]
 
     date = ma.Function(lambda obj: obj.date.strftime("%Y-%m-%d"))
 
@@ -66,6 +67,7 @@ class FilmWeekSchema(ma.SQLAlchemyAutoSchema):
 
     class Meta:
         model = models.Film_Week
+        exclude = ["year", "iso_week"]
 
     date = ma.Function(lambda obj: obj.date.strftime("%Y-%m-%d"))
     film_slug = ma.Function(lambda obj: obj.film.slug)
@@ -87,6 +89,7 @@ class FilmWeekSchemaArchive(ma.SQLAlchemyAutoSchema):
 
     class Meta:
         model = models.Film_Week
+        exclude = ["year", "iso_week"]
 
     date = ma.Function(lambda obj: obj.date.strftime("%Y%m%d"))
     film = ma.Function(lambda obj: obj.film.name)
@@ -9,5 +9,6 @@ class WeekSchema(ma.SQLAlchemyAutoSchema):
 
     class Meta:
         model = models.Week
+        exclude = ["year", "iso_week"]
 
     date = ma.Function(lambda obj: obj.date.strftime("%Y-%m-%d"))
@@ -6,6 +6,7 @@ DTOs are used to serialize the data that is sent to the API.
 
 """
 
+from .CompiledSchema import CompiledSchema, Computed
 from .CountrySchema import CountrySchema
 from .DistributorSchema import DistributorSchema
 from .EventSchema import EventSchema
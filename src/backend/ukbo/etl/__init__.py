@@ -21,4 +21,4 @@ Commands
 
 """
 
-from . import commands, extract, load, tasks, transform
+from . import archive, commands, extract, load, resolver, tasks, transform
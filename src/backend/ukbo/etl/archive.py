@@ -0,0 +1,449 @@
+"""Exports the box office archive files."""
+
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import brotli  # type: ignore
+import pandas as pd
+import pyarrow as pa  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+from flask import current_app
+from sqlalchemy.sql import func
+from ukbo import models, services
+from ukbo.extensions import db
+
+PARQUET_FILE = "part-0.parquet"
+BLOCK_SIZE = 1024 * 1024
+BROTLI_QUALITY = 9
+
+# Names repeat on every week of a film, so they are dictionary encoded.
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("date", pa.date32()),
+        ("rank", pa.int32()),
+        ("film", pa.dictionary(pa.int32(), pa.string())),
+        ("country", pa.dictionary(pa.int32(), pa.string())),
+        ("weekend_gross", pa.int64()),
+        ("distributor", pa.dictionary(pa.int32(), pa.string())),
+        ("weeks_on_release", pa.int32()),
+        ("number_of_cinemas", pa.int32()),
+        ("total_gross", pa.int64()),
+        ("week_gross", pa.int64()),
+    ]
+)
+
+
+def manifest_path(path: str) -> str:
+    """
+    Gets the path of the manifest kept next to an archive file.
+
+    Args:
+        path: Path to the archive file.
+
+    Returns:
+        Path to the manifest file.
+    """
+    return f"{os.path.splitext(path)[0]}.json"
+
+
+def parquet_path(path: str) -> str:
+    """
+    Gets the path of the Parquet file kept next to an archive file.
+
+    Args:
+        path: Path to the archive file.
+
+    Returns:
+        Path to the Parquet file of all years.
+    """
+    return f"{os.path.splitext(path)[0]}.parquet"
+
+
+def partition_path(path: str, year: int) -> str:
+    """
+    Gets the path of one year of the Parquet dataset of an archive file.
+    The dataset is partitioned by year, in ``year=YYYY`` directories.
+
+    Args:
+        path: Path to the archive file.
+        year: Year of the partition.
+
+    Returns:
+        Path to the Parquet file of the year.
+    """
+    return os.path.join(
+        os.path.splitext(path)[0], f"year={year}", PARQUET_FILE
+    )
+
+
+def read_manifest(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Reads the manifest of an archive file.
+
+    Args:
+        path: Path to the archive file.
+
+    Returns:
+        Manifest, or None if there isn't a valid one.
+    """
+    try:
+        with open(manifest_path(path)) as f:
+            manifest = json.load(f)
+        manifest["last_date"] = datetime.date.fromisoformat(
+            manifest["last_date"]
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return manifest
+
+
+def write_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    """
+    Writes the manifest of an archive file.
+
+    Args:
+        path: Path to the archive file.
+        manifest: Manifest to write.
+    """
+    target = manifest_path(path)
+    temp = f"{target}.tmp"
+    with open(temp, "w") as f:
+        json.dump(manifest, f, default=str, indent=2)
+    os.replace(temp, target)
+
+
+def export(
+    path: str, full: bool = False, chunksize: int = 10000
+) -> Dict[str, Any]:
+    """
+    Exports the box office archive to a csv file and a Parquet dataset.
+
+    The manifest records the last date exported, the number of rows,
+    the highest film week ID and a checksum of the figures up to that date,
+    the size of the csv file, and the SHA-256 of each file.
+    Gzip and Brotli copies of the csv file are written next to it.
+    If the files and their manifest are up to date with the database
+    before that date, only the newer weeks are added.
+    Otherwise the files are rebuilt, streamed from the database in chunks.
+
+    The csv file and its copies are written to temporary files,
+    and only replace the live files once the manifest is written.
+    So a failed export leaves the live csv file as it was,
+    and the next export starts again from it.
+
+    Args:
+        path: Path to the archive csv file.
+        full: Rebuild the files even if they could be added to.
+        chunksize: Number of rows to write per chunk.
+
+    Returns:
+        Manifest of the archive files.
+    """
+    manifest = None if full else read_manifest(path)
+    if manifest is not None and not _can_append(path, manifest):
+        manifest = None
+
+    after = _midnight(manifest["last_date"]) if manifest is not None else None
+    temp, last_date, rows = export_csv(path, after, chunksize)
+    export_parquet(path, _years(after), rebuild=after is None)
+    sha256 = {
+        "csv": compress(temp),
+        "parquet": file_sha256(parquet_path(path)),
+    }
+
+    if manifest is None:
+        current_app.logger.info(f"Rebuilt archive with {rows} rows.")
+    else:
+        current_app.logger.info(f"Appended {rows} rows to the archive.")
+        last_date = last_date or manifest["last_date"]
+        rows += manifest["rows"]
+
+    _, max_id, checksum = _fingerprint(last_date)
+    manifest = {
+        "last_date": last_date,
+        "rows": rows,
+        "max_id": max_id,
+        "checksum": checksum,
+        "size": os.path.getsize(temp),
+        "sha256": sha256,
+    }
+    if last_date is not None:
+        write_manifest(path, manifest)
+    elif os.path.exists(manifest_path(path)):
+        os.remove(manifest_path(path))
+
+    for suffix in ("", ".gz", ".br"):
+        os.replace(f"{temp}{suffix}", f"{path}{suffix}")
+    return manifest
+
+
+def export_csv(
+    path: str, after: Optional[datetime.datetime], chunksize: int = 10000
+) -> Tuple[str, Optional[datetime.date], int]:
+    """
+    Writes the archive rows to a temporary copy of a csv file,
+    one chunk at a time.
+
+    Args:
+        path: Path to the file.
+        after: Append the weeks after this date, or rebuild the file if None.
+        chunksize: Number of rows to write per chunk.
+
+    Returns:
+        Path to the temporary file, last date written
+        and the number of rows written.
+    """
+    last_date = None
+    rows = 0
+
+    temp = f"{path}.tmp"
+    if after is None:
+        pd.DataFrame(columns=services.boxoffice.ARCHIVE_COLUMNS).to_csv(
+            temp, index=False
+        )
+    else:
+        shutil.copyfile(path, temp)
+
+    for chunk in services.boxoffice.archive_chunks(after, chunksize):
+        chunk.to_csv(
+            temp, mode="a", header=False, index=False, date_format="%Y%m%d"
+        )
+        last_date = chunk["date"].max().date()
+        rows += len(chunk)
+
+    return temp, last_date, rows
+
+
+def export_parquet(
+    path: str, years: Iterable[int], rebuild: bool = False
+) -> None:
+    """
+    Writes the archive rows to a Parquet dataset partitioned by year,
+    and to one Parquet file of all years.
+
+    Each year is rewritten whole from the database,
+    then the file of all years is put together from the partitions.
+
+    Args:
+        path: Path to the archive csv file.
+        years: Years to write.
+        rebuild: Remove the years that aren't written.
+    """
+    dataset = os.path.splitext(path)[0]
+    if rebuild and os.path.isdir(dataset):
+        shutil.rmtree(dataset)
+
+    for year in years:
+        target = partition_path(path, year)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        _write_parquet(
+            target,
+            (
+                to_arrow(chunk)
+                for chunk in services.boxoffice.archive_chunks(year=year)
+            ),
+        )
+
+    _write_parquet(
+        parquet_path(path),
+        (pq.read_table(partition_path(path, year)) for year in _written(path)),
+    )
+
+
+def compress(path: str) -> str:
+    """
+    Writes gzip and Brotli copies of a file next to it,
+    so they can be served without compressing them on each request.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        SHA-256 of the file.
+    """
+    digest = hashlib.sha256()
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    with open(path, "rb") as source, open(f"{path}.gz.tmp", "wb") as gz_file:
+        with open(f"{path}.br.tmp", "wb") as br_file:
+            # No file name or time in the header, so the copy only
+            # changes when the file does.
+            with gzip.GzipFile(
+                filename="", mode="wb", fileobj=gz_file, mtime=0
+            ) as gz:
+                for block in iter(lambda: source.read(BLOCK_SIZE), b""):
+                    digest.update(block)
+                    gz.write(block)
+                    br_file.write(compressor.process(block))
+            br_file.write(compressor.finish())
+
+    os.replace(f"{path}.gz.tmp", f"{path}.gz")
+    os.replace(f"{path}.br.tmp", f"{path}.br")
+    return digest.hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    """
+    Gets the SHA-256 of a file.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        Hex digest of the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """
+    Converts a dataframe of archive rows to the typed Arrow schema.
+
+    Args:
+        df: Pandas dataframe of archive rows.
+
+    Returns:
+        Arrow table of archive rows.
+    """
+    return pa.Table.from_pandas(
+        df, schema=ARCHIVE_SCHEMA, preserve_index=False
+    )
+
+
+def _write_parquet(path: str, tables: Iterable[pa.Table]) -> None:
+    """
+    Writes tables to one Parquet file, replacing it once it's complete.
+
+    Args:
+        path: Path to the file.
+        tables: Arrow tables to write, with the archive schema.
+    """
+    temp = f"{path}.tmp"
+    with pq.ParquetWriter(temp, ARCHIVE_SCHEMA) as writer:
+        for table in tables:
+            writer.write_table(table)
+    os.replace(temp, path)
+
+
+def _written(path: str) -> List[int]:
+    """
+    Gets the years of the Parquet dataset of an archive file.
+
+    Args:
+        path: Path to the archive file.
+
+    Returns:
+        Sorted list of years.
+    """
+    dataset = os.path.splitext(path)[0]
+    if not os.path.isdir(dataset):
+        return []
+    return sorted(
+        int(name.split("=", 1)[1])
+        for name in os.listdir(dataset)
+        if name.startswith("year=")
+        and os.path.exists(os.path.join(dataset, name, PARQUET_FILE))
+    )
+
+
+def _years(after: Optional[datetime.datetime]) -> List[int]:
+    """
+    Gets the years with weeks after a date.
+
+    Args:
+        after: Date to check after, or None for all years.
+
+    Returns:
+        Sorted list of years.
+    """
+    year = models.Film_Week.year
+    query = db.session.query(year).distinct()
+    if after is not None:
+        query = query.filter(models.Film_Week.date > after)
+    return sorted(int(i[0]) for i in query)
+
+
+def _can_append(path: str, manifest: Dict[str, Any]) -> bool:
+    """
+    Checks an archive file still matches the database up to its last date.
+    Weeks that were rolled back or deleted change the row count,
+    and weeks that were loaded again are new rows with higher IDs,
+    or different figures if the database reused the IDs.
+    The csv file must also be the one the manifest was written for.
+
+    Args:
+        path: Path to the archive file.
+        manifest: Manifest of the archive file.
+
+    Returns:
+        Whether newer weeks can be added to the files.
+    """
+    if not os.path.exists(path) or not os.path.exists(parquet_path(path)):
+        return False
+
+    if os.path.getsize(path) != manifest.get("size"):
+        return False
+
+    rows, max_id, checksum = _fingerprint(manifest["last_date"])
+    return (
+        rows == manifest.get("rows")
+        and max_id == manifest.get("max_id")
+        and checksum == manifest.get("checksum")
+    )
+
+
+def _fingerprint(
+    last_date: Optional[datetime.date],
+) -> Tuple[int, Optional[int], Optional[int]]:
+    """
+    Gets the row count, highest ID and a checksum of the figures
+    of the film weeks up to a date, in one query.
+
+    Args:
+        last_date: Last date exported, or None for no weeks.
+
+    Returns:
+        Count, highest ID and sum of the figures of the film weeks.
+    """
+    if last_date is None:
+        return 0, None, None
+    week = models.Film_Week
+    rows, max_id, checksum = (
+        db.session.query(
+            func.count(week.id),
+            func.max(week.id),
+            func.sum(
+                week.rank
+                + week.weeks_on_release
+                + week.number_of_cinemas
+                + week.weekend_gross
+                + week.week_gross
+                + week.total_gross
+            ),
+        )
+        .filter(week.date <= _midnight(last_date))
+        .one()
+    )
+    return rows, max_id, checksum
+
+
+def _midnight(date: datetime.date) -> datetime.datetime:
+    """
+    Converts a date to a datetime, to compare with the film week dates.
+
+    Args:
+        date: Date to convert.
+
+    Returns:
+        Datetime at midnight of the date.
+    """
+    return datetime.datetime.combine(date, datetime.time())
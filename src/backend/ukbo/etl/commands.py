@@ -1,3 +1,5 @@
+from typing import Optional
+
 import click
 from flask.cli import with_appcontext
 
@@ -18,12 +20,31 @@ def init_db_command() -> None:
 
 @click.command("fill-db")
 @click.option("--path", help="Path to archive.csv", type=str)
+@click.option("--bulk", help="Use the bulk loader", is_flag=True)
+@click.option("--chunksize", help="Rows to stream per chunk", type=int)
+@click.option("--restart", help="Ignore the seed checkpoint", is_flag=True)
+@click.option("--workers", help="Processes to seed years across", type=int)
 @with_appcontext
-def fill_db_command(path: str = "./data/archive.csv") -> None:
+def fill_db_command(
+    path: str = "./data/archive.csv",
+    bulk: bool = False,
+    chunksize: Optional[int] = None,
+    restart: bool = False,
+    workers: Optional[int] = None,
+) -> None:
     """
     Seeds database with archive data.
+
+    With a chunksize the archive is streamed, and resumes from a checkpoint.
+    With workers the years are seeded in parallel processes.
     """
-    tasks.seed_db(path)
+    tasks.seed_db(
+        path,
+        bulk=bulk,
+        chunksize=chunksize,
+        restart=restart,
+        workers=workers,
+    )
     click.echo("Filled the database.")
 
 
@@ -52,18 +73,20 @@ def seed_films_command(path: str = "./data/archive.csv") -> None:
 @click.command("seed-box-office")
 @click.option("--year", help="Year to seed", type=int)
 @click.option("--path", help="Path to archive.csv", type=str)
+@click.option("--bulk", help="Use the bulk loader", is_flag=True)
 @with_appcontext
 def seed_box_office_command(
-    year: int, path: str = "./data/archive.csv"
+    year: int, path: str = "./data/archive.csv", bulk: bool = False
 ) -> None:
     """
     Seeds database with box office data.
 
     Args:
         year: Year to seed.
+        bulk: Use the bulk loader.
 
     """
-    tasks.seed_box_office(path, year=year)
+    tasks.seed_box_office(path, bulk=bulk, year=year)
     click.echo("Seeded box office data")
 
 
@@ -192,11 +215,23 @@ def delete_film_command(film: int) -> None:
     click.echo(f"Deleted {film}")
 
 
+@click.command("refresh-film-stats")
+@with_appcontext
+def refresh_film_stats_command() -> None:
+    """
+    Refreshes the precomputed totals and leaderboard of every film,
+    and the yearly box office of every distributor and country.
+    """
+    tasks.refresh_film_stats()
+    click.echo("Refreshed film stats.")
+
+
 @click.command("build-archive")
+@click.option("--full", help="Rebuild the whole archive", is_flag=True)
 @with_appcontext
-def build_archive_command() -> None:
+def build_archive_command(full: bool = False) -> None:
     """
     Builds the box office archive file from the database.
     """
-    tasks.build_archive()
+    tasks.build_archive(full=full)
     click.echo("Built archive file.")
@@ -184,10 +184,7 @@ def extract_box_office(path: str) -> pd.DataFrame:
     df = df.astype(
         {
             "rank": int,
-            "film": str,
-            "country": str,
             "weekend_gross": int,
-            "distributor": str,
             "weeks_on_release": int,
             "number_of_cinemas": int,
             "total_gross": int,
@@ -195,11 +192,13 @@ def extract_box_office(path: str) -> pd.DataFrame:
     )
 
     df.insert(0, "date", date)
-    df["film"] = df["film"].map(services.film.spellcheck_film)
-    df["distributor"] = df["distributor"].map(
-        services.distributor.spellcheck_distributor
+    df["film"] = services.corrections.films.correct_series(df["film"])
+    df["distributor"] = services.corrections.distributors.correct_series(
+        df["distributor"]
     )
-    df["country"] = df["country"].map(services.country.spellcheck_country)
-    df["week_gross"] = df.apply(transform.get_week_box_office, axis=1)
+    df["country"] = services.corrections.countries.correct_series(
+        df["country"]
+    )
+    df["week_gross"] = transform.get_week_box_office_batch(df)
 
     return df
@@ -1,10 +1,27 @@
-from typing import Any, Dict, List, Union
+import io
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
 
 import numpy as np
 import pandas as pd
+from sqlalchemy import bindparam, create_engine
+from sqlalchemy.engine import Connection
 from ukbo import models, services
 from ukbo.extensions import db
 
+from .resolver import EntityResolver
+
+FILM_WEEK_COLUMNS = [
+    "film_id",
+    "date",
+    "rank",
+    "weeks_on_release",
+    "number_of_cinemas",
+    "weekend_gross",
+    "week_gross",
+    "total_gross",
+    "site_average",
+]
+
 
 def load_distributors(list_of_distributors: List[str]) -> None:
     """
@@ -17,10 +34,8 @@ def load_distributors(list_of_distributors: List[str]) -> None:
     Returns:
         None
     """
-    for distributor in set(list_of_distributors):
-        distributor = str(distributor)
-        services.distributor.add_distributor(distributor)
-        db.session.commit()
+    resolve_named(models.Distributor, {str(i) for i in list_of_distributors})
+    db.session.commit()
 
 
 def load_countries(list_of_countries: List[str]) -> None:
@@ -34,10 +49,8 @@ def load_countries(list_of_countries: List[str]) -> None:
     Returns:
         None
     """
-
-    for country in set(list_of_countries):
-        services.country.add_country(country)
-        db.session.commit()
+    resolve_named(models.Country, set(list_of_countries))
+    db.session.commit()
 
 
 def load_films(list_of_films: List[Dict[str, Any]]) -> None:
@@ -50,20 +63,75 @@ def load_films(list_of_films: List[Dict[str, Any]]) -> None:
     Returns:
         None
     """
+    resolve_films(list_of_films)
 
-    for film in list_of_films:
-        distributor = services.distributor.add_distributor(film["distributor"])
-        countries = services.country.add_country(film["country"])
-        film = services.film.add_film(
-            film=film["film"], distributors=distributor, countries=countries
-        )
-        db.session.commit()
+
+def resolve_films(
+    films: List[Dict[str, Any]], resolver: Optional[EntityResolver] = None
+) -> List[int]:
+    """
+    Resolves films to their database ID, creating any that are missing.
+
+    Follows the same rules as ``services.film.add_film``,
+    a film matches on its name and any of its distributors.
+
+    Args:
+        films: List of films, with film, distributor and country names.
+        resolver: Resolver to reuse across loads, a new one by default.
+            A shared resolver's warnings are left for its owner to report.
+
+    Returns:
+        List of film IDs in the same order as the films.
+    """
+    owned = resolver is None
+    resolver = resolver if resolver is not None else EntityResolver()
+
+    records = [
+        resolver.film(film["film"], film["distributor"], film["country"])
+        for film in films
+    ]
+    resolver.flush()
+    db.session.commit()
+    if owned:
+        resolver.report()
+
+    return [record["id"] for record in records]
+
+
+def resolve_named(
+    model: Union[models.Country, models.Distributor],
+    names: Set[str],
+    resolver: Optional[EntityResolver] = None,
+) -> Dict[str, int]:
+    """
+    Resolves countries or distributors to their database ID by slug.
+    Names are split on ``/`` and spellchecked, and any missing are created.
+
+    Args:
+        model: Country or Distributor model.
+        names: Set of names to resolve.
+        resolver: Resolver to reuse across loads, a new one by default.
+
+    Returns:
+        Dictionary of slug to ID.
+    """
+    resolver = resolver if resolver is not None else EntityResolver()
+    if model is models.Country:
+        resolve, known = resolver.country_slugs, resolver.countries
+    else:
+        resolve, known = resolver.distributor_slugs, resolver.distributors
+
+    slugs = {slug for name in names for slug in resolve(name)}
+    resolver.flush()
+
+    return {slug: known[slug] for slug in slugs}  # type: ignore
 
 
 def load_weeks(df: pd.DataFrame, **kwargs: Any) -> None:
     """
     Loads nested lists of film weeks into the database.
     And their associated film + distributor.
+    The Weeks are merged once for the whole dataframe.
 
     Args:
         df: Pandas dataframe of film weeks.
@@ -98,6 +166,10 @@ def load_weeks(df: pd.DataFrame, **kwargs: Any) -> None:
     )
     films_list = group_films.to_dict(orient="records")
 
+    services.week.merge_weeks(df)
+
+    film_ids = set()
+    warnings: List[str] = []
     for film in films_list:
 
         # if a film does not have a country
@@ -118,17 +190,23 @@ def load_weeks(df: pd.DataFrame, **kwargs: Any) -> None:
                 str(film["distributor"])
             )
 
-        title = services.film.add_film(film=str(film["film"]), countries=countries, distributors=distributors)  # type: ignore
+        title = services.film.add_film(film=str(film["film"]), countries=countries, distributors=distributors, warnings=warnings)  # type: ignore
 
         record = {"film": title}
 
+        # Replace the film's weeks if the sheet was loaded before.
+        models.Film_Week.query.filter(
+            models.Film_Week.film_id == title.id,
+            models.Film_Week.date.in_(
+                [week["date"] for week in film["weeks"]]
+            ),
+        ).delete(synchronize_session=False)
+
         for week in film["weeks"]:
             # Clear empty data.
             if np.isnan(week["number_of_cinemas"]):
                 week["number_of_cinemas"] = 0
 
-            services.week.add_week(**week)
-
             if week["number_of_cinemas"] > 0:
                 week["site_average"] = (
                     week["weekend_gross"] / week["number_of_cinemas"]
@@ -140,6 +218,202 @@ def load_weeks(df: pd.DataFrame, **kwargs: Any) -> None:
             models.Film_Week.create(**record, commit=False)
 
         db.session.commit()
+        film_ids.add(title.id)
+
+    refresh_films(film_ids, df["date"].dt.year.unique().tolist())
+    db.session.commit()
+    services.events.summarise(models.Area.etl, models.State.warning, warnings)
+
+
+def bulk_load_weeks(
+    df: pd.DataFrame,
+    chunksize: int = 10000,
+    resolver: Optional[EntityResolver] = None,
+    commit: bool = True,
+    **kwargs: Any,
+) -> None:
+    """
+    Loads film weeks into the database with set based queries.
+    And their associated film + distributor.
+
+    Produces the same rows as ``load_weeks``, but countries, distributors
+    and films are resolved through an ``EntityResolver``,
+    and film weeks are written with ``executemany`` (or ``COPY`` on Postgres)
+    in one transaction per chunk.
+
+    Args:
+        df: Pandas dataframe of film weeks.
+        chunksize: Number of film weeks to write per transaction.
+        resolver: Resolver to reuse across loads, a new one by default.
+        commit: Commit the film weeks, otherwise the caller commits them.
+        **kwargs: Keyword arguments.
+
+    Returns:
+        None
+    """
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"], format="%Y%m%d", yearfirst=True)
+    if kwargs.get("year") is not None:
+        df = df.loc[df["date"].dt.year == kwargs["year"]]
+
+    if df.empty:
+        return None
+
+    df = prepare_film_weeks(df, resolver)
+
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start : start + chunksize]
+
+        insert_film_weeks(chunk, db.session.connection())
+        if commit:
+            db.session.commit()
+
+    services.week.merge_weeks(df)
+    refresh_films(
+        df["film_id"].unique().tolist(), df["date"].dt.year.unique().tolist()
+    )
+    if commit:
+        db.session.commit()
+
+    return None
+
+
+def prepare_film_weeks(
+    df: pd.DataFrame, resolver: Optional[EntityResolver] = None
+) -> pd.DataFrame:
+    """
+    Resolves the films of a dataframe of film weeks,
+    and fills in the columns needed to write them.
+
+    Args:
+        df: Pandas dataframe of film weeks, with parsed dates.
+        resolver: Resolver to reuse across loads, a new one by default.
+            A shared resolver's warnings are left for its owner to report.
+
+    Returns:
+        Dataframe of film weeks with film IDs and site averages.
+    """
+    keys = ["film", "distributor", "country"]
+    groups = df.groupby(keys, dropna=False)
+    films = groups.size().reset_index()[keys].to_dict(orient="records")
+    film_ids = np.array(resolve_films(films, resolver))
+
+    df = df.copy()
+    df["film_id"] = film_ids[groups.ngroup().to_numpy()]
+
+    # Clear empty data.
+    df["number_of_cinemas"] = df["number_of_cinemas"].fillna(0).astype(int)
+    df["site_average"] = np.where(
+        df["number_of_cinemas"] > 0,
+        df["weekend_gross"]
+        / df["number_of_cinemas"].where(df["number_of_cinemas"] > 0, 1),
+        0,
+    )
+    return df
+
+
+def insert_film_weeks(df: pd.DataFrame, connection: Connection) -> None:
+    """
+    Writes film weeks to the database.
+    Uses ``COPY`` when the database is Postgres, otherwise ``executemany``.
+    Film weeks already written for the same films and dates are replaced,
+    so applying a sheet twice doesn't duplicate them.
+
+    Args:
+        df: Dataframe of film weeks, with the ``FILM_WEEK_COLUMNS``.
+        connection: Connection to write with.
+    """
+    df = df[FILM_WEEK_COLUMNS]
+    if df.empty:
+        return None
+
+    delete_film_weeks(df, connection)
+
+    if connection.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {models.Film_Week.__tablename__} "
+                f"({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        return None
+
+    connection.execute(
+        models.Film_Week.__table__.insert(), df.to_dict(orient="records")
+    )
+    return None
+
+
+def delete_film_weeks(df: pd.DataFrame, connection: Connection) -> None:
+    """
+    Deletes the film weeks of the films and dates of a dataframe.
+    One statement per date, which uses the index on ``film_week.date``.
+
+    Args:
+        df: Dataframe of film weeks, with film IDs and dates.
+        connection: Connection to write with.
+    """
+    table = models.Film_Week.__table__
+    for date, film_ids in df.groupby("date")["film_id"]:
+        connection.execute(
+            table.delete().where(
+                table.c.date == pd.Timestamp(date).to_pydatetime(),
+                table.c.film_id.in_(
+                    bindparam(
+                        "film_ids",
+                        film_ids.unique().tolist(),
+                        literal_execute=True,
+                    )
+                ),
+            )
+        )
+    return None
+
+
+def load_film_week_partition(database_uri: str, df: pd.DataFrame) -> int:
+    """
+    Writes a partition of film weeks over its own connection.
+
+    This runs in a worker process of a parallel seed,
+    so it uses its own engine rather than the app session.
+
+    Args:
+        database_uri: URI of the database.
+        df: Dataframe of film weeks, with the ``FILM_WEEK_COLUMNS``.
+
+    Returns:
+        Number of film weeks written.
+    """
+    engine = create_engine(database_uri)
+    try:
+        with engine.begin() as connection:
+            insert_film_weeks(df, connection)
+    finally:
+        engine.dispose()
+    return len(df)
+
+
+def refresh_films(
+    film_ids: Optional[Iterable[int]] = None,
+    years: Optional[Iterable[int]] = None,
+) -> None:
+    """
+    Refreshes the precomputed film totals, leaderboard
+    and distributor and country rollups of the films whose weeks have changed.
+    The years are marked for the market share task to recalculate.
+
+    Args:
+        film_ids: IDs of the films to refresh, or all films if None.
+        years: Years of the weeks that changed, or all years if None.
+    """
+    film_ids = list(film_ids) if film_ids is not None else None
+    services.film.refresh_stats(film_ids)
+    services.boxoffice.refresh_leaderboard(film_ids)
+    services.rollup.refresh_films(film_ids, years)
+    services.market_share.mark_years(years)
 
 
 def load_admissions(data: Union[Any, Any]) -> None:
@@ -0,0 +1,371 @@
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+from slugify import slugify  # type: ignore
+from ukbo import models, services
+from ukbo.extensions import db
+
+
+class EntityResolver:
+    """
+    Resolves countries, distributors and films to their IDs for one load.
+
+    The resolver is an identity map of slug to ID for each table,
+    warmed up front with one query per table.
+    So the same distributor on many rows is only looked up once.
+    New entities are held back and inserted in batches.
+
+    Films follow the same rules as ``services.film.add_film``,
+    a film matches on its name and any of its distributors.
+    Names that only differ by case, accents, punctuation or articles
+    are merged, and similar names are reported as possible duplicates.
+    Warnings are collected, and written as one event by ``report``,
+    so nothing is committed while resolving.
+
+    Attributes:
+        batch_size: Number of new films to hold before they are flushed.
+        countries: Country slug to ID.
+        distributors: Distributor slug to ID.
+        films: Film name to a list of matching film records.
+        film_slugs: Film slug to film record.
+        matcher: Fuzzy index of film records by slug.
+        warnings: Duplicate warnings not yet reported.
+    """
+
+    def __init__(self, batch_size: int = 1000) -> None:
+        self.batch_size = batch_size
+
+        self.countries: Dict[str, Optional[int]] = dict(
+            db.session.query(models.Country.slug, models.Country.id)
+        )
+        self.distributors: Dict[str, Optional[int]] = dict(
+            db.session.query(models.Distributor.slug, models.Distributor.id)
+        )
+
+        self.films: Dict[str, List[Dict[str, Any]]] = {}
+        self.film_slugs: Dict[str, Dict[str, Any]] = {}
+        self.matcher = services.matcher.FuzzyIndex()
+        by_id: Dict[int, Dict[str, Any]] = {}
+        for film_id, name, slug in db.session.query(
+            models.Film.id, models.Film.name, models.Film.slug
+        ).order_by(models.Film.id):
+            film = {
+                "id": film_id,
+                "name": name,
+                "slug": slug,
+                "distributors": set(),
+            }
+            self.films.setdefault(name, []).append(film)
+            self.film_slugs[slug] = film
+            self.matcher.add(slug, name)
+            by_id[film_id] = film
+
+        for film_id, slug in db.session.query(
+            models.distributors.c.film_id, models.Distributor.slug
+        ).join(
+            models.Distributor,
+            models.Distributor.id == models.distributors.c.distributor_id,
+        ):
+            by_id[film_id]["distributors"].add(slug)
+
+        self._new_countries: Dict[str, str] = {}
+        self._new_distributors: Dict[str, str] = {}
+        self._new_films: List[Dict[str, Any]] = []
+        self.warnings: List[str] = []
+
+    def country_slugs(self, country: Optional[str]) -> List[str]:
+        """
+        Resolves a ``/`` separated list of countries to their slugs.
+        Countries that do not exist are added to the next flush.
+
+        Args:
+            country: Countries separated by ``/``.
+
+        Returns:
+            List of country slugs.
+        """
+        return self._resolve_named(
+            country,
+            services.country.spellcheck_country,
+            self.countries,
+            self._new_countries,
+        )
+
+    def distributor_slugs(self, distributor: Optional[str]) -> List[str]:
+        """
+        Resolves a ``/`` separated list of distributors to their slugs.
+        Distributors that do not exist are added to the next flush.
+
+        Args:
+            distributor: Distributors separated by ``/``.
+
+        Returns:
+            List of distributor slugs.
+        """
+        return self._resolve_named(
+            distributor,
+            services.distributor.spellcheck_distributor,
+            self.distributors,
+            self._new_distributors,
+        )
+
+    def film(
+        self, film: str, distributor: Optional[str], country: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Resolves a film, with its distributors and countries.
+        Films that do not exist are added to the next flush.
+
+        The returned record's ``id`` is set once the film is flushed.
+
+        Args:
+            film: Name of the film.
+            distributor: Distributors separated by ``/``.
+            country: Countries separated by ``/``.
+
+        Returns:
+            Film record.
+        """
+        name = str(film).strip()
+        distributors = self.distributor_slugs(distributor)
+        countries = self.country_slugs(country)
+
+        match = self._match(self.films.get(name, []), distributors)
+        if match is None:
+            match = self._match_similar(name, distributors)
+        if match is not None:
+            return match
+
+        slug = slugify(name)
+        if slug in self.film_slugs:
+            # Film exists but with a different distributor
+            self.warnings.append(f"Duplicate - {name}.")
+            if distributors:
+                first = self._distributor_name(distributors[0])
+                slug = slugify(f"{name}-{first}-{uuid.uuid4()}")
+            else:
+                slug = slugify(f"{name}-{uuid.uuid4()}")
+
+        new = {
+            "id": None,
+            "name": name,
+            "slug": slug,
+            "distributors": set(distributors),
+            "countries": set(countries),
+        }
+        self.films.setdefault(name, []).append(new)
+        self.film_slugs[slug] = new
+        self.matcher.add(slug, name)
+        self._new_films.append(new)
+
+        if len(self._new_films) >= self.batch_size:
+            self.flush()
+
+        return new
+
+    def flush(self) -> None:
+        """
+        Inserts all new countries, distributors and films.
+        Then sets the IDs of the new records.
+        """
+        self._flush_named(models.Country, self.countries, self._new_countries)
+        self._flush_named(
+            models.Distributor, self.distributors, self._new_distributors
+        )
+
+        films = self._new_films
+        if not films:
+            return None
+        self._new_films = []
+
+        models.Film.insert_many(
+            [{"name": i["name"], "slug": i["slug"]} for i in films]
+        )
+        ids = ids_by_slug(models.Film, (i["slug"] for i in films))
+        for film in films:
+            film["id"] = ids[film["slug"]]
+
+        models.insert_many(
+            models.distributors,
+            [
+                {"film_id": i["id"], "distributor_id": self.distributors[slug]}
+                for i in films
+                for slug in i["distributors"]
+                if self.distributors[slug] is not None
+            ],
+            ignore_conflicts=True,
+        )
+        models.insert_many(
+            models.countries,
+            [
+                {"film_id": i["id"], "country_id": self.countries[slug]}
+                for i in films
+                for slug in i["countries"]
+                if self.countries[slug] is not None
+            ],
+            ignore_conflicts=True,
+        )
+        return None
+
+    def report(self) -> Optional[models.Event]:
+        """
+        Writes the warnings collected so far as one event, and clears them.
+
+        Returns:
+            The Event, or None if there were no warnings.
+        """
+        warnings, self.warnings = self.warnings, []
+        return services.events.summarise(
+            models.Area.etl, models.State.warning, warnings
+        )
+
+    def _match(
+        self, films: Iterable[Dict[str, Any]], distributors: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Finds the first film record sharing any of the distributors.
+
+        Args:
+            films: Film records with the same name.
+            distributors: Distributor slugs of the film.
+
+        Returns:
+            Matching film record, or None.
+        """
+        return next(
+            (
+                i
+                for i in films
+                if not distributors or i["distributors"] & set(distributors)
+            ),
+            None,
+        )
+
+    def _match_similar(
+        self, name: str, distributors: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Finds a film whose name only differs by case, accents,
+        punctuation or articles, such as "X, The" and "The X".
+        Otherwise similar names are reported as possible duplicates.
+
+        Args:
+            name: Name of the film.
+            distributors: Distributor slugs of the film.
+
+        Returns:
+            Matching film record, or None.
+        """
+        match = self._match(
+            (self.film_slugs[slug] for slug in self.matcher.exact(name)),
+            distributors,
+        )
+        if match is not None:
+            return match
+
+        similar = [
+            self.film_slugs[slug]["name"]
+            for slug, _ in self.matcher.search(name, limit=3)
+        ]
+        if similar:
+            self.warnings.append(
+                f"Possible duplicate - {name} ~ {', '.join(similar)}."
+            )
+        return None
+
+    def _resolve_named(
+        self,
+        value: Optional[str],
+        spellcheck: Callable[[str], str],
+        known: Dict[str, Optional[int]],
+        new: Dict[str, str],
+    ) -> List[str]:
+        """
+        Resolves a ``/`` separated list of names to their slugs.
+
+        Args:
+            value: Names separated by ``/``.
+            spellcheck: Spellcheck function for the names.
+            known: Slug to ID identity map.
+            new: Slug to name of records to insert on the next flush.
+
+        Returns:
+            List of slugs.
+        """
+        if value is None or pd.isna(value) or not str(value).strip():
+            return []
+
+        slugs = []
+        for name in str(value).split("/"):
+            name = spellcheck(name.strip())
+            slug = slugify(name)
+            if slug not in known:
+                known[slug] = None
+                new[slug] = name
+            slugs.append(slug)
+        return slugs
+
+    def _flush_named(
+        self,
+        model: Any,
+        known: Dict[str, Optional[int]],
+        new: Dict[str, str],
+    ) -> None:
+        """
+        Inserts new countries or distributors and sets their IDs.
+
+        Args:
+            model: Country or Distributor model.
+            known: Slug to ID identity map.
+            new: Slug to name of records to insert.
+        """
+        if not new:
+            return None
+
+        model.insert_many(
+            [{"name": name, "slug": slug} for slug, name in new.items()],
+            ignore_conflicts=True,
+        )
+        known.update(ids_by_slug(model, new))
+        new.clear()
+        return None
+
+    def _distributor_name(self, slug: str) -> str:
+        """
+        Gets the name of a distributor from its slug.
+
+        Args:
+            slug: Distributor slug.
+
+        Returns:
+            Distributor name.
+        """
+        if slug in self._new_distributors:
+            return self._new_distributors[slug]
+        return (
+            db.session.query(models.Distributor.name)
+            .filter(models.Distributor.slug == slug)
+            .scalar()
+        )
+
+
+def ids_by_slug(model: Any, slugs: Iterable[str]) -> Dict[str, int]:
+    """
+    Gets the IDs of records by their slug.
+
+    Args:
+        model: Model with a slug column.
+        slugs: Slugs to find.
+
+    Returns:
+        Dictionary of slug to ID.
+    """
+    ids: Dict[str, int] = {}
+    for batch in models.batches(slugs):
+        ids.update(
+            db.session.query(model.slug, model.id).filter(
+                model.slug.in_(batch)
+            )
+        )
+    return ids
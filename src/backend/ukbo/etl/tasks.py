@@ -1,9 +1,11 @@
 """Scheduled tasks"""
 
+import multiprocessing
 import os
 import urllib.request
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Optional
 
 import click
 import numpy as np
@@ -11,10 +13,10 @@ import pandas as pd
 from dotenv import load_dotenv
 from flask import current_app
 from flask.cli import with_appcontext
-from sqlalchemy import extract as sqlextract
 from ukbo import db, models, scheduler, services  # type: ignore
 
-from . import extract, load
+from . import archive, extract, load
+from .resolver import EntityResolver
 
 
 @scheduler.task(
@@ -101,15 +103,13 @@ def forecast_task() -> None:
     second=00,
     timezone="UTC",
 )
-@with_appcontext
 def load_market_share() -> None:
     """
-    Loads market share data.
+    Loads market share data for the years changed since the last run.
     """
-    current_year = datetime.now().year
-    services.market_share.clear_year(current_year)
-    services.market_share.load_market_share_data("distributor")
-    # services.market_share.load_market_share_data("country")
+    with scheduler.app.app_context():
+        years = services.market_share.refresh_dirty_years()
+        current_app.logger.info(f"Market share refreshed for years {years}.")
 
 
 @with_appcontext
@@ -125,17 +125,40 @@ def clear_db() -> None:
 
 
 @with_appcontext
-def seed_db(path: str) -> None:
+def seed_db(
+    path: str,
+    bulk: bool = False,
+    chunksize: Optional[int] = None,
+    restart: bool = False,
+    workers: Optional[int] = None,
+) -> None:
     """
     Seeds database with box office data.
 
     Args:
         path: Path to the archive.csv file.
+        bulk: Use the set based bulk loader.
+        chunksize: Stream the archive in chunks of this many rows.
+        restart: Ignore the checkpoint of a previous chunked seed.
+        workers: Seed the years across this many worker processes.
 
     """
+    if workers:
+        seed_parallel(path, workers)
+        return None
+
+    if chunksize:
+        seed_chunked(path, chunksize, restart)
+        return None
+
+    if bulk:
+        # The bulk loader resolves the films itself.
+        seed_box_office(path, bulk=True)
+        return None
 
     seed_films(path)
     seed_box_office(path)
+    return None
 
 
 @with_appcontext
@@ -181,18 +204,188 @@ def seed_films(path: str) -> None:
 
 
 @with_appcontext
-def seed_box_office(path: str, **kwargs: Any) -> None:
+def seed_box_office(path: str, bulk: bool = False, **kwargs: Any) -> None:
     """
     Seeds box office data for all films.
 
     Args:
         path: Path to the archive.csv file.
+        bulk: Use the set based bulk loader.
         **kwargs: Keyword arguments for load.load_weeks.
 
     """
 
     archive = pd.read_csv(path)
-    load.load_weeks(archive, **kwargs)
+    if bulk:
+        load.bulk_load_weeks(archive, **kwargs)
+    else:
+        load.load_weeks(archive, **kwargs)
+
+
+@with_appcontext
+def seed_chunked(path: str, chunksize: int, restart: bool = False) -> None:
+    """
+    Seeds films and box office data in one pass over the archive.
+
+    The archive is streamed in date ordered chunks.
+    Each chunk is committed with a checkpoint of its last date,
+    so an interrupted seed resumes after the last committed date.
+    A row dated on or before a date already committed raises an error.
+
+    Args:
+        path: Path to the archive.csv file, ordered by date.
+        chunksize: Number of rows to read per chunk.
+        restart: Ignore the checkpoint of a previous seed.
+
+    """
+    source = os.path.basename(path)
+    checkpoint = models.SeedCheckpoint.query.filter_by(source=source).first()
+    if checkpoint is not None and restart:
+        checkpoint.delete()
+        checkpoint = None
+
+    start = checkpoint.last_date if checkpoint is not None else None
+    if start is not None:
+        current_app.logger.info(f"Seed resuming after {start:%Y-%m-%d}.")
+    resume = start
+
+    resolver = EntityResolver()
+    carry = None
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk["date"] = pd.to_datetime(chunk["date"], format="%Y%m%d")
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+
+        # Only rows of the previous seed are skipped, later rows out of
+        # date order are left in for _seed_chunk to reject.
+        if start is not None:
+            chunk = chunk.loc[chunk["date"] > start]
+        if chunk.empty:
+            carry = None
+            continue
+
+        # The last date may carry on in the next chunk.
+        last_date = chunk["date"].max()
+        carry = chunk.loc[chunk["date"] == last_date]
+        chunk = chunk.loc[chunk["date"] < last_date]
+
+        resume = _seed_chunk(chunk, source, resolver, resume)
+
+    if carry is not None:
+        _seed_chunk(carry, source, resolver, resume)
+
+    resolver.report()
+    return None
+
+
+def _seed_chunk(
+    chunk: pd.DataFrame,
+    source: str,
+    resolver: EntityResolver,
+    resume: Optional[datetime],
+) -> Optional[datetime]:
+    """
+    Loads a chunk of complete dates and moves the checkpoint to its last date.
+    The film weeks, weeks and checkpoint are committed together.
+
+    Args:
+        chunk: Dataframe of box office data.
+        source: File name of the archive.
+        resolver: Resolver shared across the chunks.
+        resume: Last date already committed.
+
+    Returns:
+        The new last date committed.
+    """
+    if chunk.empty:
+        return resume
+
+    first_date = chunk["date"].min()
+    if resume is not None and first_date <= resume:
+        raise ValueError(
+            f"Archive is not ordered by date at {first_date:%Y-%m-%d}."
+        )
+
+    last_date = chunk["date"].max().to_pydatetime()
+    load.bulk_load_weeks(
+        chunk, chunksize=len(chunk), resolver=resolver, commit=False
+    )
+    models.SeedCheckpoint.upsert_many(
+        [
+            {
+                "source": source,
+                "last_date": last_date,
+                "updated": datetime.utcnow(),
+            }
+        ],
+        index_elements=["source"],
+        update_columns=["last_date", "updated"],
+    )
+    db.session.commit()
+
+    current_app.logger.info(f"Seeded up to {last_date:%Y-%m-%d}.")
+    return last_date
+
+
+def seed_parallel(path: str, workers: int) -> None:
+    """
+    Seeds films and box office data with the years split across processes.
+
+    Countries, distributors and films are resolved once, in this process.
+    Then each year of film weeks is written by a worker over its own
+    connection, and the week aggregates are merged at the end.
+
+    An in memory database can't be shared with other processes,
+    so it's seeded one year at a time in this process instead.
+
+    Args:
+        path: Path to the archive.csv file.
+        workers: Number of worker processes.
+
+    """
+    archive = pd.read_csv(path)
+    archive["date"] = pd.to_datetime(archive["date"], format="%Y%m%d")
+    if archive.empty:
+        return None
+
+    df = load.prepare_film_weeks(archive)
+    years = [year for _, year in df.groupby(df["date"].dt.year)]
+
+    url = db.engine.url
+    if workers <= 1 or (
+        url.get_backend_name() == "sqlite" and not url.database
+    ):
+        for year in years:
+            load.insert_film_weeks(year, db.session.connection())
+        services.week.merge_weeks(df)
+        load.refresh_films(
+            df["film_id"].unique().tolist(),
+            df["date"].dt.year.unique().tolist(),
+        )
+        db.session.commit()
+        return None
+
+    database_uri = url.render_as_string(hide_password=False)
+    columns = load.FILM_WEEK_COLUMNS
+    # Spawned workers don't inherit this process's open connections.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [
+            pool.submit(
+                load.load_film_week_partition, database_uri, year[columns]
+            )
+            for year in years
+        ]
+        for future in as_completed(futures):
+            current_app.logger.info(f"Seeded {future.result()} film weeks.")
+
+    services.week.merge_weeks(df)
+    load.refresh_films(
+        df["film_id"].unique().tolist(), df["date"].dt.year.unique().tolist()
+    )
+    db.session.commit()
+    return None
 
 
 @with_appcontext
@@ -237,7 +430,8 @@ def weekly_etl() -> None:
         soup = extract.get_soup(source_url)
         if path := extract.get_excel_file(soup):
             df = extract.extract_box_office(path)
-            load.load_weeks(df)
+            load.bulk_load_weeks(df)
+            services.search.load_autocomplete()
             current_app.logger.info("Weekly-ETL succesful.")
             services.events.create(models.Area.etl, models.State.success)
         else:
@@ -271,7 +465,8 @@ def backup_etl(source_url: str, date: str) -> None:
         urllib.request.urlretrieve(source_url, file_path)
 
         df = extract.extract_box_office(file_path)
-        load.load_weeks(df)
+        load.bulk_load_weeks(df)
+        services.search.load_autocomplete()
         current_app.logger.info("Backup-ETL manual run succesful.")
         services.events.create(
             models.Area.etl, models.State.success, "Backup manual run."
@@ -308,6 +503,7 @@ def rollback_etl() -> None:
         i.number_of_cinemas = 0
         i.number_of_releases = 0
 
+    load.refresh_films({i.film_id for i in data}, [last_date.year])
     db.session.commit()
     current_app.logger.info(
         f"Rollback ETL finished - deleted {len(data)} entries for {last_date}."
@@ -326,14 +522,14 @@ def rollback_year(year: int) -> None:
 
     """
     query = db.session.query(models.Film_Week)
-    query = query.filter(sqlextract("year", models.Film_Week.date) == year)
+    query = query.filter(models.Film_Week.year == year)
     data = query.all()
 
     for i in data:
         db.session.delete(i)
 
     query = db.session.query(models.Week)
-    query = query.filter(sqlextract("year", models.Week.date) == year)
+    query = query.filter(models.Week.year == year)
     weeks = query.all()
 
     for i in weeks:
@@ -342,6 +538,18 @@ def rollback_year(year: int) -> None:
         i.number_of_cinemas = 0
         i.number_of_releases = 0
 
+    load.refresh_films({i.film_id for i in data}, [year])
+    db.session.commit()
+
+
+@with_appcontext
+def refresh_film_stats() -> None:
+    """
+    Refreshes the precomputed totals and leaderboard of every film,
+    and the yearly box office of every distributor and country.
+    The ETL refreshes the films it loads, so this is for backfills.
+    """
+    load.refresh_films()
     db.session.commit()
 
 
@@ -369,17 +577,23 @@ def delete_film(id: int) -> None:
     timezone="UTC",
 )
 @with_appcontext
-def build_archive(path: str = "./data/archive_export.csv") -> None:
+def build_archive(
+    path: str = "./data/archive_export.csv", full: bool = False
+) -> None:
     """
     Builds the archive of box office data.
 
     This is run every Wednesday evening after the box office data is updated.
+    Only the new weeks are appended, unless the archive has to be rebuilt.
+
+    Args:
+        path: Path to the archive file.
+        full: Rebuild the whole archive.
 
     """
     with scheduler.app.app_context():
         try:
-            archive = services.boxoffice.build_archive()
-            archive.to_csv(path, index=False, date_format="%Y%m%d")
+            archive.export(os.fspath(path), full=full)
             services.events.create(models.Area.archive, models.State.success)
         except Exception:
             services.events.create(models.Area.archive, models.State.error)
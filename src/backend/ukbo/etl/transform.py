@@ -1,7 +1,15 @@
 from datetime import timedelta
+from typing import List
 
+import numpy as np
 import pandas as pd
 from ukbo import models
+from ukbo.extensions import db
+
+# days_to_look_back is a tradeoff
+# Increasing gives more accurate data for some films.
+# But for others it creates inaccurate data, as the data is unreliable.
+DAYS_TO_LOOK_BACK = 90
 
 
 def find_recent_film(row: pd.Series) -> models.Film:
@@ -16,9 +24,8 @@ def find_recent_film(row: pd.Series) -> models.Film:
 
     Returns the most recent film with the same name.
     """
-    days_to_look_back = 90
     filter_date = pd.to_datetime(row["date"], format="%Y%m%d", yearfirst=True)
-    previous_period = filter_date - timedelta(days=days_to_look_back)
+    previous_period = filter_date - timedelta(days=DAYS_TO_LOOK_BACK)
 
     return (
         models.Film_Week.query.filter(
@@ -57,3 +64,102 @@ def get_week_box_office(row: pd.Series) -> int:
 
     # There are errors in the data week numbers
     return row["weekend_gross"] if week_gross < 0 else week_gross
+
+
+def find_recent_films(df: pd.DataFrame) -> pd.Series:
+    """
+    Finds the most recent total gross for every film in a dataframe.
+
+    This is the batched version of ``find_recent_film``.
+    All candidate film weeks in the look back window are fetched at once,
+    and matched to the rows of the dataframe with a merge.
+
+    Args:
+        df: Dataframe of box office data, with film and date columns.
+
+    Returns:
+        Series aligned to the dataframe of the previous total gross.
+        NaN where there is no match.
+    """
+    dates = pd.to_datetime(df["date"], format="%Y%m%d", yearfirst=True)
+    previous = pd.Series(np.nan, index=df.index, dtype=float)
+
+    if df.empty:
+        return previous
+
+    look_back = timedelta(days=DAYS_TO_LOOK_BACK)
+    names = df["film"].unique().tolist()
+
+    candidates: List[pd.DataFrame] = []
+    for batch in models.batches(names):
+        query = (
+            db.session.query(
+                models.Film.name,
+                models.Film_Week.date,
+                models.Film_Week.total_gross,
+            )
+            .join(models.Film, models.Film.id == models.Film_Week.film_id)
+            .filter(
+                models.Film.name.in_(batch),
+                models.Film_Week.date >= dates.min() - look_back,
+                models.Film_Week.date <= dates.max(),
+            )
+        )
+        candidates.append(
+            pd.DataFrame(
+                query.all(),
+                columns=["film", "previous_date", "previous_gross"],
+            )
+        )
+
+    matches = pd.concat(candidates, ignore_index=True)
+    if matches.empty:
+        return previous
+
+    rows = pd.DataFrame(
+        {
+            "row": np.arange(len(df)),
+            "film": df["film"].to_numpy(),
+            "date": dates.to_numpy(),
+        }
+    )
+    matches["previous_date"] = pd.to_datetime(matches["previous_date"])
+    merged = rows.merge(matches, on="film", how="inner")
+    merged = merged[
+        (merged["previous_date"] >= merged["date"] - look_back)
+        & (merged["previous_date"] <= merged["date"])
+    ]
+
+    most_recent = merged.groupby("row")["previous_gross"].max()
+    previous.iloc[most_recent.index.to_numpy()] = most_recent.to_numpy()
+    return previous
+
+
+def get_week_box_office_batch(df: pd.DataFrame) -> pd.Series:
+    """
+    Calculates the actual box office for every Film week in a dataframe.
+
+    This is the batched version of ``get_week_box_office``,
+    it uses one query for the whole dataframe instead of one per row.
+
+    Args:
+        df: Dataframe of box office data.
+
+    Returns:
+        Series of the week box office, aligned to the dataframe.
+    """
+    previous = find_recent_films(df)
+
+    week_gross = df["total_gross"] - previous
+
+    # If there's no matches, or there are errors in the data week numbers
+    week_gross = week_gross.where(
+        previous.notna() & (week_gross >= 0), df["weekend_gross"]
+    )
+
+    # If it's week 1
+    week_gross = week_gross.where(
+        df["weeks_on_release"] != 1, df["total_gross"]
+    )
+
+    return week_gross.astype(int)
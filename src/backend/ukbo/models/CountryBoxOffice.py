@@ -0,0 +1,37 @@
+from ukbo.extensions import db
+
+from .models import Model
+
+
+class CountryBoxOffice(Model):  # type: ignore
+    """
+
+    This model stores the precomputed yearly box office of a country.
+
+    Rows are refreshed by the ETL for the countries and years it loads,
+    see ``services.rollup.refresh``.
+
+    Attributes:
+        country_id: ID of the country.
+        year: Year of the box office.
+        gross: Sum of the total gross of the country's film weeks.
+        weeks: Number of film weeks of the country.
+        films: Number of films of the country on release.
+        new_releases: Number of films of the country released.
+
+    """
+
+    __tablename__ = "country_box_office"
+    country_id = db.Column(
+        db.Integer,
+        db.ForeignKey("country.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    year = db.Column(db.Integer, primary_key=True)
+    gross = db.Column(db.BigInteger, nullable=False, default=0)
+    weeks = db.Column(db.Integer, nullable=False, default=0)
+    films = db.Column(db.Integer, nullable=False, default=0)
+    new_releases = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"{self.country_id} {self.year} {self.gross}"
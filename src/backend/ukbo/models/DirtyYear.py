@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from ukbo.extensions import db
+
+from .models import Model
+
+
+class DirtyYear(Model):  # type: ignore
+    """
+
+    This model stores the years of box office data changed by the ETL,
+    since the market share was last calculated.
+
+    The market share task only recalculates these years,
+    see ``services.market_share.refresh_dirty_years``.
+
+    Attributes:
+        year: Year of box office data that changed.
+        marked: When the year was first marked as changed.
+
+    """
+
+    __tablename__ = "dirty_year"
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    marked = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"{self.year}"
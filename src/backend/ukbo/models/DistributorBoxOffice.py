@@ -0,0 +1,37 @@
+from ukbo.extensions import db
+
+from .models import Model
+
+
+class DistributorBoxOffice(Model):  # type: ignore
+    """
+
+    This model stores the precomputed yearly box office of a distributor.
+
+    Rows are refreshed by the ETL for the distributors and years it loads,
+    see ``services.rollup.refresh``.
+
+    Attributes:
+        distributor_id: ID of the distributor.
+        year: Year of the box office.
+        gross: Sum of the total gross of the distributor's film weeks.
+        weeks: Number of film weeks of the distributor.
+        films: Number of films of the distributor on release.
+        new_releases: Number of films of the distributor released.
+
+    """
+
+    __tablename__ = "distributor_box_office"
+    distributor_id = db.Column(
+        db.Integer,
+        db.ForeignKey("distributor.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    year = db.Column(db.Integer, primary_key=True)
+    gross = db.Column(db.BigInteger, nullable=False, default=0)
+    weeks = db.Column(db.Integer, nullable=False, default=0)
+    films = db.Column(db.Integer, nullable=False, default=0)
+    new_releases = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"{self.distributor_id} {self.year} {self.gross}"
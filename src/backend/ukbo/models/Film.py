@@ -6,6 +6,7 @@ from sqlalchemy.ext.hybrid import hybrid_property
 from ukbo.extensions import db
 
 from . import Film_Week
+from .FilmStats import FilmStats
 from .models import PkModel
 
 countries = db.Table(
@@ -44,6 +45,7 @@ class Film(PkModel):  # type: ignore
         countries: List of countries that the film has been released in.
         country_id: ID of the country that the film was released in.
         distributors: List of distributors that released the film.
+        stats: Precomputed totals of the film's box office.
 
     """
 
@@ -65,11 +67,20 @@ class Film(PkModel):  # type: ignore
         "Distributor",
         secondary=distributors,
         lazy="joined",
+        order_by="Distributor.id",
         backref=db.backref("films", lazy="joined"),
         primaryjoin="Film.id == distributors.c.film_id",
         secondaryjoin="Distributor.id == distributors.c.distributor_id",
     )
     slug = db.Column(db.String(300), nullable=False, unique=True)
+    stats = db.relationship(
+        "FilmStats",
+        back_populates="film",
+        uselist=False,
+        lazy="joined",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         if "slug" not in kwargs:
@@ -94,12 +105,20 @@ class Film(PkModel):  # type: ignore
 
     @hybrid_property
     def gross(self) -> int:
+        # Films loaded before their totals are refreshed use their weeks.
+        if self.stats is not None:
+            return self.stats.gross
         return max((week.total_gross for week in self.weeks), default=0)
 
     @gross.expression  # type: ignore
     def gross(cls) -> Any:
-        return (
-            select([func.max(Film_Week.total_gross)])
-            .where(Film_Week.film_id == cls.id)
-            .as_scalar()
+        # The same fallback as in Python, only read without a stats row.
+        return func.coalesce(
+            select([FilmStats.gross])
+            .where(FilmStats.film_id == cls.id)
+            .as_scalar(),
+            select([func.max(Film_Week.Film_Week.total_gross)])
+            .where(Film_Week.Film_Week.film_id == cls.id)
+            .as_scalar(),
+            0,
         )
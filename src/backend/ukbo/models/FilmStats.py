@@ -0,0 +1,42 @@
+from ukbo.extensions import db
+
+from .models import Model
+
+
+class FilmStats(Model):  # type: ignore
+    """
+
+    This model stores the precomputed totals of a film's box office.
+
+    Rows are refreshed by the ETL for the films it loads,
+    see ``services.film.refresh_stats``.
+    Films without any box office weeks don't have a row.
+
+    Attributes:
+        film_id: ID of the film.
+        gross: Total gross of the film.
+        first_week: Date of the first week of the film.
+        last_week: Date of the last week of the film.
+        opening_weekend: Weekend gross of the first week on release.
+        weeks_on_release: Number of weeks the film has been on release.
+        peak_cinemas: Highest number of cinemas the film was in.
+
+    """
+
+    __tablename__ = "film_stats"
+    film_id = db.Column(
+        db.Integer,
+        db.ForeignKey("film.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    gross = db.Column(db.Integer, nullable=False, default=0, index=True)
+    first_week = db.Column(db.DateTime, nullable=True)
+    last_week = db.Column(db.DateTime, nullable=True)
+    opening_weekend = db.Column(db.Integer, nullable=True)
+    weeks_on_release = db.Column(db.Integer, nullable=False, default=0)
+    peak_cinemas = db.Column(db.Integer, nullable=False, default=0)
+
+    film = db.relationship("Film", back_populates="stats")
+
+    def __repr__(self) -> str:
+        return f"{self.film_id} {self.gross}"
@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import Any, Dict
 
+from sqlalchemy.sql import column
 from ukbo.extensions import db
 
-from .models import PkModel
+from .models import PkModel, iso_week_of, year_of
 
 
 class Film_Week(PkModel):  # type: ignore
@@ -23,6 +24,8 @@ class Film_Week(PkModel):  # type: ignore
         number_of_cinemas: Number of cinemas the film was released in.
         weekend_gross: Weekend gross of the film.
         week_gross: Week gross of the film.
+        year: Year of the date, stored by the database.
+        iso_week: ISO week number of the date, stored by the database.
 
     """
 
@@ -41,6 +44,18 @@ class Film_Week(PkModel):  # type: ignore
     week_gross = db.Column(db.Integer, nullable=False)
     total_gross = db.Column(db.Integer, nullable=False)
     site_average = db.Column(db.Float, nullable=False)
+    year = db.Column(
+        db.Integer, db.Computed(year_of(column("date")), persisted=True)
+    )
+    iso_week = db.Column(
+        db.Integer, db.Computed(iso_week_of(column("date")), persisted=True)
+    )
+
+    __table_args__ = (
+        # Keyset pagination seeks on the date and ID.
+        db.Index("ix_film_week_date_id", "date", "id"),
+        db.Index("ix_film_week_year_iso_week", "year", "iso_week"),
+    )
 
     def __repr__(self) -> str:
         return f"{self.week_gross}"
@@ -0,0 +1,40 @@
+from ukbo.extensions import db
+
+from .models import Model
+
+# Year of the all time leaderboard rows.
+ALL_TIME = 0
+
+
+class Leaderboard(Model):  # type: ignore
+    """
+
+    This model stores the precomputed gross of films, for top film lists.
+
+    Each film has a row for all time, with a year of ``ALL_TIME``,
+    and a row for each year it was on release.
+    Rows are refreshed by the ETL for the films it loads,
+    see ``services.boxoffice.refresh_leaderboard``.
+
+    Attributes:
+        film_id: ID of the film.
+        year: Year of the gross, or ``ALL_TIME``.
+        gross: Sum of the week gross of the film in the year.
+
+    """
+
+    __tablename__ = "leaderboard"
+    film_id = db.Column(
+        db.Integer,
+        db.ForeignKey("film.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    year = db.Column(db.Integer, primary_key=True)
+    gross = db.Column(db.Integer, nullable=False, default=0)
+
+    film = db.relationship("Film")
+
+    __table_args__ = (db.Index("ix_leaderboard_year_gross", "year", "gross"),)
+
+    def __repr__(self) -> str:
+        return f"{self.film_id} {self.year} {self.gross}"
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from ukbo.extensions import db
+
+from .models import PkModel
+
+
+class SeedCheckpoint(PkModel):  # type: ignore
+    """
+
+    This model stores how far a chunked seed of an archive file has got.
+
+    An interrupted seed resumes after the last committed date.
+
+    Attributes:
+        source: File name of the archive being seeded.
+        last_date: Last date of box office data committed.
+        updated: When the checkpoint was last updated.
+
+    """
+
+    __tablename__ = "seed_checkpoint"
+    source = db.Column(db.String(300), nullable=False, unique=True)
+    last_date = db.Column(db.DateTime, nullable=False)
+    updated = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    def __repr__(self) -> str:
+        return f"{self.source} {self.last_date}"
@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import Any, Dict, List
 
+from sqlalchemy.sql import column
 from ukbo.extensions import db
 
-from .models import PkModel
+from .models import PkModel, iso_week_of, year_of
 
 
 class Week(PkModel):  # type: ignore
@@ -23,6 +24,8 @@ class Week(PkModel):  # type: ignore
         forecast_high: Forecast high for the week.
         forecast_medium: Forecast medium for the week.
         forecast_low: Forecast low for the week.
+        year: Year of the date, stored by the database.
+        iso_week: ISO week number of the date, stored by the database.
 
     """
 
@@ -40,6 +43,14 @@ class Week(PkModel):  # type: ignore
     forecast_high = db.Column(db.Integer, nullable=True, default=0)
     forecast_medium = db.Column(db.Integer, nullable=True, default=0)
     forecast_low = db.Column(db.Integer, nullable=True, default=0)
+    year = db.Column(
+        db.Integer, db.Computed(year_of(column("date")), persisted=True)
+    )
+    iso_week = db.Column(
+        db.Integer, db.Computed(iso_week_of(column("date")), persisted=True)
+    )
+
+    __table_args__ = (db.Index("ix_week_year_iso_week", "year", "iso_week"),)
 
     def __repr__(self) -> str:
         return f"{self.date}"
@@ -8,9 +8,26 @@ The models are used to create the database tables, and to query the database.
 
 from . import models
 from .Country import Country
+from .CountryBoxOffice import CountryBoxOffice
+from .CountryMarketShare import CountryMarketShare
+from .DirtyYear import DirtyYear
 from .Distributor import Distributor
+from .DistributorBoxOffice import DistributorBoxOffice
 from .DistributorMarketShare import DistributorMarketShare
 from .Event import Area, Event, State
 from .Film import Film, countries, distributors
 from .Film_Week import Film_Week
+from .FilmStats import FilmStats
+from .Leaderboard import ALL_TIME, Leaderboard
+from .models import (
+    IN_CLAUSE_SIZE,
+    batches,
+    insert_many,
+    insert_statement,
+    iso_week_of,
+    string_agg,
+    upsert_many,
+    year_of,
+)
+from .SeedCheckpoint import SeedCheckpoint
 from .Week import Week
@@ -1,9 +1,183 @@
-from typing import Any, Optional, Type, TypeVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type, TypeVar
 
+from sqlalchemy import Integer, Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Insert, func
+from sqlalchemy.sql.functions import FunctionElement
 from ukbo.extensions import db
 
 T = TypeVar("T", bound="PkModel")
 
+# Keeps ``IN`` clauses under the bound parameter limits of SQLite.
+IN_CLAUSE_SIZE = 500
+
+
+def insert_statement(table: Table) -> Insert:
+    """
+    Builds an insert statement for the dialect of the database.
+
+    Only Postgres and SQLite are supported,
+    as their statements have the ``on_conflict`` clauses the bulk loads use.
+
+    Args:
+        table: Table to insert into.
+
+    Returns:
+        Insert statement.
+
+    Raises:
+        NotImplementedError: If the database is another dialect.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Bulk inserts are not supported on {dialect}.")
+
+
+def string_agg(
+    column: Any, separator: str = "/", order_by: Optional[Any] = None
+) -> Any:
+    """
+    Builds an aggregate that joins strings for the dialect of the database.
+
+    Postgres has ``string_agg``, SQLite has ``group_concat``.
+    SQLite can't order inside the aggregate,
+    it joins the strings in the order of the rows it's given.
+
+    Args:
+        column: Column of strings to join.
+        separator: Separator between the strings.
+        order_by: Column to order the strings by, Postgres only.
+
+    Returns:
+        Aggregate function.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        if order_by is not None:
+            return func.string_agg(
+                column, postgresql.aggregate_order_by(separator, order_by)
+            )
+        return func.string_agg(column, separator)
+    return func.group_concat(column, separator)
+
+
+class year_of(FunctionElement):
+    """
+    Year of a date, as an integer.
+    Used for the stored ``year`` columns of the weeks.
+    """
+
+    type = Integer()
+    name = "year_of"
+    inherit_cache = True
+
+
+@compiles(year_of)
+def _year_of(element: year_of, compiler: Any, **kw: Any) -> str:
+    date = compiler.process(element.clauses, **kw)
+    return f"CAST(EXTRACT(YEAR FROM {date}) AS INTEGER)"
+
+
+@compiles(year_of, "sqlite")
+def _year_of_sqlite(element: year_of, compiler: Any, **kw: Any) -> str:
+    date = compiler.process(element.clauses, **kw)
+    return f"CAST(STRFTIME('%Y', {date}) AS INTEGER)"
+
+
+class iso_week_of(FunctionElement):
+    """
+    ISO 8601 week number of a date, as an integer.
+    Used for the stored ``iso_week`` columns of the weeks.
+    """
+
+    type = Integer()
+    name = "iso_week_of"
+    inherit_cache = True
+
+
+@compiles(iso_week_of)
+def _iso_week_of(element: iso_week_of, compiler: Any, **kw: Any) -> str:
+    date = compiler.process(element.clauses, **kw)
+    return f"CAST(EXTRACT(WEEK FROM {date}) AS INTEGER)"
+
+
+@compiles(iso_week_of, "sqlite")
+def _iso_week_of_sqlite(element: iso_week_of, compiler: Any, **kw: Any) -> str:
+    # The ISO week is the week of the year of its Thursday.
+    date = compiler.process(element.clauses, **kw)
+    thursday = f"DATE({date}, '-3 days', 'weekday 4')"
+    return f"((CAST(STRFTIME('%j', {thursday}) AS INTEGER) - 1) / 7 + 1)"
+
+
+def batches(
+    values: Iterable[Any], size: int = IN_CLAUSE_SIZE
+) -> Iterator[List[Any]]:
+    """
+    Splits values into lists small enough for an ``IN`` clause.
+
+    Args:
+        values: Values to split.
+        size: Most values in each list.
+
+    Returns:
+        Iterator of lists of values.
+    """
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def insert_many(
+    table: Table, rows: List[Dict[str, Any]], ignore_conflicts: bool = False
+) -> None:
+    """
+    Inserts many rows into a table with one ``executemany``.
+
+    Args:
+        table: Table to insert into.
+        rows: List of rows as dictionaries.
+        ignore_conflicts: Skip rows that conflict with existing rows.
+    """
+    if not rows:
+        return None
+
+    statement = insert_statement(table)
+    if ignore_conflicts:
+        statement = statement.on_conflict_do_nothing()
+    db.session.execute(statement, rows)
+    return None
+
+
+def upsert_many(
+    table: Table,
+    rows: List[Dict[str, Any]],
+    index_elements: List[str],
+    update_columns: List[str],
+) -> None:
+    """
+    Inserts many rows into a table, updating the rows that already exist.
+
+    Args:
+        table: Table to insert into.
+        rows: List of rows as dictionaries.
+        index_elements: Columns of the unique constraint to conflict on.
+        update_columns: Columns to overwrite when the row already exists.
+    """
+    if not rows:
+        return None
+
+    statement = insert_statement(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
+    db.session.execute(statement, rows)
+    return None
+
 
 class CRUDMixin(object):
     """
@@ -36,6 +210,23 @@ class CRUDMixin(object):
             return db.session.commit()
         return
 
+    @classmethod
+    def insert_many(
+        cls, rows: List[Dict[str, Any]], ignore_conflicts: bool = False
+    ) -> None:
+        """Insert many records in one statement, without the ORM."""
+        return insert_many(cls.__table__, rows, ignore_conflicts)
+
+    @classmethod
+    def upsert_many(
+        cls,
+        rows: List[Dict[str, Any]],
+        index_elements: List[str],
+        update_columns: List[str],
+    ) -> None:
+        """Insert or update many records in one statement, without the ORM."""
+        return upsert_many(cls.__table__, rows, index_elements, update_columns)
+
 
 class Model(CRUDMixin, db.Model):
     """
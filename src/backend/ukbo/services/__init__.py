@@ -9,6 +9,8 @@ Services are responsible for the business logic of the application.
 
 from . import (
     boxoffice,
+    comparison,
+    corrections,
     country,
     distributor,
     events,
@@ -16,5 +18,8 @@ from . import (
     filters,
     forecast,
     market_share,
+    matcher,
+    rollup,
+    search,
     week,
 )
@@ -1,40 +1,289 @@
+import base64
+import csv
 import datetime
-from typing import List, Optional
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import orjson
 import pandas as pd
-from flask import jsonify
+from flask import jsonify, stream_with_context
 from flask.wrappers import Response
-from sqlalchemy.sql import func, or_
+from sqlalchemy.sql import Select, Subquery, func, tuple_
 from ukbo import models
 from ukbo.dto import (
+    CompiledSchema,
+    Computed,
     FilmSchema,
     FilmWeekSchema,
-    FilmWeekSchemaArchive,
     WeekSchema,
 )
 from ukbo.extensions import db
 
+from . import comparison
 from .filters import QueryFilter, TimeFilter
 
+# Number of weeks on each page of ``all``.
+PAGE_SIZE = 700
+# Ways of counting the weeks of ``all``.
+COUNT_MODES = ["exact", "estimate", "none"]
+# Formats of streamed rows, and their mimetypes.
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Number of rows fetched and written at a time when streaming.
+STREAM_BATCH = 1000
+
+
+ARCHIVE_COLUMNS = [
+    "date",
+    "rank",
+    "film",
+    "country",
+    "weekend_gross",
+    "distributor",
+    "weeks_on_release",
+    "number_of_cinemas",
+    "total_gross",
+    "week_gross",
+]
+
 
 def all(
     time_filter: TimeFilter = TimeFilter(),
     query_filter: QueryFilter = QueryFilter(),
-    page: int = 1,
+    page: Optional[int] = None,
+    cursor: Optional[str] = None,
+    count: str = "exact",
 ) -> Response:
     """
     All box office data for a time period.
 
+    Weeks are ordered by date and ID, newest first.
+    Pages are found with a cursor, an opaque token of the first or last
+    week of a page, so each page seeks on the ``(date, id)`` index
+    instead of skipping all the weeks before it.
+    A page number uses the old offset pagination.
+
     Args:
         time_filter: Object containing start and end date to filter by.
         query_filter: Object containing distributor ID and country ID to filter by.
-        page: Page number to return.
+        page: Page number to return, instead of a cursor.
+        cursor: Cursor of the page to return, or the first page if None.
+        count: How to count the weeks, one of ``COUNT_MODES``.
 
     Returns:
         Paginated JSON response of box office data.
+
+    Raises:
+        ValueError: If the cursor or count is invalid.
+    """
+    if count not in COUNT_MODES:
+        raise ValueError(f"Count must be one of {', '.join(COUNT_MODES)}.")
+
+    serializer, query = _film_week_rows()
+    query = _film_weeks(query, time_filter, query_filter)
+
+    if page is not None and cursor is None:
+        page = max(page, 1)
+        data = (
+            query.order_by(
+                models.Film_Week.date.desc(), models.Film_Week.id.desc()
+            )
+            .offset((page - 1) * PAGE_SIZE)
+            .limit(PAGE_SIZE + 1)
+            .all()
+        )
+        next_page = (page + 1) if len(data) > PAGE_SIZE else ""
+        previous_page = (page - 1) if page > 1 else ""
+        data = data[:PAGE_SIZE]
+    else:
+        data, next_page, previous_page = _seek(query, cursor)
+
+    weeks = _film_weeks(
+        db.session.query(models.Film_Week.id), time_filter, query_filter
+    )
+
+    return Response(
+        serializer.dumps(
+            dict(
+                count=_count(weeks, count),
+                next=next_page,
+                previous=previous_page,
+                results=[serializer.dump(row) for row in data],
+            )
+        ),
+        mimetype="application/json",
+    )
+
+
+def stream_all(
+    time_filter: TimeFilter = TimeFilter(),
+    query_filter: QueryFilter = QueryFilter(),
+    file_format: str = "ndjson",
+) -> Response:
+    """
+    Streams all box office data for a time period, without pages.
+
+    Weeks are read from a server side cursor and written as they arrive,
+    so a whole date range is never held in memory.
+
+    Args:
+        time_filter: Object containing start and end date to filter by.
+        query_filter: Object containing distributor ID and country ID to filter by.
+        file_format: Format of the rows, one of ``STREAM_FORMATS``.
+
+    Returns:
+        Streamed response of box office data.
+
+    Raises:
+        ValueError: If the format is invalid.
+    """
+    serializer, query = _film_week_rows()
+    query = _film_weeks(query, time_filter, query_filter).order_by(
+        models.Film_Week.date.desc(), models.Film_Week.id.desc()
+    )
+    return _stream(query, serializer, file_format)
+
+
+def encode_cursor(direction: str, week: Any) -> str:
+    """
+    Encodes the position of a film week as an opaque cursor.
+
+    Args:
+        direction: ``next`` for the weeks after, ``previous`` for those before.
+        week: Film week or row with its date and ID to start from.
+
+    Returns:
+        URL safe cursor.
+    """
+    data = json.dumps([direction, week.date.isoformat(), week.id])
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, datetime.datetime, int]:
+    """
+    Decodes a cursor from ``encode_cursor``.
+
+    Args:
+        cursor: URL safe cursor.
+
+    Returns:
+        Direction, date and ID of the cursor.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, date, week_id = json.loads(data)
+        if direction not in {"next", "previous"}:
+            raise ValueError
+        return direction, datetime.datetime.fromisoformat(date), int(week_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.") from None
+
+
+def _seek(query: Any, cursor: Optional[str]) -> Tuple[List[Any], str, str]:
+    """
+    Gets one page of film week rows from a cursor.
+
+    One more week than the page is fetched,
+    to check if there are more weeks without counting them.
+
+    Args:
+        query: Query of film week rows, with their date and ID.
+        cursor: Cursor of the page, or the first page if None.
+
+    Returns:
+        Rows of the page, and the next and previous cursors.
+    """
+    key = tuple_(models.Film_Week.date, models.Film_Week.id)
+    date, week_id = models.Film_Week.date, models.Film_Week.id
+
+    if cursor is None:
+        direction, after = "next", None
+    else:
+        direction, *position = decode_cursor(cursor)
+        after = tuple(position)
+
+    if direction == "next":
+        if after is not None:
+            query = query.filter(key < after)
+        query = query.order_by(date.desc(), week_id.desc())
+    else:
+        query = query.filter(key > after).order_by(date.asc(), week_id.asc())
+
+    data = query.limit(PAGE_SIZE + 1).all()
+    more = len(data) > PAGE_SIZE
+    data = data[:PAGE_SIZE]
+
+    if direction == "next":
+        has_next, has_previous = more, after is not None
+    else:
+        data.reverse()
+        has_next, has_previous = True, more
+
+    if not data:
+        return data, "", ""
+    next_cursor = encode_cursor("next", data[-1]) if has_next else ""
+    previous_cursor = (
+        encode_cursor("previous", data[0]) if has_previous else ""
+    )
+    return data, next_cursor, previous_cursor
+
+
+def _count(query: Any, mode: str) -> Optional[int]:
     """
-    query = db.session.query(models.Film_Week)
+    Counts the rows of a query.
 
+    An estimate is read from the query plan on PostgreSQL,
+    which avoids scanning every row of a large filter.
+    Other databases always count exactly.
+
+    Args:
+        query: Query of film weeks.
+        mode: ``exact``, ``estimate`` or ``none``.
+
+    Returns:
+        Number of rows, or None if they are not counted.
+    """
+    if mode == "none":
+        return None
+
+    query = query.order_by(None)
+    if mode == "estimate" and db.engine.dialect.name == "postgresql":
+        statement = query.with_entities(models.Film_Week.id).statement
+        compiled = statement.compile(
+            dialect=db.engine.dialect,
+            compile_kwargs={"render_postcompile": True},
+        )
+        plan = (
+            db.session.connection()
+            .exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+            )
+            .scalar()
+        )
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    return query.with_entities(func.count(models.Film_Week.id)).scalar()
+
+
+def _film_weeks(
+    query: Any, time_filter: TimeFilter, query_filter: QueryFilter
+) -> Any:
+    """
+    Filters a query of film weeks.
+
+    Args:
+        query: Query of film weeks, or of their columns.
+        time_filter: Object containing start and end date to filter by.
+        query_filter: Object containing distributor ID and country ID to filter by.
+
+    Returns:
+        Unordered query of the film weeks that match the filters.
+    """
     if time_filter.start is not None:
         query = query.filter(
             models.Film_Week.date >= to_date(time_filter.start)
@@ -43,56 +292,146 @@ def all(
     if time_filter.end is not None:
         query = query.filter(models.Film_Week.date <= to_date(time_filter.end))
 
-    if query_filter.distributor_ids is not None:
-        query = (
-            query.join(models.Film)
-            .join(models.distributors)
-            .join(models.Distributor)
-        )
-        query = query.filter(
-            models.Distributor.id.in_(query_filter.distributor_ids)
-        )
+    return query_filter.add_week_filter(query)
 
-    if query_filter.country_ids is not None:
-        query = (
-            query.join(models.Film).join(models.countries).join(models.Country)
-        )
-        query = query.filter(models.Country.id.in_(query_filter.country_ids))
 
-    data = query.order_by(models.Film_Week.date.desc()).paginate(
-        page=page, per_page=700, error_out=False
+def _film_week_rows() -> Tuple[CompiledSchema, Any]:
+    """
+    Builds a query of film week rows, serialised like ``FilmWeekSchema``.
+
+    The film and its distributors are joined in the database,
+    so no film is loaded as an object.
+
+    Returns:
+        Compiled schema of the rows, and the unordered query.
+    """
+    distributors = _names_by_film(
+        models.distributors.c.film_id,
+        models.distributors.c.distributor_id,
+        models.Distributor,
+        "distributor",
+        separator=", ",
     )
-    if data is None:
-        return {"none"}
+    serializer = CompiledSchema(
+        FilmWeekSchema,
+        {
+            "date": Computed(models.Film_Week.date, _format_date),
+            "film_slug": Computed(models.Film.slug),
+            "film": Computed(models.Film.name),
+            "distributor": Computed(
+                func.coalesce(distributors.c.distributor, "")
+            ),
+        },
+    )
+    query = (
+        db.session.query(*serializer.columns)
+        .select_from(models.Film_Week)
+        .join(models.Film, models.Film.id == models.Film_Week.film_id)
+        .outerjoin(distributors, distributors.c.film_id == models.Film.id)
+    )
+    return serializer, query
 
-    next_page = (page + 1) if data.has_next else ""
-    previous_page = (page - 1) if data.has_prev else ""
 
-    film_week_schema = FilmWeekSchema()  # type: ignore
+def _stream(
+    query: Any, serializer: CompiledSchema, file_format: str
+) -> Response:
+    """
+    Streams the rows of a query as newline delimited JSON or csv.
 
-    return jsonify(
-        count=data.total,
-        next=next_page,
-        previous=previous_page,
-        results=[film_week_schema.dump(ix) for ix in data.items],
+    Rows are fetched ``STREAM_BATCH`` at a time with ``yield_per``,
+    and each batch is written to the response once it's serialised.
+
+    Args:
+        query: Ordered query of the serializer's columns.
+        serializer: Compiled schema to serialise each row with.
+        file_format: Format of the rows, one of ``STREAM_FORMATS``.
+
+    Returns:
+        Streamed response of the rows.
+
+    Raises:
+        ValueError: If the format is invalid.
+    """
+    if file_format not in STREAM_FORMATS:
+        raise ValueError(f"Format must be one of {', '.join(STREAM_FORMATS)}.")
+
+    def generate() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=serializer.fields)
+        if file_format == "csv":
+            writer.writeheader()
+
+        for i, row in enumerate(query.yield_per(STREAM_BATCH), 1):
+            if file_format == "csv":
+                writer.writerow(serializer.dump(row))
+            else:
+                buffer.write(orjson.dumps(serializer.dump(row)).decode())
+                buffer.write("\n")
+
+            if i % STREAM_BATCH == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
+
+    return Response(
+        stream_with_context(generate()), mimetype=STREAM_FORMATS[file_format]
     )
 
 
-def topfilms() -> Response:
+def topfilms(
+    year: Optional[int] = None,
+    distributor_id: Optional[int] = None,
+    country_id: Optional[int] = None,
+    limit: int = 50,
+) -> Response:
     """
-    Top films for all time.
+    Top films for all time, or for one year.
+
+    Served from the precomputed leaderboard,
+    or from the film weeks if the leaderboard hasn't been built.
+
+    Args:
+        year: Year to get the top films of, or all time if None.
+        distributor_id: ID of the distributor to filter by.
+        country_id: ID of the country to filter by.
+        limit: Number of films to return.
 
     Returns:
         JSON response of top films data.
     """
-    query = db.session.query(
-        models.Film, func.sum(models.Film_Week.week_gross)
-    )
-    query = query.join(
-        models.Film, models.Film.id == models.Film_Week.film_id
-    ).group_by(models.Film)
-    query = query.order_by(func.sum(models.Film_Week.week_gross).desc())
-    data = query.limit(50)
+    if db.session.query(models.Leaderboard.film_id).first() is not None:
+        gross = models.Leaderboard.gross
+        query = db.session.query(models.Film, gross).join(
+            models.Leaderboard, models.Leaderboard.film_id == models.Film.id
+        )
+        query = query.filter(
+            models.Leaderboard.year
+            == (year if year is not None else models.ALL_TIME)
+        )
+    else:
+        gross = func.sum(models.Film_Week.week_gross)
+        query = db.session.query(models.Film, gross)
+        query = query.join(
+            models.Film_Week, models.Film.id == models.Film_Week.film_id
+        ).group_by(models.Film)
+        if year is not None:
+            query = query.filter(models.Film_Week.year == year)
+
+    if distributor_id is not None:
+        query = query.filter(
+            models.Film.distributors.any(
+                models.Distributor.id == distributor_id
+            )
+        )
+    if country_id is not None:
+        query = query.filter(
+            models.Film.countries.any(models.Country.id == country_id)
+        )
+
+    query = query.order_by(gross.desc())
+    data = query.limit(limit)
 
     film_schema = FilmSchema()  # type: ignore
 
@@ -107,14 +446,55 @@ def topfilms() -> Response:
     )
 
 
+def refresh_leaderboard(film_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Refreshes the leaderboard rows of films from their weeks.
+
+    Only the given films are refreshed,
+    so a weekly load only sums the weeks of the films it touched.
+
+    Args:
+        film_ids: IDs of the films to refresh, or all films if None.
+    """
+    if film_ids is None:
+        film_ids = [film_id for (film_id,) in db.session.query(models.Film.id)]
+    ids = sorted({int(film_id) for film_id in film_ids})
+
+    year = models.Film_Week.year
+    for chunk in models.batches(ids):
+        models.Leaderboard.query.filter(
+            models.Leaderboard.film_id.in_(chunk)
+        ).delete(synchronize_session=False)
+
+        query = db.session.query(
+            models.Film_Week.film_id,
+            year,
+            func.sum(models.Film_Week.week_gross),
+        )
+        query = query.filter(models.Film_Week.film_id.in_(chunk))
+        query = query.group_by(models.Film_Week.film_id, year)
+
+        rows = []
+        all_time: Dict[int, int] = {}
+        for film_id, film_year, gross in query:
+            rows.append(
+                {"film_id": film_id, "year": int(film_year), "gross": gross}
+            )
+            all_time[film_id] = all_time.get(film_id, 0) + gross
+
+        rows.extend(
+            {"film_id": film_id, "year": models.ALL_TIME, "gross": gross}
+            for film_id, gross in all_time.items()
+        )
+        models.Leaderboard.insert_many(rows)
+
+
 def summary(start: str, end: str, limit: int = 0) -> Response:
     """
     Summarised box office statistics for a time range grouped by year.
 
-    The range has to be a standard amount of time inside one year.
-    As in, the start date day and month cannot be greater than the end date.
-    This contstraint is due to SQL filtering.
-    For getting time comparison data, see ``previous`` method.
+    The same range is compared in each year, and can cross a year end.
+    A single day compares its ISO week in each year.
 
     Args:
         start: Start of time range (YYYY-MM-DD).
@@ -124,73 +504,22 @@ def summary(start: str, end: str, limit: int = 0) -> Response:
     Returns:
         JSON response of the list of years.
     """
-    query = db.session.query(
-        func.extract("year", models.Week.date),
-        func.sum(models.Week.week_gross),
-        func.sum(models.Week.weekend_gross),
-        func.sum(models.Week.number_of_releases),
-        func.max(models.Week.number_of_cinemas),
-        func.sum(models.Week.admissions),
-    ).group_by(func.extract("year", models.Week.date))
-
-    if start == end:
-        # Query for 1 week - so use the week number to filter.
-        week_number = to_date(start).isocalendar()[1]
-        query = query.filter(
-            func.extract("week", models.Week.date) == week_number
-        )
-        query = query.filter(
-            func.extract("year", models.Week.date)
-            >= (to_date(start).year - limit)
-        )
-        query = query.filter(
-            func.extract("year", models.Week.date) <= (to_date(end).year)
-        )
-
-    elif start is not None and end is not None:
-        s = to_date(start)
-        e = to_date(end)
-
-        # Generate a list of filters for previous years
-        year_filters = []
-        current_year = e.year
-        for i in range(1, limit + 1):
-            previous_year_start = s.replace(year=current_year - i + 1)
-            previous_year_end = e.replace(year=current_year - i + 1)
-            year_filters.append(
-                models.Week.date.between(
-                    previous_year_start, previous_year_end
-                )
-            )
-
-        # Combine all the year filters
-        year_filter_condition = or_(*year_filters)
-
-        # Apply the year filter condition to the query
-        query = query.filter(year_filter_condition)
-
-    data = query.order_by(func.extract("year", models.Week.date).desc()).all()
+    s = to_date(start)
+    e = to_date(end)
+    if s == e:
+        # One week, in this year and each of the years before.
+        offsets = range(limit + 1)
+    else:
+        offsets = range(max(limit, 1))
 
     return jsonify(
-        results=[
-            dict(
-                year=row[0],
-                week_gross=row[1],
-                weekend_gross=row[2],
-                number_of_releases=row[3],
-                number_of_cinemas=row[4],
-                admissions=row[5],
-            )
-            for row in data
-        ]
+        results=comparison.compare(comparison.windows(s, e, offsets))
     )
 
 
 def previous(start: str, end: str) -> Response:
     """
     Gets the previous year of box office data as summary statistics.
-    As this gets multiple years, it cannot be used for time comparison
-    across periods that are not a standard amount of time inside one year.
 
     Args:
         start: Start of time range (YYYY-MM-DD).
@@ -199,49 +528,12 @@ def previous(start: str, end: str) -> Response:
     Returns:
         JSON response of the box office data as a list of years.
     """
-    query = db.session.query(
-        func.extract("year", models.Week.date),
-        func.sum(models.Week.week_gross),
-        func.sum(models.Week.weekend_gross),
-        func.sum(models.Week.number_of_releases),
-        func.max(models.Week.number_of_cinemas),
-    ).group_by(func.extract("year", models.Week.date))
-
-    if start != end:
-        if start is not None:
-            s = to_date(start)
-            s = s.replace(year=(s.year - 1))
-            query = query.filter(models.Week.date >= s)
-
-        if end is not None:
-            e = to_date(end)
-            e = e.replace(year=(e.year - 1))
-            query = query.filter(models.Week.date <= e)
-
-    else:
-        # Query for 1 week - so use the week number to filter.
-        s = to_date(start)
-        s = s.replace(year=(s.year - 1))
-        week_number = s.isocalendar()[1]
-        query = query.filter(
-            func.extract("week", models.Week.date) == week_number
-        )
-        query = query.filter(
-            func.extract("year", models.Week.date) >= (s.year)
-        )
-
-    data = query.order_by(func.extract("year", models.Week.date).desc()).all()
+    windows = comparison.windows(to_date(start), to_date(end), [1])
 
     return jsonify(
         results=[
-            dict(
-                year=row[0],
-                week_gross=row[1],
-                weekend_gross=row[2],
-                number_of_releases=row[3],
-                number_of_cinemas=row[4],
-            )
-            for row in data
+            {k: v for k, v in row.items() if k != "admissions"}
+            for row in comparison.compare(windows)
         ]
     )
 
@@ -259,47 +551,18 @@ def previous_year(start: str, end: str) -> Response:
     Returns:
         JSON response of the box office data as a list of weeks.
     """
-    query = db.session.query(
-        func.sum(models.Week.week_gross),
-        func.sum(models.Week.weekend_gross),
-        func.sum(models.Week.number_of_releases),
-        func.max(models.Week.number_of_cinemas),
-    )
-
-    if start != end:
-        if start is not None:
-            s = to_date(start)
-            s = s.replace(year=(s.year - 1))
-            query = query.filter(models.Week.date >= s)
-
-        if end is not None:
-            e = to_date(end)
-            e = e.replace(year=(e.year - 1))
-            query = query.filter(models.Week.date <= e)
-
-    else:
-        # Query for 1 week - so use the week number to filter.
-        s = to_date(start)
-        s = s.replace(year=(s.year - 1))
-        week_number = s.isocalendar()[1]
-        query = query.filter(
-            func.extract("week", models.Week.date) == week_number
-        )
-        query = query.filter(
-            func.extract("year", models.Week.date) >= (s.year)
-        )
-
-    data = query.all()
+    windows = comparison.windows(to_date(start), to_date(end), [1])
+    data = comparison.compare(windows)
+    row = data[0] if data else {}
 
     return jsonify(
         results=[
             dict(
-                week_gross=row[0],
-                weekend_gross=row[1],
-                number_of_releases=row[2],
-                number_of_cinemas=row[3],
+                week_gross=row.get("week_gross"),
+                weekend_gross=row.get("weekend_gross"),
+                number_of_releases=row.get("number_of_releases"),
+                number_of_cinemas=row.get("number_of_cinemas"),
             )
-            for row in data
         ]
     )
 
@@ -318,13 +581,8 @@ def topline(
     Returns:
         JSON response of the box office data as a list of weeks.
     """
-    query = db.session.query(models.Week)
-
-    if start is not None:
-        query = query.filter(models.Week.date >= to_date(start))
-
-    if end is not None:
-        query = query.filter(models.Week.date <= to_date(end))
+    serializer = _week_schema()
+    query = _weeks(db.session.query(*serializer.columns), start, end)
 
     data = query.order_by(models.Week.date.desc()).paginate(
         page=page, per_page=150, error_out=False
@@ -335,53 +593,219 @@ def topline(
     next_page = (page + 1) if data.has_next else ""
     previous_page = (page - 1) if data.has_prev else ""
 
-    week_schema = WeekSchema()  # type: ignore
+    return Response(
+        serializer.dumps(
+            dict(
+                count=data.total,
+                next=next_page,
+                previous=previous_page,
+                results=[serializer.dump(row) for row in data.items],
+            )
+        ),
+        mimetype="application/json",
+    )
 
-    return jsonify(
-        count=data.total,
-        next=next_page,
-        previous=previous_page,
-        results=[week_schema.dump(ix) for ix in data.items],
+
+def stream_topline(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    file_format: str = "ndjson",
+) -> Response:
+    """
+    Streams topline box office data for a time range, without pages.
+
+    Args:
+        start: Start of time range (YYYY-MM-DD).
+        end: End of time range (YYYY-MM-DD).
+        file_format: Format of the rows, one of ``STREAM_FORMATS``.
+
+    Returns:
+        Streamed response of the box office data.
+
+    Raises:
+        ValueError: If the format is invalid.
+    """
+    serializer = _week_schema()
+    query = _weeks(db.session.query(*serializer.columns), start, end)
+    return _stream(
+        query.order_by(models.Week.date.desc()), serializer, file_format
     )
 
 
-def build_archive() -> pd.DataFrame:
+def _week_schema() -> CompiledSchema:
     """
-    Build a dataframe of all the box office data.
+    Compiles ``WeekSchema`` to serialise rows of weeks.
 
     Returns:
-        Pandas dataframe of all the box office data.
+        Compiled schema of weeks.
     """
-    query = db.session.query(models.Film_Week)
-    data = query.order_by(
-        models.Film_Week.date.asc(), models.Film_Week.rank.asc()
-    ).all()
+    return CompiledSchema(
+        WeekSchema, {"date": Computed(models.Week.date, _format_date)}
+    )
 
-    film_week_schema = FilmWeekSchemaArchive()
 
-    df = pd.DataFrame([film_week_schema.dump(ix) for ix in data])
-    df["date"] = pd.to_datetime(df["date"])
-    df["weekend_gross"] = df["weekend_gross"].astype(float)
-    df["week_gross"] = df["week_gross"].astype(float)
-    df["number_of_cinemas"] = df["number_of_cinemas"].astype(int)
+def _weeks(query: Any, start: Optional[str], end: Optional[str]) -> Any:
+    """
+    Filters a query of weeks to a time range.
+
+    Args:
+        query: Query of weeks, or of their columns.
+        start: Start of time range (YYYY-MM-DD).
+        end: End of time range (YYYY-MM-DD).
+
+    Returns:
+        Unordered query of the weeks in the time range.
+    """
+    if start is not None:
+        query = query.filter(models.Week.date >= to_date(start))
+
+    if end is not None:
+        query = query.filter(models.Week.date <= to_date(end))
+
+    return query
+
+
+def archive_query(
+    after: Optional[datetime.datetime] = None, year: Optional[int] = None
+) -> Select:
+    """
+    Builds a query of the box office archive rows.
 
-    # Unwrap objects to their names with seperator.
-    df["country"] = ["/".join(list(ix)) for ix in df["country"]]
-    df["distributor"] = ["/".join(list(ix)) for ix in df["distributor"]]
+    The countries and distributors of each film are joined with ``/``
+    in the database, so each row is a complete line of the archive.
 
-    order = [
-        "date",
-        "rank",
-        "film",
+    Args:
+        after: Only include weeks after this date.
+        year: Only include weeks in this year.
+
+    Returns:
+        Select statement ordered by date and rank.
+    """
+    countries = _names_by_film(
+        models.countries.c.film_id,
+        models.countries.c.country_id,
+        models.Country,
         "country",
-        "weekend_gross",
+    )
+    distributors = _names_by_film(
+        models.distributors.c.film_id,
+        models.distributors.c.distributor_id,
+        models.Distributor,
         "distributor",
-        "weeks_on_release",
-        "number_of_cinemas",
-        "total_gross",
-        "week_gross",
-    ]
-    return df[order]
+    )
+
+    query = (
+        db.session.query(
+            models.Film_Week.date,
+            models.Film_Week.rank,
+            models.Film.name.label("film"),
+            func.coalesce(countries.c.country, "").label("country"),
+            models.Film_Week.weekend_gross,
+            func.coalesce(distributors.c.distributor, "").label("distributor"),
+            models.Film_Week.weeks_on_release,
+            models.Film_Week.number_of_cinemas,
+            models.Film_Week.total_gross,
+            models.Film_Week.week_gross,
+        )
+        .join(models.Film, models.Film.id == models.Film_Week.film_id)
+        .outerjoin(countries, countries.c.film_id == models.Film.id)
+        .outerjoin(distributors, distributors.c.film_id == models.Film.id)
+    )
+    if after is not None:
+        query = query.filter(models.Film_Week.date > after)
+    if year is not None:
+        query = query.filter(models.Film_Week.year == year)
+
+    return query.order_by(
+        models.Film_Week.date.asc(), models.Film_Week.rank.asc()
+    ).statement
+
+
+def _names_by_film(
+    film_id: Any,
+    foreign_id: Any,
+    model: Any,
+    label: str,
+    separator: str = "/",
+) -> Subquery:
+    """
+    Builds a subquery of each film's names from an association table,
+    joined in the order of their IDs.
+
+    Args:
+        film_id: Film ID column of the association table.
+        foreign_id: Other ID column of the association table.
+        model: Country or Distributor model.
+        label: Name of the joined names column.
+        separator: Separator between the names.
+
+    Returns:
+        Subquery of film ID and joined names.
+    """
+    names = (
+        db.session.query(
+            film_id.label("film_id"),
+            model.id.label("id"),
+            model.name.label("name"),
+        )
+        .join(model, model.id == foreign_id)
+        .order_by(film_id, model.id)
+        .subquery()
+    )
+    return (
+        db.session.query(
+            names.c.film_id,
+            models.string_agg(
+                names.c.name, separator, order_by=names.c.id
+            ).label(label),
+        )
+        .group_by(names.c.film_id)
+        .subquery()
+    )
+
+
+def archive_chunks(
+    after: Optional[datetime.datetime] = None,
+    chunksize: int = 10000,
+    year: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams the box office archive in chunks.
+
+    Rows are fetched from the database as they are needed,
+    so the whole archive is never held in memory.
+
+    Args:
+        after: Only include weeks after this date.
+        chunksize: Number of rows per chunk.
+        year: Only include weeks in this year.
+
+    Yields:
+        Pandas dataframe of box office data.
+    """
+    result = db.session.execute(
+        archive_query(after, year), execution_options={"stream_results": True}
+    )
+    for rows in result.partitions(chunksize):
+        df = pd.DataFrame(rows, columns=ARCHIVE_COLUMNS)
+        df["date"] = pd.to_datetime(df["date"])
+        df["weekend_gross"] = df["weekend_gross"].astype(float)
+        df["week_gross"] = df["week_gross"].astype(float)
+        df["number_of_cinemas"] = df["number_of_cinemas"].astype(int)
+        yield df
+
+
+def build_archive() -> pd.DataFrame:
+    """
+    Build a dataframe of all the box office data.
+
+    Returns:
+        Pandas dataframe of all the box office data.
+    """
+    chunks = list(archive_chunks())
+    if not chunks:
+        return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
 
 
 def to_date(date_string: str = "2000-01-20") -> datetime.datetime:
@@ -395,3 +819,16 @@ def to_date(date_string: str = "2000-01-20") -> datetime.datetime:
         Date object.
     """
     return datetime.datetime.strptime(date_string, "%Y-%m-%d")
+
+
+def _format_date(date: datetime.datetime) -> str:
+    """
+    Formats a date as the schemas do.
+
+    Args:
+        date: Date to format.
+
+    Returns:
+        Date string (YYYY-MM-DD).
+    """
+    return date.strftime("%Y-%m-%d")
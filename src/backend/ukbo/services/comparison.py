@@ -0,0 +1,163 @@
+import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence
+
+from sqlalchemy.sql import and_, case, func, select
+from ukbo import models
+from ukbo.extensions import db
+
+
+class Window(NamedTuple):
+    """
+    A period of time in one year, to compare with the same period in others.
+
+    Attributes:
+        year: Year the window is reported as.
+        start: Start of the window, inclusive.
+        end: End of the window, exclusive.
+    """
+
+    year: int
+    start: datetime.datetime
+    end: datetime.datetime
+
+
+def windows(
+    start: datetime.datetime, end: datetime.datetime, offsets: Iterable[int]
+) -> List[Window]:
+    """
+    Builds the same period of time in other years.
+
+    A range is moved back by each number of years, and reported as the year
+    it ends in, so a range can cross the end of a year.
+    A single day is matched to its ISO week in each year,
+    and years without that week are skipped.
+
+    Args:
+        start: Start of the period.
+        end: End of the period, inclusive.
+        offsets: Numbers of years to go back, 0 for the period itself.
+
+    Returns:
+        List of windows, in the order of the offsets.
+
+    Raises:
+        ValueError: If the start is after the end.
+    """
+    if start > end:
+        raise ValueError("Start must not be after the end.")
+
+    results = []
+    if start == end:
+        iso_year, week, _ = start.isocalendar()
+        for offset in offsets:
+            try:
+                monday = datetime.datetime.fromisocalendar(
+                    iso_year - offset, week, 1
+                )
+            except ValueError:
+                # Only some years have a week 53.
+                continue
+            results.append(
+                Window(
+                    iso_year - offset,
+                    monday,
+                    monday + datetime.timedelta(days=7),
+                )
+            )
+        return results
+
+    for offset in offsets:
+        window_end = shift_year(end, -offset)
+        results.append(
+            Window(
+                window_end.year,
+                shift_year(start, -offset),
+                window_end + datetime.timedelta(days=1),
+            )
+        )
+    return results
+
+
+def compare(windows: Sequence[Window]) -> List[Dict[str, Any]]:
+    """
+    Summarises the box office weeks in each window, in one query.
+
+    The weeks are read with one range of dates, from the earliest window
+    to the latest, so the query can use the index on ``week.date``.
+    Each week is labelled with the window it falls in, then grouped.
+    If windows overlap, a week counts towards the first.
+
+    Args:
+        windows: Windows to summarise.
+
+    Returns:
+        List of summaries of the windows with weeks, newest year first.
+    """
+    if not windows:
+        return []
+
+    date = models.Week.date
+    year = case(
+        *[
+            (and_(date >= window.start, date < window.end), window.year)
+            for window in windows
+        ]
+    )
+    weeks = (
+        select(
+            year.label("year"),
+            models.Week.week_gross,
+            models.Week.weekend_gross,
+            models.Week.number_of_releases,
+            models.Week.number_of_cinemas,
+            models.Week.admissions,
+        )
+        .where(
+            date >= min(window.start for window in windows),
+            date < max(window.end for window in windows),
+        )
+        .subquery()
+    )
+    query = (
+        select(
+            weeks.c.year,
+            func.sum(weeks.c.week_gross),
+            func.sum(weeks.c.weekend_gross),
+            func.sum(weeks.c.number_of_releases),
+            func.max(weeks.c.number_of_cinemas),
+            func.sum(weeks.c.admissions),
+        )
+        .where(weeks.c.year.isnot(None))
+        .group_by(weeks.c.year)
+        .order_by(weeks.c.year.desc())
+    )
+
+    return [
+        dict(
+            year=row[0],
+            week_gross=row[1],
+            weekend_gross=row[2],
+            number_of_releases=row[3],
+            number_of_cinemas=row[4],
+            admissions=row[5],
+        )
+        for row in db.session.execute(query)
+    ]
+
+
+def shift_year(date: datetime.datetime, years: int) -> datetime.datetime:
+    """
+    Moves a date by a number of years.
+    The 29th of February becomes the 28th in years that are not leap years.
+
+    Args:
+        date: Date to move.
+        years: Number of years to move by, negative to go back.
+
+    Returns:
+        Moved date.
+    """
+    try:
+        return date.replace(year=date.year + years)
+    except ValueError:
+        return date.replace(year=date.year + years, day=28)
@@ -0,0 +1,130 @@
+import os
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+import pandas as pd
+
+Names = TypeVar("Names", str, pd.Series)
+
+
+def normalise(names: Names) -> Names:
+    """
+    Cleans up a name, or a series of names, before they are checked.
+
+    Args:
+        names: Name or series of names.
+
+    Returns:
+        Stripped, upper case name or series of names.
+    """
+    if isinstance(names, str):
+        return names.strip().upper()
+    return names.str.strip().str.upper()
+
+
+def normalise_film(titles: Names) -> Names:
+    """
+    Cleans up a film title, or a series of them, before they are checked.
+    If a film ends with ', the', it is trimmed and added as a prefix.
+
+    Args:
+        titles: Film title or series of film titles.
+
+    Returns:
+        Cleaned film title or series of film titles.
+    """
+    titles = normalise(titles)
+    if isinstance(titles, str):
+        if titles.endswith(", THE"):
+            return "THE " + titles.rstrip(", THE")
+        return titles
+    the = titles.str.endswith(", THE")
+    return titles.where(~the, "THE " + titles.str.rstrip(", THE"))
+
+
+class CorrectionTable:
+    """
+    A table of common mistakes and their corrections.
+
+    The csv file is loaded once into a dictionary,
+    and reloaded only when the file is modified.
+
+    Attributes:
+        path: Path to the csv file of key, correction rows.
+        normalise: Function to clean up a name or series before it is checked.
+        strip: Whether to strip whitespace from the corrections.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        normalise: Callable[[Names], Names] = normalise,
+        strip: bool = False,
+    ) -> None:
+        self.path = path
+        self.normalise = normalise
+        self.strip = strip
+        self._cache: Tuple[Optional[int], Dict[str, str]] = (None, {})
+
+    def table(self) -> Dict[str, str]:
+        """
+        Gets the dictionary of corrections.
+        The file is only read again if it has been modified.
+
+        Returns:
+            Dictionary of mistake to correction.
+        """
+        try:
+            modified = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self._cache = (None, {})
+            return {}
+
+        cached_modified, corrections = self._cache
+        if cached_modified == modified:
+            return corrections
+
+        df = pd.read_csv(self.path, header=None, usecols=[0, 1])
+        df.columns = ["key", "correction"]
+        df = df.drop_duplicates(subset="key")
+        if self.strip:
+            df["correction"] = df["correction"].str.strip()
+
+        corrections = dict(zip(df["key"], df["correction"]))
+        self._cache = (modified, corrections)
+        return corrections
+
+    def correct_series(self, names: pd.Series) -> pd.Series:
+        """
+        Cleans and corrects a series of names.
+        Missing names are left missing.
+
+        Args:
+            names: Series of names to check.
+
+        Returns:
+            Series of corrected names.
+        """
+        mask = names.notna()
+        cleaned = self.normalise(names[mask].astype(str))
+        corrected = cleaned.map(self.table())
+        return names.astype(object).where(
+            ~mask, corrected.where(corrected.notna(), cleaned)
+        )
+
+    def correct(self, name: str) -> str:
+        """
+        Cleans and corrects one name.
+
+        Args:
+            name: Name to check.
+
+        Returns:
+            Corrected name.
+        """
+        cleaned = self.normalise(name)
+        return self.table().get(cleaned, cleaned)
+
+
+films = CorrectionTable("./data/film_check.csv", normalise_film, strip=True)
+distributors = CorrectionTable("./data/distributor_check.csv")
+countries = CorrectionTable("./data/country_check.csv")
@@ -1,13 +1,10 @@
 import datetime
 from typing import List, Optional
 
-import numpy as np
-import pandas as pd
 from flask import Response, abort, jsonify
 from slugify import slugify  # type: ignore
-from sqlalchemy import func
 from ukbo import models, services
-from ukbo.dto import CountrySchema, FilmSchemaStrict
+from ukbo.dto import CompiledSchema, CountrySchema, FilmSchemaStrict
 from ukbo.extensions import db
 
 
@@ -21,7 +18,9 @@ def list(page: int = 1, limit: int = 100) -> Response:
 
     Returns (JSON): Paginated list of countries.
     """
-    query = db.session.query(models.Country)
+    # Selects only the columns, not the films of each country.
+    serializer = CompiledSchema(CountrySchema)
+    query = db.session.query(*serializer.columns)
     data = query.order_by(models.Country.name.asc()).paginate(
         page=page, per_page=limit, error_out=False
     )
@@ -32,13 +31,16 @@ def list(page: int = 1, limit: int = 100) -> Response:
     next_page = (page + 1) if data.has_next else ""
     previous_page = (page - 1) if data.has_prev else ""
 
-    country_schema = CountrySchema()
-
-    return jsonify(
-        count=data.total,
-        next=next_page,
-        previous=previous_page,
-        results=[country_schema.dump(ix) for ix in data.items],
+    return Response(
+        serializer.dumps(
+            dict(
+                count=data.total,
+                next=next_page,
+                previous=previous_page,
+                results=[serializer.dump(row) for row in data.items],
+            )
+        ),
+        mimetype="application/json",
     )
 
 
@@ -86,9 +88,7 @@ def get_films(
     if country is None:
         abort(404)
 
-    query = db.session.query(models.Film).options(
-        db.selectinload(models.Film.weeks)
-    )
+    query = db.session.query(models.Film)
     query = query.filter(models.Film.countries.contains(country))
 
     # Apply sorting
@@ -114,6 +114,7 @@ def get_films(
 def get_box_office(slug: str, limit: int) -> Response:
     """
     Gets box office summary for a given country, grouped by years.
+    Read from the precomputed yearly rollups.
 
     Args:
         slug: Slug of the country to get.
@@ -123,35 +124,17 @@ def get_box_office(slug: str, limit: int) -> Response:
         JSON response of the list of years.
     """
 
-    query = db.session.query(
-        func.extract("year", models.Film_Week.date),
-        func.sum(models.Film_Week.total_gross),
-        func.count(models.Film.id),
-    ).group_by(func.extract("year", models.Film_Week.date))
-
-    query = query.join(models.Film).join(models.countries).join(models.Country)
-
-    query = query.filter(models.Country.slug == slug)
+    country_id = (
+        db.session.query(models.Country.id)
+        .filter(models.Country.slug == slug)
+        .scalar()
+    )
 
     # get current year and set limit
     now = datetime.datetime.now().year
-    query = query.filter(
-        func.extract("year", models.Film_Week.date) >= (now - limit)
-    )
-
-    data = query.order_by(
-        func.extract("year", models.Film_Week.date).desc()
-    ).all()
 
     return jsonify(
-        results=[
-            dict(
-                year=row[0],
-                total=row[1],
-                count=row[2],
-            )
-            for row in data
-        ]
+        results=services.rollup.box_office("country", country_id, now - limit)
     )
 
 
@@ -192,18 +175,19 @@ def add_country(country: str) -> Optional[List[models.Country]]:
     return new_countries
 
 
-def search(search_query: str) -> Response:
+def search(search_query: str, limit: int = 10) -> Response:
     """
     Search countries by name.
 
+    Ranked by relevance, then by gross.
+
     Args:
         search_query: Search query.
+        limit: Maximum number of countries.
 
     Returns (JSON): List of countries.
     """
-    query = db.session.query(models.Country)
-    query = query.filter(models.Country.name.ilike(f"%{search_query}%"))
-    data = query.limit(10).all()
+    data = services.search.search("country", search_query, limit)
 
     country_schema = CountrySchema()
 
@@ -220,14 +204,4 @@ def spellcheck_country(country: str) -> str:
     Returns:
         str: Cleaned country
     """
-    country = country.strip().upper()
-    try:
-        df = pd.read_csv("./data/country_check.csv", header=None)
-    except FileNotFoundError:
-        return country
-    df.columns = ["key", "correction", "flag"]
-
-    if country in df["key"].values:
-        df = df[df["key"].str.match(country)]
-        country = df["correction"].iloc[0]
-    return country
+    return services.corrections.countries.correct(country)
@@ -1,12 +1,11 @@
 import datetime
 from typing import List, Optional
 
-import pandas as pd
 from flask import Response, abort, jsonify
 from slugify import slugify  # type: ignore
 from sqlalchemy.sql import func
 from ukbo import models, services
-from ukbo.dto import DistributorSchema, FilmSchemaStrict
+from ukbo.dto import CompiledSchema, DistributorSchema, FilmSchemaStrict
 from ukbo.extensions import db
 
 
@@ -20,7 +19,9 @@ def list(page: int = 1, limit: int = 100) -> Response:
 
     Returns (JSON): Paginated list of distributors.
     """
-    query = db.session.query(models.Distributor)
+    # Selects only the columns, not the films of each distributor.
+    serializer = CompiledSchema(DistributorSchema)
+    query = db.session.query(*serializer.columns)
     data = query.order_by(models.Distributor.name.asc()).paginate(
         page=page, per_page=limit, error_out=False
     )
@@ -31,13 +32,16 @@ def list(page: int = 1, limit: int = 100) -> Response:
     next_page = (page + 1) if data.has_next else ""
     previous_page = (page - 1) if data.has_prev else ""
 
-    distributor_schema = DistributorSchema()
-
-    return jsonify(
-        count=data.total,
-        next=next_page,
-        previous=previous_page,
-        results=[distributor_schema.dump(ix) for ix in data.items],
+    return Response(
+        serializer.dumps(
+            dict(
+                count=data.total,
+                next=next_page,
+                previous=previous_page,
+                results=[serializer.dump(row) for row in data.items],
+            )
+        ),
+        mimetype="application/json",
     )
 
 
@@ -85,9 +89,7 @@ def get_films(
     if distributor is None:
         abort(404)
 
-    query = db.session.query(models.Film).options(
-        db.joinedload(models.Film.weeks)
-    )
+    query = db.session.query(models.Film)
     query = query.join(models.distributors)
     query = query.join(models.Distributor)
 
@@ -116,6 +118,7 @@ def get_films(
 def get_box_office(slug: str, limit: int) -> Response:
     """
     Gets box office summary for a given distributor, grouped by years.
+    Read from the precomputed yearly rollups.
 
     Args:
         slug: Slug of the distributor to get.
@@ -125,39 +128,19 @@ def get_box_office(slug: str, limit: int) -> Response:
         JSON response of the list of years.
     """
 
-    query = db.session.query(
-        func.extract("year", models.Film_Week.date),
-        func.sum(models.Film_Week.total_gross),
-        func.count(models.Film.id),
-    ).group_by(func.extract("year", models.Film_Week.date))
-
-    query = (
-        query.join(models.Film, models.Film.id == models.Film_Week.film_id)
-        .join(models.distributors)
-        .join(models.Distributor)
+    distributor_id = (
+        db.session.query(models.Distributor.id)
+        .filter(models.Distributor.slug == slug)
+        .scalar()
     )
 
-    query = query.filter(models.Distributor.slug == slug)
-
     # get current year and set limit
     now = datetime.datetime.now().year
-    query = query.filter(
-        func.extract("year", models.Film_Week.date) >= (now - limit)
-    )
-
-    data = query.order_by(
-        func.extract("year", models.Film_Week.date).desc()
-    ).all()
 
     return jsonify(
-        results=[
-            dict(
-                year=row[0],
-                total=row[1],
-                count=row[2],
-            )
-            for row in data
-        ]
+        results=services.rollup.box_office(
+            "distributor", distributor_id, now - limit
+        )
     )
 
 
@@ -196,18 +179,19 @@ def add_distributor(distributor: str) -> Optional[List[models.Distributor]]:
     return new_distributors
 
 
-def search(search_query: str) -> Response:
+def search(search_query: str, limit: int = 10) -> Response:
     """
     Search distributors by name.
 
+    Ranked by relevance, then by gross.
+
     Args:
         search_query: Search query.
+        limit: Maximum number of distributors.
 
     Returns (JSON): List of distributors.
     """
-    query = db.session.query(models.Distributor)
-    query = query.filter(models.Distributor.name.ilike(f"%{search_query}%"))
-    data = query.limit(10).all()
+    data = services.search.search("distributor", search_query, limit)
 
     distributor_schema = DistributorSchema()
 
@@ -224,7 +208,7 @@ def market_share(year: Optional[str] = None) -> Response:
     Returns (JSON): List of distributors and their market share.
     """
     query = db.session.query(
-        func.extract("year", models.Film_Week.date),
+        models.Film_Week.year,
         models.Distributor,
         func.sum(models.Film_Week.week_gross),
     )
@@ -233,13 +217,11 @@ def market_share(year: Optional[str] = None) -> Response:
     query = query.join(models.distributors)
     query = query.join(models.Distributor)
     query = query.group_by(models.Distributor)
-    query = query.group_by(func.extract("year", models.Film_Week.date))
-    query = query.order_by(func.extract("year", models.Film_Week.date).desc())
+    query = query.group_by(models.Film_Week.year)
+    query = query.order_by(models.Film_Week.year.desc())
 
     if year is not None:
-        query = query.filter(
-            func.extract("year", models.Film_Week.date) == year
-        )
+        query = query.filter(models.Film_Week.year == year)
     else:
         query = query.filter(
             models.Film_Week.date >= datetime.date(2018, 1, 1)
@@ -304,7 +286,7 @@ def market_share_date(start: str, end: str) -> Response:
     )
 
 
-def spellcheck_distributor(distributor: pd.Series) -> str:
+def spellcheck_distributor(distributor: str) -> str:
     """
     Spellchecks the distributor against a list of common mistakes
 
@@ -314,14 +296,4 @@ def spellcheck_distributor(distributor: pd.Series) -> str:
     Returns:
         str: Cleaned distributor
     """
-    distributor = distributor.strip().upper()
-    try:
-        df = pd.read_csv("./data/distributor_check.csv", header=None)
-    except FileNotFoundError:
-        return distributor
-    df.columns = ["key", "correction"]
-
-    if distributor in df["key"].values:
-        df = df[df["key"].str.match(distributor)]
-        distributor = df["correction"].iloc[0]
-    return distributor
+    return services.corrections.distributors.correct(distributor)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from flask import Response, abort, jsonify
 from ukbo import models
@@ -112,9 +112,29 @@ def create(
 
     """
     event = models.Event(area=area.value, state=state, message=message)
-    event.save()
     try:
         event.save()
     except Exception:
         print(f"Save failed: {Exception}")
     return event
+
+
+def summarise(
+    area: models.Area, state: models.State, messages: List[str]
+) -> Optional[models.Event]:
+    """
+    Create one event for many messages, such as the warnings of a load.
+
+    Args:
+        area: Area of the event.
+        state: State of the event.
+        messages: Messages to summarise.
+
+    Returns: The Event object, or None if there are no messages.
+
+    """
+    if not messages:
+        return None
+    return create(
+        area, state, f"Warnings ({len(messages)}).\n" + "\n".join(messages)
+    )
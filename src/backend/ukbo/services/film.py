@@ -1,21 +1,29 @@
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-import pandas as pd
 from flask import Response, abort, jsonify
 from slugify import slugify  # type: ignore
-from sqlalchemy import func
-from sqlalchemy.orm import joinedload
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import selectinload
 from ukbo import models, services
 from ukbo.dto import (
+    CompiledSchema,
     CountrySchema,
     DistributorSchema,
     FilmSchema,
     FilmSchemaStrict,
-    FilmSchemaValues,
 )
 from ukbo.extensions import db
 
+STATS_COLUMNS = [
+    "gross",
+    "first_week",
+    "last_week",
+    "opening_weekend",
+    "weeks_on_release",
+    "peak_cinemas",
+]
+
 
 def list_all(sort: Optional[str], page: int = 1, limit: int = 100) -> Response:
     """
@@ -35,8 +43,8 @@ def list_all(sort: Optional[str], page: int = 1, limit: int = 100) -> Response:
     sorting_options = {
         "asc_name": models.Film.name.asc(),
         "desc_name": models.Film.name.desc(),
-        "asc_gross": func.max(models.Film_Week.total_gross).asc(),
-        "desc_gross": func.max(models.Film_Week.total_gross).desc(),
+        "asc_gross": models.FilmStats.gross.asc(),
+        "desc_gross": models.FilmStats.gross.desc(),
     }
 
     if sort is not None:
@@ -44,8 +52,9 @@ def list_all(sort: Optional[str], page: int = 1, limit: int = 100) -> Response:
         if sort_option is None:
             # Handle invalid sorting option
             return jsonify(error="Invalid sorting option"), 400
-        # Join the table when sorting by gross
-        query = query.join(models.Film_Week).group_by(models.Film.id)
+        # Join the precomputed totals when sorting by gross
+        if sort in {"asc_gross", "desc_gross"}:
+            query = query.join(models.FilmStats)
         query = query.order_by(sort_option)
     else:
         query = query.order_by(models.Film.name.asc())
@@ -112,40 +121,48 @@ def add_film(
     film: str,
     countries: Optional[List[models.Country]],
     distributors: Optional[List[models.Distributor]],
+    warnings: Optional[List[str]] = None,
 ) -> models.Film:
     """
     Add a film to the database.
 
     Checks the database if the film exists - returns the object.
+    Names that only differ by case, accents, punctuation or articles match.
     If not - creates it, adds it to the database and returns it.
 
     Args:
         film: Name of the film.
         distributors: List of Distributor objects.
         countries: List of country objects.
+        warnings: List to collect duplicate warnings in,
+            so a load can report them once. Otherwise each is an event.
 
     Returns Film object.
     """
     film = film.strip()
 
-    if distributors:
-        query = db.session.query(models.Film).filter(models.Film.name == film)
-        query = query.join(models.Film.distributors).filter(
-            models.Distributor.id.in_(
-                [distributor.id for distributor in distributors]
-            )
-        )
-        instance = query.first()
-    else:
-        instance = (
-            db.session.query(models.Film)
-            .filter(models.Film.name == film)
-            .first()
-        )
+    instance = _find_film(models.Film.name == film, distributors)
+    if instance:
+        return instance
 
+    # Try names that only differ by their formatting.
+    matcher = services.search.fuzzy_index("film")
+    instance = _find_film(
+        models.Film.id.in_(matcher.exact(film)), distributors
+    )
     if instance:
         return instance
 
+    similar = [id for id, _ in matcher.search(film, limit=3)]
+    if similar:
+        names = db.session.query(models.Film.name).filter(
+            models.Film.id.in_(similar)
+        )
+        _warn(
+            f"Possible duplicate - {film} ~ {', '.join(i for (i,) in names)}.",
+            warnings,
+        )
+
     distributors = distributors if distributors is not None else []
     countries = countries if countries is not None else []
 
@@ -163,9 +180,7 @@ def add_film(
         # Film exists but with a different distributor
         db.session.rollback()
         print(f"Duplicate {film}")
-        services.events.create(
-            models.Area.etl, models.State.warning, f"Duplicate - {film}."
-        )
+        _warn(f"Duplicate - {film}.", warnings)
         if distributors:
             slug = slugify(f"{film}-{distributors[0].name}-{uuid.uuid4()}")
         else:
@@ -176,6 +191,20 @@ def add_film(
     return new
 
 
+def _warn(message: str, warnings: Optional[List[str]]) -> None:
+    """
+    Collects a duplicate warning, or creates an event for it.
+
+    Args:
+        message: Message of the warning.
+        warnings: List to collect the warning in, or None for an event.
+    """
+    if warnings is not None:
+        warnings.append(message)
+    else:
+        services.events.create(models.Area.etl, models.State.warning, message)
+
+
 def delete_film(id: int) -> bool:
     """
     Delete a film and all its associated data.
@@ -190,8 +219,12 @@ def delete_film(id: int) -> bool:
     data = query.first()
     if data is None:
         abort(404)
+    distributor_ids = [i.id for i in data.distributors]
+    country_ids = [i.id for i in data.countries]
     try:
         data.delete()
+        services.rollup.refresh("distributor", distributor_ids)
+        services.rollup.refresh("country", country_ids)
         db.session.commit()
         return True
     except Exception:
@@ -209,112 +242,248 @@ def search(
 ) -> Response:
     """
     Search films by name.
+    Ranked by relevance, then by gross, unless a sort is given.
+    If no names contain the query, films with similar names are found instead.
 
     Args:
         search_query: Search query.
 
     Returns (JSON): List of films.
     """
-    # main query
-    query = db.session.query(models.Film)
-    query = query.filter(models.Film.name.ilike(f"%{search_query}%"))
-
-    # apply filters
-    query = services.filters.apply_filters(query, query_filter, sort_filter)
-
-    # Execute the query to retrieve all films
-    all_films = query.options(joinedload(models.Film.distributors)).all()
-
-    # # Find the film with the highest total_gross
-    if all_films:
-        film_with_highest_gross = max(all_films, key=lambda film: film.gross)
+    query = _filtered(
+        services.search.matches("film", search_query),
+        services.search.rank("film", search_query),
+        query_filter,
+        sort_filter,
+    )
 
-        # Retrieve the highest total_gross value
-        highest_gross_value = film_with_highest_gross.gross
-    else:
-        highest_gross_value = 0
+    # Aggregate the matches for the count and facets, without loading them.
+    film_ids = query.with_entities(models.Film.id).order_by(None).subquery()
+    count, max_gross = db.session.query(
+        func.count(film_ids.c.id), func.max(_gross(film_ids.c.id))
+    ).one()
+
+    if not count:
+        # Probably a typo.
+        ids = services.search.similar("film", search_query)
+        query = _filtered(
+            models.Film.id.in_(ids),
+            [services.search.by_position(models.Film.id, ids)],
+            query_filter,
+            sort_filter,
+        )
+        film_ids = (
+            query.with_entities(models.Film.id).order_by(None).subquery()
+        )
+        count, max_gross = db.session.query(
+            func.count(film_ids.c.id), func.max(_gross(film_ids.c.id))
+        ).one()
 
-    # Get unique search metadata
-    distributors = unique_distributors(all_films)
-    countries = unique_countries(all_films)
+    distributors = facets(
+        film_ids, models.Distributor, models.distributors, DistributorSchema
+    )
+    countries = facets(
+        film_ids, models.Country, models.countries, CountrySchema
+    )
 
-    # query to paginate
-    data = query.paginate(page=page, per_page=25, error_out=False)
-    if data is None:
-        return {"none"}
+    # Fetch the page
+    per_page = 25
+    data = (
+        query.options(
+            selectinload(models.Film.distributors),
+            selectinload(models.Film.countries),
+            selectinload(models.Film.stats),
+        )
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+        .all()
+    )
 
-    next_page = (page + 1) if data.has_next else ""
-    previous_page = (page - 1) if data.has_prev else ""
+    next_page = (page + 1) if page * per_page < count else ""
+    previous_page = (page - 1) if page > 1 else ""
 
     film_schema = FilmSchemaStrict()
 
     return {
-        "count": data.total,
+        "count": count,
         "next": next_page,
         "previous": previous_page,
         "results": [film_schema.dump(ix) for ix in data],
         "distributors": distributors,
         "countries": countries,
-        "max_gross": highest_gross_value,
+        "max_gross": max_gross or 0,
     }
 
 
-def unique_countries(films: List[models.Film]) -> List[Dict[str, Any]]:
+def _filtered(
+    criterion: Any,
+    order: List[Any],
+    query_filter: services.filters.QueryFilter,
+    sort_filter: services.filters.SortFilter,
+) -> Any:
     """
-    Extract a set of countries from a list of films.
+    Builds the query of the films matching a search.
+
+    Args:
+        criterion: SQL filter of the matching films.
+        order: Order of the results, unless a sort is given.
+        query_filter: Filters of the search.
+        sort_filter: Sort of the search.
+
+    Returns:
+        Query of films.
     """
-    country_schema = CountrySchema()
+    query = db.session.query(models.Film).filter(criterion)
+    query = services.filters.apply_filters(query, query_filter, sort_filter)
+    if sort_filter.sort is None:
+        # Replace the default name order with the search ranking.
+        query = query.order_by(None).order_by(*order)
+    return query
 
-    countries: List[Dict[str, Any]] = []
-    for film in films:
-        if film.countries:
-            countries.extend(
-                country_schema.dump(country) for country in film.countries
-            )
 
-    # Get unique countries and sort them
-    unique = [dict(s) for s in {frozenset(d.items()) for d in countries}]
-    return sorted(unique, key=lambda c: c["name"])
+def facets(
+    film_ids: Any, model: Any, association: Any, schema: type
+) -> List[Dict[str, Any]]:
+    """
+    Counts the films of each distributor or country in a set of films.
 
+    Args:
+        film_ids: Subquery of the IDs of the films.
+        model: Distributor or Country model.
+        association: Association table of the model and films.
+        schema: Schema of the model.
 
-def unique_distributors(films: List[models.Film]) -> List[Dict[str, Any]]:
+    Returns:
+        List of the schema's fields with a count of films, sorted by name.
     """
-    Extract a set of distributors from a list of films.
+    compiled = CompiledSchema(schema)
+    film_count = func.count(association.c.film_id)
+    query = (
+        db.session.query(*compiled.columns, film_count)
+        .join(
+            association, association.c[f"{model.__tablename__}_id"] == model.id
+        )
+        .filter(association.c.film_id.in_(select(film_ids.c.id)))
+        .group_by(model.id)
+        .order_by(model.name)
+    )
+    return [dict(compiled.dump(row[:-1]), count=row[-1]) for row in query]
+
+
+def _gross(film_id: Any) -> Any:
     """
-    distributor_schema = DistributorSchema()
-
-    distributors: List[Dict[str, Any]] = []
-    for film in films:
-        if film.distributors:
-            distributors.extend(
-                distributor_schema.dump(distributor)
-                for distributor in film.distributors
-            )
+    Builds an expression of the gross of a film.
+    Films loaded before their totals are refreshed use their weeks,
+    like ``Film.gross``.
+
+    Args:
+        film_id: Column of the film ID.
 
-    # Get unique distributors and sort them.
-    unique = [dict(s) for s in {frozenset(d.items()) for d in distributors}]
-    return sorted(unique, key=lambda c: c["name"])
+    Returns:
+        SQL expression of the gross.
+    """
+    return func.coalesce(
+        select(models.FilmStats.gross)
+        .where(models.FilmStats.film_id == film_id)
+        .scalar_subquery(),
+        select(func.max(models.Film_Week.total_gross))
+        .where(models.Film_Week.film_id == film_id)
+        .scalar_subquery(),
+        0,
+    )
+
+
+def refresh_stats(film_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Refreshes the precomputed totals of films from their weeks.
+
+    Only the given films are refreshed, so a weekly load
+    only aggregates the weeks of the films it touched.
+    Films without any weeks have their totals removed.
+
+    Args:
+        film_ids: IDs of the films to refresh, or all films if None.
+
+    Returns None.
+    """
+    if film_ids is None:
+        film_ids = [film_id for (film_id,) in db.session.query(models.Film.id)]
+    ids = sorted({int(film_id) for film_id in film_ids})
+
+    for chunk in models.batches(ids):
+        query = db.session.query(
+            models.Film_Week.film_id,
+            func.max(models.Film_Week.total_gross).label("gross"),
+            func.min(models.Film_Week.date).label("first_week"),
+            func.max(models.Film_Week.date).label("last_week"),
+            func.max(
+                case(
+                    (
+                        models.Film_Week.weeks_on_release == 1,
+                        models.Film_Week.weekend_gross,
+                    )
+                )
+            ).label("opening_weekend"),
+            func.max(models.Film_Week.weeks_on_release).label(
+                "weeks_on_release"
+            ),
+            func.max(models.Film_Week.number_of_cinemas).label("peak_cinemas"),
+        )
+        query = query.filter(models.Film_Week.film_id.in_(chunk))
+        rows = [
+            row._asdict() for row in query.group_by(models.Film_Week.film_id)
+        ]
+
+        models.FilmStats.upsert_many(
+            rows,
+            index_elements=["film_id"],
+            update_columns=STATS_COLUMNS,
+        )
+
+        stale = set(chunk) - {row["film_id"] for row in rows}
+        if stale:
+            models.FilmStats.query.filter(
+                models.FilmStats.film_id.in_(stale)
+            ).delete(synchronize_session=False)
+
+
+def _find_film(
+    criterion: Any, distributors: Optional[List[models.Distributor]]
+) -> Optional[models.Film]:
+    """
+    Finds a film sharing any of the distributors.
+
+    Args:
+        criterion: SQL filter of the films to check.
+        distributors: List of Distributor objects.
+
+    Returns:
+        Film object, or None.
+    """
+    query = db.session.query(models.Film).filter(criterion)
+    if distributors:
+        query = query.join(models.Film.distributors).filter(
+            models.Distributor.id.in_(
+                [distributor.id for distributor in distributors]
+            )
+        )
+    return query.first()
 
 
 def partial_search(search_query: str, limit: int = 15) -> Response:
     """
-    Search films by name.
+    Search films by the start of their name, highest gross first.
+    Served from the in memory prefix index.
 
     Args:
         search_query: Search query.
 
     Returns (JSON): List of partial films.
     """
-    query = db.session.query(models.Film)
-    query = query.filter(models.Film.name.ilike(f"{search_query}%"))
-    data = query.limit(limit).all()
-
-    film_schema = FilmSchemaValues()
-
-    return [] if data is None else [film_schema.dump(ix) for ix in data]
+    return services.search.autocomplete(search_query, limit)
 
 
-def spellcheck_film(film_title: pd.Series) -> str:
+def spellcheck_film(film_title: str) -> str:
     """
     Spellchecks the film title against a list of common mistakes
 
@@ -326,19 +495,4 @@ def spellcheck_film(film_title: pd.Series) -> str:
     Returns:
         str: Cleaned title
     """
-    film_title = film_title.strip().upper()
-    # if film ends with ', the', trim and add to prefix
-    if film_title.endswith(", THE"):
-        film_title = "THE " + film_title.rstrip(", THE")
-
-    # checks against the list of mistakes
-    try:
-        df = pd.read_csv("./data/film_check.csv", header=None)
-    except FileNotFoundError:
-        return film_title
-    df.columns = ["key", "correction"]
-
-    if film_title in df["key"].values:
-        df = df[df["key"].str.contains(film_title, regex=False)]
-        film_title = df["correction"].iloc[0].strip()
-    return film_title
+    return services.corrections.films.correct(film_title)
@@ -2,7 +2,7 @@ from typing import List, Optional
 
 import flask_sqlalchemy
 from flask import jsonify
-from sqlalchemy import extract, func
+from sqlalchemy import and_
 from ukbo import models
 
 
@@ -12,7 +12,7 @@ def apply_filters(query, *filters):
 
     This function takes a SQLAlchemy query object and a variable number of filter objects.
     It applies each filter to the query and, if any of the filters require a join with
-    the 'models.Film_Week' table, it performs the join before applying the filters.
+    the 'models.FilmStats' table, it performs the join before applying the filters.
 
     Args:
         query (flask_sqlalchemy.query.Query): The SQLAlchemy query to which filters will be applied.
@@ -25,7 +25,7 @@ def apply_filters(query, *filters):
     requires_join = any(filter.requires_join() for filter in filters)
 
     if requires_join:
-        query = query.join(models.Film_Week).group_by(models.Film.id)
+        query = query.join(models.FilmStats)
 
     for filter in filters:
         query = filter.add_filter(query)
@@ -73,8 +73,8 @@ class SortFilter(Filter):
         self.sorting_options = {
             "asc_name": models.Film.name.asc(),
             "desc_name": models.Film.name.desc(),
-            "asc_gross": func.max(models.Film_Week.total_gross).asc(),
-            "desc_gross": func.max(models.Film_Week.total_gross).desc(),
+            "asc_gross": models.FilmStats.gross.asc(),
+            "desc_gross": models.FilmStats.gross.desc(),
         }
 
     def requires_join(self) -> bool:
@@ -139,12 +139,7 @@ class QueryFilter:
         """
         Determine if this filter requires a join.
         """
-        return (
-            self.min_year is not None
-            or self.max_year is not None
-            or self.min_box is not None
-            or self.max_box is not None
-        )
+        return self.min_box is not None or self.max_box is not None
 
     def add_filter(
         self, query: flask_sqlalchemy.query.Query
@@ -158,33 +153,79 @@ class QueryFilter:
         Returns: The query with filters applied.
         """
         if self.distributor_ids is not None:
-            query = query.join(models.distributors).join(models.Distributor)
             query = query.filter(
-                models.Distributor.id.in_(self.distributor_ids)
+                models.Film.distributors.any(
+                    models.Distributor.id.in_(self.distributor_ids)
+                )
             )
 
         if self.country_ids is not None:
-            query = query.join(models.countries).join(models.Country)
-            query = query.filter(models.Country.id.in_(self.country_ids))
-
-        if self.min_year is not None:
             query = query.filter(
-                extract("year", models.Film_Week.date) >= self.min_year
+                models.Film.countries.any(
+                    models.Country.id.in_(self.country_ids)
+                )
             )
 
+        # Films with a week inside the years.
+        years = []
+        if self.min_year is not None:
+            years.append(models.Film_Week.year >= self.min_year)
         if self.max_year is not None:
-            query = query.filter(
-                extract("year", models.Film_Week.date) <= self.max_year
-            )
+            years.append(models.Film_Week.year <= self.max_year)
+        if years:
+            query = query.filter(models.Film.weeks.any(and_(*years)))
 
         if self.min_box is not None:
-            query = query.having(
-                func.max(models.Film_Week.total_gross) >= self.min_box
-            )
+            query = query.filter(models.FilmStats.gross >= self.min_box)
 
         if self.max_box is not None:
-            query = query.having(
-                func.max(models.Film_Week.total_gross) <= self.max_box
+            query = query.filter(models.FilmStats.gross <= self.max_box)
+
+        return query
+
+    def add_week_filter(
+        self, query: flask_sqlalchemy.query.Query
+    ) -> flask_sqlalchemy.query.Query:
+        """
+        Adds filters to a query of film weeks if they are present.
+
+        Films are matched with ``EXISTS`` subqueries rather than joins,
+        so a week is never repeated and the week ordering is kept.
+
+        Args:
+            query: The query of film weeks that will be executed.
+
+        Returns: The query with filters applied.
+        """
+        films = []
+        if self.distributor_ids is not None:
+            films.append(
+                models.Film.distributors.any(
+                    models.Distributor.id.in_(self.distributor_ids)
+                )
+            )
+
+        if self.country_ids is not None:
+            films.append(
+                models.Film.countries.any(
+                    models.Country.id.in_(self.country_ids)
+                )
             )
 
+        gross = []
+        if self.min_box is not None:
+            gross.append(models.FilmStats.gross >= self.min_box)
+        if self.max_box is not None:
+            gross.append(models.FilmStats.gross <= self.max_box)
+        if gross:
+            films.append(models.Film.stats.has(and_(*gross)))
+
+        if films:
+            query = query.filter(models.Film_Week.film.has(and_(*films)))
+
+        if self.min_year is not None:
+            query = query.filter(models.Film_Week.year >= self.min_year)
+        if self.max_year is not None:
+            query = query.filter(models.Film_Week.year <= self.max_year)
+
         return query
@@ -1,11 +1,21 @@
-from typing import Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from flask import Response, abort, jsonify
-from sqlalchemy.sql import func, text
+from sqlalchemy.sql import case, cast, func
 from ukbo import models
 from ukbo.dto import DistributorSchema
 from ukbo.extensions import db
 
+# Market share model, association table and ID column of each entity type.
+MARKET_SHARES: Dict[str, Tuple[Any, Any, str]] = {
+    "distributor": (
+        models.DistributorMarketShare,
+        models.distributors,
+        "distributor_id",
+    ),
+    "country": (models.CountryMarketShare, models.countries, "country_id"),
+}
+
 
 def get_distributor(year: Optional[str] = None) -> Response:
     """
@@ -73,13 +83,16 @@ def get_distributor(year: Optional[str] = None) -> Response:
     return jsonify(results=response_data)
 
 
-def load_market_share_data(entity_type: str = "distributor") -> None:
+def load_market_share_data(
+    entity_type: str = "distributor", years: Optional[Iterable[int]] = None
+) -> None:
     """
     Abstract load function to load market share data into the corresponding table.
 
     Args:
         entity_type (str, optional): The type of entity for which to load market share data.
             Possible values are "distributor" and "country". Defaults to "distributor".
+        years (Iterable[int], optional): The years to load. If not provided, all years are loaded.
 
     Raises:
         ValueError: If the provided entity_type is not one of the supported values.
@@ -88,8 +101,10 @@ def load_market_share_data(entity_type: str = "distributor") -> None:
         None
 
     Notes:
-        - This function loads market share data into the respective table based on the entity_type.
-        - It calculates the market share for distributors or countries for each year and stores the results in the database.
+        - The market share of every entity and year is calculated in one query,
+          see ``calculate_market_share``.
+        - Each year is then replaced with one bulk delete and insert,
+          all in one transaction.
         - If entity_type is not provided, the function defaults to loading data for distributors.
 
     Example:
@@ -99,148 +114,181 @@ def load_market_share_data(entity_type: str = "distributor") -> None:
         To load market share data for distributors (default):
         >>> load_market_share_data()
     """
-    query = db.session.query(
-        func.extract("year", models.Film_Week.date),
-        models.Distributor,
-        func.sum(models.Film_Week.week_gross),
+    try:
+        _replace_years(entity_type, years)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def mark_years(years: Optional[Iterable[int]] = None) -> None:
+    """
+    Marks years of box office data as changed,
+    so the market share task recalculates them.
+    The caller commits them with the data that changed.
+
+    Args:
+        years (Iterable[int], optional): The years that changed. If not provided, all years are marked.
+
+    Returns:
+        None
+    """
+    if years is None:
+        years = [
+            year for (year,) in db.session.query(models.Week.year).distinct()
+        ]
+
+    models.DirtyYear.insert_many(
+        [{"year": int(year)} for year in sorted(set(years))],
+        ignore_conflicts=True,
     )
-    query = query.join(models.Film)
-
-    if entity_type == "distributor":
-        query = query.join(models.distributors)
-        query = query.join(models.Distributor)
-        query = query.group_by(models.Distributor)
-    elif entity_type == "country":
-        query = query.join(models.countries)
-        query = query.join(models.Country)
-        query = query.group_by(models.Country)
-    else:
-        raise ValueError("Invalid entity type.")
-
-    query = query.group_by(func.extract("year", models.Film_Week.date))
-    query = query.order_by(func.extract("year", models.Film_Week.date).desc())
 
-    data = query.all()
 
-    if not data:
-        return None
+def refresh_dirty_years() -> List[int]:
+    """
+    Recalculates the market share of the years marked as changed,
+    for every entity type, and clears the marks in the same transaction.
 
-    # Perform calculations and insert the results into the denormalized table
-    for row in data:
-        year, entity, total_gross = row
-        market_share_percentage = _calculate_market_share(
-            total_gross, str(year)
+    Returns:
+        List[int]: The years that were recalculated.
+    """
+    years = [
+        year
+        for (year,) in db.session.query(models.DirtyYear.year).order_by(
+            models.DirtyYear.year
         )
-
-        _insert_market_share_data(
-            int(year),
-            entity,
-            market_share_percentage,
-            total_gross,
-            entity_type,
+    ]
+    if not years:
+        return years
+
+    try:
+        for entity_type in MARKET_SHARES:
+            _replace_years(entity_type, years)
+        models.DirtyYear.query.filter(models.DirtyYear.year.in_(years)).delete(
+            synchronize_session=False
         )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
 
+    return years
 
-def _insert_market_share_data(
-    year: int,
-    entity: Union[models.Distributor, models.Country],
-    market_share: float,
-    gross: int,
-    entity_type: str,
-) -> None:
+
+def calculate_market_share(
+    entity_type: str = "distributor", years: Optional[Iterable[int]] = None
+) -> Any:
     """
-    Abstract insert function to insert market share data into the corresponding table.
+    Builds a query of the gross and market share of each entity in each year.
+
+    The gross of each entity is summed from its film weeks,
+    and divided by the total week gross of the year in the same query.
 
     Args:
-        year (int): The year for which the market share data is being inserted.
-        entity (Union[models.Distributor, models.Country]): The entity (distributor or country)
-            for which the market share data is being inserted.
-        market_share (float): The market share percentage for the specified entity and year.
-        gross (int): The total gross amount for the specified entity and year.
-        entity_type (str): The type of entity for which the data is being inserted.
-            Possible values are "distributor" and "country".
+        entity_type (str, optional): The type of entity, "distributor" or "country".
+            Defaults to "distributor".
+        years (Iterable[int], optional): The years to calculate. If not provided, all years are included.
 
     Raises:
         ValueError: If the provided entity_type is not one of the supported values.
 
     Returns:
-        None
-
-    Example:
-        To insert market share data for a distributor:
-        >>> distributor = get_distributor_by_id(1)
-        >>> _insert_market_share_data(2023, distributor, 15.2, 1000000, "distributor")
+        Query of the entity ID, year, gross and market share percentage.
     """
-    if entity_type == "distributor":
-        market_share_data = models.DistributorMarketShare(
-            year=year,
-            distributor_id=entity.id,
-            market_share=market_share,
-            gross=gross,
-        )
-    elif entity_type == "country":
-        raise NotImplementedError("Not done country yet.")
-        # market_share_data = models.DistributorMarketShare(
-        #     year=year,
-        #     distributor_id=entity.id,
-        #     market_share=market_share,
-        #     gross=gross,
-        # )
-    else:
-        raise ValueError(
-            "Invalid entity type. Supported values are 'distributor' and 'country'."
+    _, association, key = _market_share(entity_type)
+    entity_id = association.c[key]
+
+    gross = (
+        db.session.query(
+            entity_id.label(key),
+            models.Film_Week.year.label("year"),
+            func.sum(models.Film_Week.week_gross).label("gross"),
         )
+        .join(association, association.c.film_id == models.Film_Week.film_id)
+        .group_by(entity_id, models.Film_Week.year)
+    )
+    totals = db.session.query(
+        models.Week.year.label("year"),
+        func.sum(models.Week.week_gross).label("total"),
+    ).group_by(models.Week.year)
+
+    if years is not None:
+        years = list(years)
+        gross = gross.filter(models.Film_Week.year.in_(years))
+        totals = totals.filter(models.Week.year.in_(years))
+
+    gross = gross.subquery()
+    totals = totals.subquery()
+
+    market_share = case(
+        (
+            totals.c.total > 0,
+            cast(gross.c.gross, db.Float) * 100.0 / totals.c.total,
+        ),
+        else_=0.0,
+    )
 
-    db.session.add(market_share_data)
-    db.session.commit()
+    return db.session.query(
+        gross.c[key],
+        gross.c.year,
+        gross.c.gross,
+        market_share.label("market_share"),
+    ).outerjoin(totals, totals.c.year == gross.c.year)
 
 
-def _calculate_market_share(gross: int, year: str) -> float:
+def _replace_years(
+    entity_type: str, years: Optional[Iterable[int]] = None
+) -> None:
     """
-    Calculate the market share percentage for a given gross in a specific year.
+    Replaces the market share rows of years with one bulk delete and insert per year.
+    The caller commits the transaction.
 
     Args:
-        gross (int): The gross amount of a specific entity (e.g., distributor or country)
-            for the given year.
-        year (str): The year for which the market share percentage is being calculated.
+        entity_type (str): The type of entity, "distributor" or "country".
+        years (Iterable[int], optional): The years to replace. If not provided, all years are replaced.
 
-    Returns:
-        float: The market share percentage of the specified gross for the given year.
+    Raises:
+        ValueError: If the provided entity_type is not one of the supported values.
 
-    Example:
-        To calculate the market share for a distributor's gross in the year 2023:
-        >>> distributor_gross = 2000000
-        >>> market_share_percentage = _calculate_market_share(distributor_gross, "2023")
-        >>> print(market_share_percentage)
-        12.34
+    Returns:
+        None
     """
-    total_gross = (
-        db.session.query(func.sum(models.Week.week_gross))
-        .filter(func.extract("year", models.Week.date) == year)
-        .scalar()
-    )
+    model, _, _ = _market_share(entity_type)
+    years = sorted(set(years)) if years is not None else None
 
-    return 0.0 if total_gross is None else (gross / total_gross) * 100.0
+    rows: Dict[int, List[Dict[str, Any]]] = {}
+    for row in calculate_market_share(entity_type, years):
+        rows.setdefault(row.year, []).append(row._asdict())
 
+    if years is None:
+        years = sorted(
+            set(rows)
+            | {year for (year,) in db.session.query(model.year).distinct()}
+        )
 
-def clear_year(year: int) -> None:
+    for year in years:
+        model.query.filter(model.year == year).delete(
+            synchronize_session=False
+        )
+        model.insert_many(rows.get(year, []))
+
+
+def _market_share(entity_type: str) -> Tuple[Any, Any, str]:
     """
-    Deletes a given year of market share in the database.
+    Gets the market share model, association table and ID column of an entity.
 
     Args:
-        year (str): The year for which the market share table is being deleted.
+        entity_type (str): The type of entity, "distributor" or "country".
 
-    Returns:
-        None
+    Raises:
+        ValueError: If the provided entity_type is not one of the supported values.
 
-    TODO: Add second table clear.
+    Returns:
+        The market share model, association table and ID column name.
     """
-    data = (
-        db.session.query(models.DistributorMarketShare)
-        .filter(models.DistributorMarketShare.year == year)
-        .all()
-    )
-    for i in data:
-        db.session.delete(i)
-
-    db.session.commit()
+    if entity_type not in MARKET_SHARES:
+        raise ValueError(
+            "Invalid entity type. Supported values are 'distributor' and 'country'."
+        )
+    return MARKET_SHARES[entity_type]
@@ -0,0 +1,148 @@
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Hashable, Iterable, List, Set, Tuple
+
+# Words ignored at the start and end of names, so "X, The" matches "The X".
+ARTICLES = {"the", "a", "an"}
+
+# Lowest trigram similarity for a name to be suggested as a match.
+SIMILARITY = 0.7
+
+
+def normalise(text: str) -> str:
+    """
+    Normalises a name for matching.
+    Accents and punctuation are removed, and case is ignored.
+
+    Args:
+        text: Text to normalise.
+
+    Returns:
+        Lower case words of the text, separated by single spaces.
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(
+        char if char.isalnum() else " "
+        for char in text
+        if not unicodedata.combining(char)
+    )
+    return " ".join(text.lower().split())
+
+
+def key(name: str) -> str:
+    """
+    Builds the matching key of a name.
+    Accents, punctuation, case and leading or trailing articles are ignored.
+
+    Args:
+        name: Name to match.
+
+    Returns:
+        Key of the name.
+    """
+    words = normalise(name).split()
+    while len(words) > 1 and words[0] in ARTICLES:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in ARTICLES:
+        words = words[:-1]
+    return " ".join(words)
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Splits a key into its trigrams, padded so short keys still have some.
+
+    Args:
+        text: Key to split.
+
+    Returns:
+        Set of trigrams.
+    """
+    text = f"  {text} "
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Typo tolerant index of names.
+
+    Names are compared by the Dice similarity of the trigrams of their keys.
+    Trigrams are a blocking index, so only names sharing a trigram
+    with the query are scored, rather than every name.
+
+    Each name is stored under a caller's key, such as its ID or slug.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[Hashable, str]] = ()) -> None:
+        self._keys: Dict[str, List[Hashable]] = {}
+        self._sizes: Dict[Hashable, int] = {}
+        self._postings: Dict[str, List[Hashable]] = {}
+        for id, name in rows:
+            self.add(id, name)
+
+    def add(self, id: Hashable, name: str) -> None:
+        """
+        Adds a name to the index.
+
+        Args:
+            id: Key of the name, unique in the index.
+            name: Name to add.
+        """
+        name_key = key(name)
+        grams = trigrams(name_key)
+        self._keys.setdefault(name_key, []).append(id)
+        self._sizes[id] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(id)
+
+    def exact(self, name: str) -> List[Hashable]:
+        """
+        Finds the names with the same key as a name.
+
+        Args:
+            name: Name to match.
+
+        Returns:
+            List of the keys of the matching names.
+        """
+        return list(self._keys.get(key(name), []))
+
+    def candidates(self, name: str) -> Counter:
+        """
+        Finds the names sharing any trigram with a name,
+        which are the only names scored by ``search``.
+
+        Args:
+            name: Name to match.
+
+        Returns:
+            Counter of the keys of the names and their shared trigrams.
+        """
+        shared: Counter = Counter()
+        for gram in trigrams(key(name)):
+            shared.update(self._postings.get(gram, ()))
+        return shared
+
+    def search(
+        self, name: str, threshold: float = SIMILARITY, limit: int = 10
+    ) -> List[Tuple[Any, float]]:
+        """
+        Finds the names similar to a name, most similar first.
+
+        Args:
+            name: Name to match.
+            threshold: Lowest similarity, from 0 to 1.
+            limit: Maximum number of matches.
+
+        Returns:
+            List of the keys of the matching names and their similarity.
+        """
+        grams = trigrams(key(name))
+        matches = []
+        for id, count in self.candidates(name).items():
+            score = 2 * count / (len(grams) + self._sizes[id])
+            if score >= threshold:
+                matches.append((id, score))
+
+        matches.sort(key=lambda match: -match[1])
+        return matches[:limit]
@@ -0,0 +1,198 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.sql import case, distinct, func
+from ukbo import models
+from ukbo.extensions import db
+
+# Rollup model, association table and ID column of each entity type.
+ROLLUPS: Dict[str, Tuple[Any, Any, str]] = {
+    "distributor": (
+        models.DistributorBoxOffice,
+        models.distributors,
+        "distributor_id",
+    ),
+    "country": (models.CountryBoxOffice, models.countries, "country_id"),
+}
+
+
+def aggregate(entity_type: str) -> Any:
+    """
+    Builds a query of the yearly box office of each entity,
+    summed from the film weeks of its films.
+
+    Args:
+        entity_type: ``distributor`` or ``country``.
+
+    Returns:
+        Query of entity ID, year, gross, weeks, films and new releases.
+
+    Raises:
+        ValueError: If the entity type is invalid.
+    """
+    _, association, key = _rollup(entity_type)
+    entity_id = association.c[key]
+    release = case(
+        (models.Film_Week.weeks_on_release == 1, models.Film_Week.film_id)
+    )
+
+    return (
+        db.session.query(
+            entity_id.label(key),
+            models.Film_Week.year.label("year"),
+            func.sum(models.Film_Week.total_gross).label("gross"),
+            func.count(models.Film_Week.id).label("weeks"),
+            func.count(distinct(models.Film_Week.film_id)).label("films"),
+            func.count(distinct(release)).label("new_releases"),
+        )
+        .join(association, association.c.film_id == models.Film_Week.film_id)
+        .group_by(entity_id, models.Film_Week.year)
+    )
+
+
+def entity_ids(entity_type: str, film_ids: Iterable[int]) -> List[int]:
+    """
+    Gets the IDs of the entities of films.
+
+    Args:
+        entity_type: ``distributor`` or ``country``.
+        film_ids: IDs of the films.
+
+    Returns:
+        Sorted list of entity IDs.
+    """
+    _, association, key = _rollup(entity_type)
+    film_ids = sorted(set(film_ids))
+
+    ids = set()
+    for batch in models.batches(film_ids):
+        ids.update(
+            entity_id
+            for (entity_id,) in db.session.query(association.c[key])
+            .filter(association.c.film_id.in_(batch))
+            .distinct()
+        )
+    return sorted(ids)
+
+
+def refresh(
+    entity_type: str,
+    ids: Optional[Iterable[int]] = None,
+    years: Optional[Iterable[int]] = None,
+) -> None:
+    """
+    Refreshes the yearly box office rows of entities.
+
+    Only the given entities and years are deleted and summed again,
+    so a weekly load only touches the rows it changed.
+
+    Args:
+        entity_type: ``distributor`` or ``country``.
+        ids: IDs of the entities to refresh, or all entities if None.
+        years: Years to refresh, or all years if None.
+    """
+    model, association, key = _rollup(entity_type)
+    entity_id = association.c[key]
+    years = sorted(set(years)) if years is not None else None
+
+    if ids is None:
+        chunks: List[Optional[List[int]]] = [None]
+    else:
+        ids = sorted(set(ids))
+        chunks = list(models.batches(ids))
+
+    for chunk in chunks:
+        stale = model.query
+        query = aggregate(entity_type)
+        if chunk is not None:
+            stale = stale.filter(getattr(model, key).in_(chunk))
+            query = query.filter(entity_id.in_(chunk))
+        if years is not None:
+            stale = stale.filter(model.year.in_(years))
+            query = query.filter(models.Film_Week.year.in_(years))
+
+        stale.delete(synchronize_session=False)
+        model.insert_many([row._asdict() for row in query])
+
+
+def refresh_films(
+    film_ids: Optional[Iterable[int]] = None,
+    years: Optional[Iterable[int]] = None,
+) -> None:
+    """
+    Refreshes the yearly box office of the distributors and countries
+    of films whose weeks have changed.
+
+    Args:
+        film_ids: IDs of the films, or all films if None.
+        years: Years of the weeks that changed, or all years if None.
+    """
+    film_ids = list(film_ids) if film_ids is not None else None
+    years = list(years) if years is not None else None
+    for entity_type in ROLLUPS:
+        ids = (
+            entity_ids(entity_type, film_ids) if film_ids is not None else None
+        )
+        refresh(entity_type, ids, years)
+
+
+def box_office(
+    entity_type: str, entity_id: Optional[int], min_year: int
+) -> List[Dict[str, Any]]:
+    """
+    Gets the yearly box office of an entity, newest year first.
+
+    Read from the rollup table,
+    or summed from the film weeks if it hasn't been built.
+
+    Args:
+        entity_type: ``distributor`` or ``country``.
+        entity_id: ID of the entity.
+        min_year: First year to include.
+
+    Returns:
+        List of years, with their total gross, weeks, films
+        and new releases.
+    """
+    model, association, key = _rollup(entity_type)
+    if db.session.query(model.year).first() is not None:
+        rows = model.query.filter(
+            getattr(model, key) == entity_id, model.year >= min_year
+        ).order_by(model.year.desc())
+    else:
+        rows = (
+            aggregate(entity_type)
+            .filter(
+                association.c[key] == entity_id,
+                models.Film_Week.year >= min_year,
+            )
+            .order_by(models.Film_Week.year.desc())
+        )
+
+    return [
+        dict(
+            year=row.year,
+            total=row.gross,
+            count=row.weeks,
+            films=row.films,
+            new_releases=row.new_releases,
+        )
+        for row in rows
+    ]
+
+
+def _rollup(entity_type: str) -> Tuple[Any, Any, str]:
+    """
+    Gets the rollup model, association table and ID column of an entity.
+
+    Args:
+        entity_type: ``distributor`` or ``country``.
+
+    Returns:
+        Rollup model, association table and ID column name.
+
+    Raises:
+        ValueError: If the entity type is invalid.
+    """
+    if entity_type not in ROLLUPS:
+        raise ValueError("Invalid entity type.")
+    return ROLLUPS[entity_type]
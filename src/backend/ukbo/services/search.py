@@ -0,0 +1,649 @@
+import bisect
+import heapq
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import bindparam, case, func, select
+from ukbo import models
+from ukbo.dto import CompiledSchema, FilmSchemaValues
+from ukbo.extensions import db
+
+from . import rollup
+from .matcher import FuzzyIndex, normalise
+
+# Length of the n-grams in the index.
+NGRAM = 3
+
+# Prefixes up to this length have their top suggestions precomputed.
+TOP_PREFIX = 2
+
+# Number of suggestions precomputed for each short prefix.
+SUGGESTIONS = 25
+
+# Most results of each section of a search of everything.
+SECTION_LIMITS = {"distributors": 10, "countries": 10}
+
+# Model of each searchable entity type.
+SEARCH_TYPES: Dict[str, Any] = {
+    "film": models.Film,
+    "distributor": models.Distributor,
+    "country": models.Country,
+}
+
+
+def ngrams(text: str) -> Set[str]:
+    """
+    Splits text into its lower case n-grams.
+
+    Args:
+        text: Text to split.
+
+    Returns:
+        Set of the n-grams, empty if the text is shorter than an n-gram.
+    """
+    text = text.lower()
+    return {text[i : i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class NgramIndex:
+    """
+    In memory inverted index of names by their n-grams.
+
+    A name contains a query only if it has every n-gram of the query,
+    so the candidates are the intersection of the query's posting lists,
+    then checked for the whole query.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str]] = ()) -> None:
+        self._names: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        for id, name in rows:
+            self.add(id, name)
+
+    def add(self, id: int, name: str) -> None:
+        """
+        Adds a name to the index.
+
+        Args:
+            id: ID of the name.
+            name: Name to add.
+        """
+        self._names[id] = name.lower()
+        for gram in ngrams(name):
+            self._postings.setdefault(gram, set()).add(id)
+
+    def search(self, search_query: str) -> Set[int]:
+        """
+        Finds the IDs of the names that contain a query.
+
+        Args:
+            search_query: Search query.
+
+        Returns:
+            Set of IDs.
+        """
+        search_query = search_query.lower()
+        grams = ngrams(search_query)
+        if not grams:
+            # Too short for the index, so check every name.
+            return {
+                id for id, name in self._names.items() if search_query in name
+            }
+
+        postings = sorted(
+            (self._postings.get(gram, set()) for gram in grams), key=len
+        )
+        ids = set.intersection(*postings)
+        return {id for id in ids if search_query in self._names[id]}
+
+
+class PrefixIndex:
+    """
+    In memory index of film names for typeahead, ranked by gross.
+
+    Names are kept sorted by their normalised form,
+    so the films starting with a prefix are a range found by bisection.
+    The top suggestions of short prefixes, which match the most films,
+    are precomputed.
+
+    Attributes:
+        built: Monotonic time the index was built.
+        version: Version of the data the index was built from.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Tuple[str, int, Dict[str, Any]]],
+        version: Tuple[Any, ...] = (),
+    ) -> None:
+        self.built = time.monotonic()
+        self.version = version
+        entries = sorted(
+            (normalise(name), -gross, value) for name, gross, value in rows
+        )
+        self._keys = [key for key, _, _ in entries]
+        self._ranks = [(gross, key) for key, gross, _ in entries]
+        self._values = [value for _, _, value in entries]
+
+        top: Dict[str, List[int]] = {}
+        for i, key in enumerate(self._keys):
+            for length in range(1, min(len(key), TOP_PREFIX) + 1):
+                top.setdefault(key[:length], []).append(i)
+        self._top = {
+            prefix: self._best(positions, SUGGESTIONS)
+            for prefix, positions in top.items()
+        }
+
+    def search(self, search_query: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Finds the films starting with a query, highest gross first.
+
+        Args:
+            search_query: Search query.
+            limit: Maximum number of films.
+
+        Returns:
+            List of films, as ``FilmSchemaValues`` dumps them.
+        """
+        prefix = normalise(search_query)
+        if not prefix:
+            return []
+
+        if len(prefix) <= TOP_PREFIX and limit <= SUGGESTIONS:
+            positions = self._top.get(prefix, [])[:limit]
+        else:
+            start = bisect.bisect_left(self._keys, prefix)
+            end = bisect.bisect_left(self._keys, prefix + chr(0x10FFFF), start)
+            positions = self._best(range(start, end), limit)
+
+        return [self._values[i] for i in positions]
+
+    def _best(self, positions: Iterable[int], limit: int) -> List[int]:
+        """
+        Ranks positions of the index by gross, then name.
+
+        Args:
+            positions: Positions of entries.
+            limit: Maximum number of positions.
+
+        Returns:
+            List of the best positions.
+        """
+        return heapq.nsmallest(limit, positions, key=self._ranks.__getitem__)
+
+
+_lock = threading.Lock()
+
+
+def matches(entity_type: str, search_query: str) -> Any:
+    """
+    Builds a filter for the rows whose names contain a query, ignoring case.
+
+    On Postgres this is a ``LIKE`` on the lower case name,
+    which uses the ``pg_trgm`` GIN index of the table.
+    Other databases can't index it, so the IDs are found
+    in an in memory n-gram index instead.
+
+    Args:
+        entity_type: ``film``, ``distributor`` or ``country``.
+        search_query: Search query.
+
+    Returns:
+        SQL filter.
+
+    Raises:
+        ValueError: If the entity type is invalid.
+    """
+    model = _model(entity_type)
+    if db.session.get_bind().dialect.name == "postgresql":
+        return func.lower(model.name).contains(
+            search_query.lower(), autoescape=True
+        )
+    # Rendered inline, as a short query can match more IDs than
+    # SQLite allows bound parameters.
+    ids = sorted(_index(entity_type).search(search_query))
+    return model.id.in_(bindparam("ids", ids, literal_execute=True))
+
+
+def similar(entity_type: str, search_query: str, limit: int = 50) -> List[int]:
+    """
+    Finds the rows whose names are similar to a query, for typos.
+    Used when a query doesn't match any names.
+
+    Args:
+        entity_type: ``film``, ``distributor`` or ``country``.
+        search_query: Search query.
+        limit: Maximum number of rows.
+
+    Returns:
+        List of IDs, most similar first.
+    """
+    return [
+        id
+        for id, _ in fuzzy_index(entity_type).search(search_query, limit=limit)
+    ]
+
+
+def by_position(column: Any, ids: List[int]) -> Any:
+    """
+    Builds an order of rows by their position in a list of IDs.
+
+    Args:
+        column: ID column.
+        ids: Ordered list of IDs.
+
+    Returns:
+        SQL order by clause.
+    """
+    if not ids:
+        return column
+    return case({id: i for i, id in enumerate(ids)}, value=column)
+
+
+def gross(entity_type: str) -> Any:
+    """
+    Builds an expression of the total gross of each row.
+
+    Args:
+        entity_type: ``film``, ``distributor`` or ``country``.
+
+    Returns:
+        SQL expression of the gross, 0 if it has none.
+    """
+    model = _model(entity_type)
+    # Aliased, so it isn't correlated away when the query joins the table.
+    if entity_type == "film":
+        stats = aliased(models.FilmStats)
+        total = select(stats.gross).where(stats.film_id == model.id)
+    else:
+        table, _, key = rollup.ROLLUPS[entity_type]
+        table = aliased(table)
+        total = select(func.sum(table.gross)).where(
+            getattr(table, key) == model.id
+        )
+    return func.coalesce(total.scalar_subquery(), 0)
+
+
+def rank(entity_type: str, search_query: str) -> List[Any]:
+    """
+    Builds the order of the results of a query.
+
+    Exact names come first, then names starting with the query,
+    then names with a word starting with the query,
+    then any other match.
+    Ties are broken by the highest gross.
+
+    Args:
+        entity_type: ``film``, ``distributor`` or ``country``.
+        search_query: Search query.
+
+    Returns:
+        List of SQL order by clauses.
+    """
+    model = _model(entity_type)
+    name = func.lower(model.name)
+    search_query = search_query.lower()
+    relevance = case(
+        (name == search_query, 0),
+        (name.startswith(search_query, autoescape=True), 1),
+        (name.contains(f" {search_query}", autoescape=True), 2),
+        else_=3,
+    )
+    return [relevance, gross(entity_type).desc(), model.name]
+
+
+def search(entity_type: str, search_query: str, limit: int) -> List[Any]:
+    """
+    Searches the names of an entity, ranked by relevance then gross.
+    If no names contain the query, similar names are found instead.
+
+    Args:
+        entity_type: ``film``, ``distributor`` or ``country``.
+        search_query: Search query.
+        limit: Maximum number of results.
+
+    Returns:
+        List of matching rows.
+    """
+    model = _model(entity_type)
+    data = (
+        model.query.filter(matches(entity_type, search_query))
+        .order_by(*rank(entity_type, search_query))
+        .limit(limit)
+        .all()
+    )
+    if data:
+        return data
+
+    ids = similar(entity_type, search_query, limit)
+    return (
+        model.query.filter(model.id.in_(ids))
+        .order_by(by_position(model.id, ids))
+        .all()
+    )
+
+
+def search_all(
+    search_query: str,
+    query_filter: Any,
+    sort_filter: Any,
+    page: int = 1,
+) -> Dict[str, Any]:
+    """
+    Searches films, distributors and countries at the same time.
+
+    Each section runs on a thread of the app's search pool,
+    in its own app context, so with its own database session.
+    An in memory SQLite database can't be shared between connections,
+    so the sections run one after another on it instead.
+
+    Args:
+        search_query: Search query.
+        query_filter: Filters of the film results.
+        sort_filter: Sort of the film results.
+        page: Page of the film results.
+
+    Returns:
+        Dictionary of the results of each section.
+    """
+    from ukbo import services
+
+    sections: Dict[str, Tuple[Callable[..., Any], Tuple[Any, ...]]] = {
+        "films": (
+            services.film.search,
+            (search_query, query_filter, sort_filter),
+        ),
+        "distributors": (
+            services.distributor.search,
+            (search_query, SECTION_LIMITS["distributors"]),
+        ),
+        "countries": (
+            services.country.search,
+            (search_query, SECTION_LIMITS["countries"]),
+        ),
+    }
+    kwargs = {"films": {"page": page}}
+
+    url = db.engine.url
+    if url.get_backend_name() == "sqlite" and not url.database:
+        return {
+            name: function(*args, **kwargs.get(name, {}))
+            for name, (function, args) in sections.items()
+        }
+
+    app = current_app._get_current_object()  # type: ignore
+    futures: Dict[str, Future] = {
+        name: _executor(app).submit(
+            _in_context, app, function, *args, **kwargs.get(name, {})
+        )
+        for name, (function, args) in sections.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def autocomplete(search_query: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Suggests films starting with a query, from the in memory prefix index.
+
+    Each process has its own index, warmed when the app starts.
+    The ETL reloads the index of the process it runs in,
+    other processes, such as the other gunicorn workers,
+    notice the load on their next request, as the version of the films
+    and film weeks has changed.
+    The index is then rebuilt in the background,
+    and the old index serves requests until the new one is swapped in.
+    It's also rebuilt once older than ``AUTOCOMPLETE_MAX_AGE`` seconds,
+    for changes the version can't see, such as renames.
+
+    Args:
+        search_query: Search query.
+        limit: Maximum number of films.
+
+    Returns:
+        List of films, as ``FilmSchemaValues`` dumps them.
+    """
+    app = current_app._get_current_object()  # type: ignore
+    index = app.extensions.get("autocomplete")
+    if index is None:
+        index = load_autocomplete()
+    elif (
+        index.version != _autocomplete_version()
+        or time.monotonic() - index.built > app.config["AUTOCOMPLETE_MAX_AGE"]
+    ):
+        _reload_autocomplete(app)
+    return index.search(search_query, limit)
+
+
+def load_autocomplete() -> PrefixIndex:
+    """
+    Builds the prefix index of film names, and swaps it in for the app.
+
+    Returns:
+        The new index.
+    """
+    # Read first, so rows loaded during the build trigger another reload.
+    version = _autocomplete_version()
+    schema = CompiledSchema(FilmSchemaValues)
+    query = db.session.query(
+        models.Film.name,
+        func.coalesce(models.FilmStats.gross, 0),
+        *schema.columns,
+    ).outerjoin(models.FilmStats)
+
+    index = PrefixIndex(
+        ((name, gross, schema.dump(row)) for name, gross, *row in query),
+        version,
+    )
+    current_app.extensions["autocomplete"] = index
+    return index
+
+
+def warm_autocomplete() -> None:
+    """
+    Builds the prefix index when the app starts,
+    so the first request doesn't wait for it.
+    A database without the tables yet, before its migrations, is skipped.
+    """
+    try:
+        load_autocomplete()
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.warning("Autocomplete index not warmed.")
+
+
+def _autocomplete_version() -> Tuple[Any, ...]:
+    """
+    Gets the version of the data of the prefix index,
+    from the count and highest ID of the films
+    and the highest ID of the film weeks, which every load adds to.
+    Each is read from an index, so it's cheap to check on every request.
+
+    Returns:
+        Tuple of film count, highest film ID and highest film week ID.
+    """
+    return tuple(
+        db.session.query(
+            select(func.count(models.Film.id)).scalar_subquery(),
+            select(func.max(models.Film.id)).scalar_subquery(),
+            select(func.max(models.Film_Week.id)).scalar_subquery(),
+        ).one()
+    )
+
+
+def _reload_autocomplete(app: Flask) -> threading.Thread:
+    """
+    Rebuilds the prefix index on a background thread,
+    unless a rebuild is already running.
+
+    Args:
+        app: Flask app.
+
+    Returns:
+        The thread of the rebuild.
+    """
+
+    def reload() -> None:
+        with app.app_context():
+            try:
+                load_autocomplete()
+            except Exception:
+                app.logger.exception("Autocomplete reload failed.")
+            finally:
+                db.session.remove()
+
+    with _lock:
+        thread = app.extensions.get("autocomplete_reload")
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=reload, daemon=True)
+            app.extensions["autocomplete_reload"] = thread
+            thread.start()
+    return thread
+
+
+def _in_context(
+    app: Flask, function: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Any:
+    """
+    Calls a function in a new app context, so with its own database session.
+
+    Args:
+        app: Flask app.
+        function: Function to call.
+        *args: Arguments of the function.
+        **kwargs: Keyword arguments of the function.
+
+    Returns:
+        Result of the function.
+    """
+    with app.app_context():
+        return function(*args, **kwargs)
+
+
+def _executor(app: Flask) -> ThreadPoolExecutor:
+    """
+    Gets the thread pool of the app for searches,
+    with ``SEARCH_WORKERS`` threads.
+
+    Args:
+        app: Flask app.
+
+    Returns:
+        Thread pool.
+    """
+    with _lock:
+        executor = app.extensions.get("search_executor")
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=app.config["SEARCH_WORKERS"],
+                thread_name_prefix="search",
+            )
+            app.extensions["search_executor"] = executor
+    return executor
+
+
+def _index(entity_type: str) -> NgramIndex:
+    """
+    Gets the in memory n-gram index of an entity.
+
+    Args:
+        entity_type: ``film``, ``distributor`` or ``country``.
+
+    Returns:
+        N-gram index of the entity's names.
+    """
+    return _cached("ngram", entity_type, NgramIndex)
+
+
+def fuzzy_index(entity_type: str) -> FuzzyIndex:
+    """
+    Gets the in memory fuzzy index of an entity.
+    Also used by the ETL to find duplicate names.
+
+    Args:
+        entity_type: ``film``, ``distributor`` or ``country``.
+
+    Returns:
+        Fuzzy index of the entity's names, by ID.
+    """
+    return _cached("fuzzy", entity_type, FuzzyIndex)
+
+
+def _cached(kind: str, entity_type: str, build: Callable[[], Any]) -> Any:
+    """
+    Gets an in memory index of an entity's names.
+
+    Rows added since the index was built are added to it,
+    and it's rebuilt if rows have been deleted.
+    Names aren't changed in place, so that's all it needs to notice,
+    and as it's read from the database, loads by other processes too.
+
+    Args:
+        kind: Name of the kind of index.
+        entity_type: ``film``, ``distributor`` or ``country``.
+        build: Function to build an empty index, with an ``add`` method.
+
+    Returns:
+        The index.
+    """
+    model = _model(entity_type)
+    count, max_id = db.session.query(
+        func.count(model.id), func.max(model.id)
+    ).one()
+
+    indexes = _indexes()
+    with _lock:
+        cached = indexes.get((kind, entity_type))
+        if cached is not None and cached[0] == (count, max_id):
+            return cached[1]
+
+        query = db.session.query(model.id, model.name)
+        if (
+            cached is not None
+            and cached[0][1] is not None
+            and count - cached[0][0] == max_id - cached[0][1]
+        ):
+            # Only new rows, so add them.
+            index = cached[1]
+            query = query.filter(model.id > cached[0][1])
+        else:
+            index = build()
+
+        for id, name in query:
+            index.add(id, name)
+        indexes[(kind, entity_type)] = ((count, max_id), index)
+    return index
+
+
+def _indexes() -> Dict[Tuple[str, str], Tuple[Tuple[Any, ...], Any]]:
+    """
+    Gets the in memory indexes of the app, by kind and entity type,
+    with the count and highest ID of the rows they were built from.
+    They're kept on the app, as each app has its own database.
+
+    Returns:
+        Dictionary of indexes.
+    """
+    return current_app.extensions.setdefault("search_index", {})
+
+
+def _model(entity_type: str) -> Any:
+    """
+    Gets the model of an entity type.
+
+    Args:
+        entity_type: ``film``, ``distributor`` or ``country``.
+
+    Returns:
+        Model of the entity.
+
+    Raises:
+        ValueError: If the entity type is invalid.
+    """
+    if entity_type not in SEARCH_TYPES:
+        raise ValueError("Invalid entity type.")
+    return SEARCH_TYPES[entity_type]
@@ -62,6 +62,53 @@ def add_week(
     return models.Week.create(**new_week, commit=commit)
 
 
+def merge_weeks(df: pd.DataFrame) -> None:
+    """
+    Adds or updates the Weeks for a whole data import.
+
+    The totals for each date are computed with one groupby,
+    and written with one upsert per date.
+    Existing totals are replaced rather than added to,
+    so applying the same import twice gives the same Weeks.
+    Admissions and forecasts are left untouched.
+
+    Args:
+        df: Dataframe of film weeks, with complete dates.
+
+    """
+    if df.empty:
+        return None
+
+    weeks = (
+        df.assign(
+            number_of_cinemas=df["number_of_cinemas"].fillna(0),
+            new_release=df["weeks_on_release"] == 1,
+        )
+        .groupby("date")
+        .agg(
+            week_gross=("week_gross", "sum"),
+            weekend_gross=("weekend_gross", "sum"),
+            number_of_cinemas=("number_of_cinemas", "max"),
+            number_of_releases=("new_release", "sum"),
+        )
+        .astype(int)
+        .reset_index()
+    )
+
+    columns = [
+        "week_gross",
+        "weekend_gross",
+        "number_of_cinemas",
+        "number_of_releases",
+    ]
+    models.Week.upsert_many(
+        weeks.to_dict(orient="records"),
+        index_elements=["date"],
+        update_columns=columns,
+    )
+    return None
+
+
 def update_admissions(year: int, month: int, admissions: int) -> None:
     """
     Updates admissions data for a given month.
@@ -29,6 +29,9 @@ class Config:
     CORS_ORIGIN = os.getenv("CORS_ORIGIN")
     CORS_ORIGIN_2 = os.getenv("CORS_ORIGIN_2")
     RATELIMIT_STORAGE_URI = "memory://"
+    AUTOCOMPLETE_MAX_AGE = 3600
+    AUTOCOMPLETE_WARM = True
+    SEARCH_WORKERS = 6
 
 
 class DevelopmentConfig(Config):
@@ -56,6 +59,7 @@ class TestConfig(Config):
     CACHE_TYPE = "NullCache"
     CACHE_NO_NULL_WARNING = True
     CORS_ORIGIN = "*"
+    AUTOCOMPLETE_WARM = False
 
 
 # Logging config
@@ -2,6 +2,9 @@ import { Country } from './Country';
 import { Distributor } from './Distributor';
 import { Film } from './Film';
 
+// A filter option, with the number of films it matches.
+export type Facet<T> = T & { count: number };
+
 export interface SearchResults {
 	countries: Country[];
 	distributors: Distributor[];
@@ -10,8 +13,8 @@ export interface SearchResults {
 		next: number;
 		previous: number;
 		results: Film[];
-		distributors: Distributor[];
-		countries: Country[];
+		distributors: Facet<Distributor>[];
+		countries: Facet<Country>[];
 		max_gross: number;
 	};
 }
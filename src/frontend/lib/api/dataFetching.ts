@@ -137,11 +137,13 @@ export async function fetchBoxOfficeInfinite(
 	const backendUrl = getBoxOfficeInfiniteEndpoint();
 	const allData: BoxOfficeWeek[] = [];
 
-	let nextPage = 1;
+	let cursor = '';
 	let isLastPage = false;
 	let totalCount = 0;
 	while (!isLastPage) {
-		let url = `${backendUrl}?start=${startDate}&end=${endDate}&page=${nextPage}`;
+		// Only the first page needs the count.
+		let url = `${backendUrl}?start=${startDate}&end=${endDate}`;
+		url += cursor ? `&cursor=${cursor}&count=none` : '&count=exact';
 		if (distributorId) {
 			url += `&distributor=${distributorId}`;
 		}
@@ -150,13 +152,13 @@ export async function fetchBoxOfficeInfinite(
 		}
 		const data = await request<{
 			results: BoxOfficeWeek[];
-			count: number;
-			next: string | null;
+			count: number | null;
+			next: string;
 		}>(url, { cache: 'no-store' });
 		allData.push(...data.results);
-		totalCount = data.count;
+		totalCount = data.count ?? totalCount;
 		isLastPage = !data.next;
-		nextPage++;
+		cursor = data.next;
 	}
 
 	const isReachedEnd = allData.length === totalCount;